@@ -0,0 +1,81 @@
+"""Move chunk embeddings to a per-model side table
+
+Revision ID: 0007_chunk_embeddings
+Revises: add_avatars_001
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector  # type: ignore
+
+# revision identifiers, used by Alembic.
+revision = "0007_chunk_embeddings"
+down_revision = "add_avatars_001"
+branch_labels = None
+depends_on = None
+
+# Embedding models that get an HNSW index (name -> dimensions).
+# Adding a model to settings.embedding_models needs a migration adding its index.
+EMBEDDING_MODELS = {
+    "nomic-embed-text": 768,
+    "all-minilm": 384,
+    "mxbai-embed-large": 1024,
+}
+LEGACY_MODEL = "nomic-embed-text"
+
+
+def _index_name(model: str) -> str:
+    return "ix_chunk_embeddings_hnsw_" + model.replace("-", "_")
+
+
+def upgrade() -> None:
+    # Per-project embedding model (NULL uses settings.embedding_model)
+    op.add_column(
+        "projects",
+        sa.Column("embedding_model", sa.String(100), nullable=True),
+    )
+
+    # Side table: one embedding per (chunk, model), dimension-less column
+    op.create_table(
+        "chunk_embeddings",
+        sa.Column("chunk_id", sa.Integer(), nullable=False),
+        sa.Column("model", sa.String(100), nullable=False),
+        sa.Column("embedding", Vector(), nullable=False),
+        sa.ForeignKeyConstraint(["chunk_id"], ["chunks.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("chunk_id", "model"),
+    )
+
+    # Copy existing embeddings (all produced by nomic-embed-text)
+    op.execute(f"""
+        INSERT INTO chunk_embeddings (chunk_id, model, embedding)
+        SELECT id, '{LEGACY_MODEL}', embedding
+        FROM chunks
+        WHERE embedding IS NOT NULL
+    """)
+
+    # One partial HNSW index per model, on the model's fixed-dimension cast
+    for model, dimensions in EMBEDDING_MODELS.items():
+        op.execute(f"""
+            CREATE INDEX {_index_name(model)} ON chunk_embeddings
+            USING hnsw ((embedding::vector({dimensions})) vector_cosine_ops)
+            WHERE model = '{model}'
+        """)
+
+    op.drop_column("chunks", "embedding")
+
+
+def downgrade() -> None:
+    op.add_column("chunks", sa.Column("embedding", Vector(768), nullable=True))
+    op.execute(f"""
+        UPDATE chunks c
+        SET embedding = e.embedding::vector(768)
+        FROM chunk_embeddings e
+        WHERE e.chunk_id = c.id AND e.model = '{LEGACY_MODEL}'
+    """)
+
+    for model in EMBEDDING_MODELS:
+        op.execute(f"DROP INDEX IF EXISTS {_index_name(model)}")
+    op.drop_table("chunk_embeddings")
+    op.drop_column("projects", "embedding_model")
@@ -0,0 +1,48 @@
+"""Quantized ANN indexes on chunk embeddings (built by a script)
+
+Revision ID: 0008_quantized_vector_indexes
+Revises: 0007_chunk_embeddings
+Create Date: 2026-10-19 10:00:00.000000
+
+Requires pgvector >= 0.7 (halfvec, binary_quantize) for the quantized
+vector_index_mode values. Their halfvec and binary HNSW indexes are not
+created here: which ones are needed depends on the mode, which can change
+after migrating. Run scripts/build_vector_indexes.py <mode> before
+setting VECTOR_INDEX_MODE to "halfvec" or "binary"; with --drop-unused it
+also drops the full-precision indexes from 0007, which a quantized mode
+no longer reads. See app/services/vector_indexes.py.
+
+Downgrading drops any quantized indexes the script built.
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0008_quantized_vector_indexes"
+down_revision = "0007_chunk_embeddings"
+branch_labels = None
+depends_on = None
+
+# Must match EMBEDDING_MODELS in 0007_chunk_embeddings
+EMBEDDING_MODELS = {
+    "nomic-embed-text": 768,
+    "all-minilm": 384,
+    "mxbai-embed-large": 1024,
+}
+
+
+def _index_name(kind: str, model: str) -> str:
+    return f"ix_chunk_embeddings_{kind}_" + model.replace("-", "_")
+
+
+def upgrade() -> None:
+    # Built per mode by scripts/build_vector_indexes.py
+    pass
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for model in EMBEDDING_MODELS:
+            for kind in ("halfvec", "binary"):
+                name = _index_name(kind, model)
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
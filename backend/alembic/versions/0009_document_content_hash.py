@@ -0,0 +1,30 @@
+"""Add content hash to documents for deduplicated storage
+
+Revision ID: 0009_document_content_hash
+Revises: 0008_quantized_vector_indexes
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0009_document_content_hash"
+down_revision = "0008_quantized_vector_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows keep NULL (their files are stored under uuid4 names)
+    op.add_column(
+        "documents",
+        sa.Column("content_hash", sa.String(64), nullable=True),
+    )
+    op.create_index("ix_documents_content_hash", "documents", ["content_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_documents_content_hash", table_name="documents")
+    op.drop_column("documents", "content_hash")
@@ -0,0 +1,35 @@
+"""Add counters table for dashboard stats
+
+Revision ID: 0010_counters
+Revises: 0009_document_content_hash
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0010_counters"
+down_revision = "0009_document_content_hash"
+branch_labels = None
+depends_on = None
+
+COUNTED_TABLES = ("users", "customers", "projects", "documents")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "counters",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("value", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    # Seed with the current totals; the application maintains them from here
+    for table in COUNTED_TABLES:
+        op.execute(
+            f"INSERT INTO counters (name, value) SELECT '{table}', count(*) FROM {table}"
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("counters")
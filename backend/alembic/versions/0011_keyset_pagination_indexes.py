@@ -0,0 +1,42 @@
+"""Add (created_at, id) indexes for keyset pagination
+
+Revision ID: 0011_keyset_pagination_indexes
+Revises: 0010_counters
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0011_keyset_pagination_indexes"
+down_revision = "0010_counters"
+branch_labels = None
+depends_on = None
+
+# (index, table, columns)
+INDEXES = [
+    ("ix_users_created_at_id", "users", "created_at, id"),
+    ("ix_customers_created_at_id", "customers", "created_at, id"),
+    ("ix_projects_created_at_id", "projects", "created_at, id"),
+    (
+        "ix_documents_project_id_created_at_id",
+        "documents",
+        "project_id, created_at, id",
+    ),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY avoids locking large tables against writes while building
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _ in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
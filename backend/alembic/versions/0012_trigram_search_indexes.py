@@ -0,0 +1,42 @@
+"""Add pg_trgm GIN indexes for admin search
+
+Revision ID: 0012_trigram_search_indexes
+Revises: 0011_keyset_pagination_indexes
+Create Date: 2026-10-19 16:00:00.000000
+
+Trigram indexes let PostgreSQL answer ILIKE '%term%' and prefix searches
+from the index, and back similarity() ranking.
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0012_trigram_search_indexes"
+down_revision = "0011_keyset_pagination_indexes"
+branch_labels = None
+depends_on = None
+
+# (index, table, column)
+INDEXES = [
+    ("ix_users_email_trgm", "users", "email"),
+    ("ix_users_full_name_trgm", "users", "full_name"),
+    ("ix_customers_name_trgm", "customers", "name"),
+    ("ix_projects_name_trgm", "projects", "name"),
+    ("ix_projects_subdomain_trgm", "projects", "subdomain"),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        for name, table, column in INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} USING gin ({column} gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _ in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,30 @@
+"""Add pending embedding model to projects
+
+Revision ID: 0013_pending_embedding_model
+Revises: 0012_trigram_search_indexes
+Create Date: 2026-10-19 17:00:00.000000
+
+A newly chosen embedding model is recorded here while the project's
+chunks are embedded with it; retrieval keeps using embedding_model until
+the backfill completes.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0013_pending_embedding_model"
+down_revision = "0012_trigram_search_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "projects",
+        sa.Column("pending_embedding_model", sa.String(100), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("projects", "pending_embedding_model")
@@ -5,16 +5,17 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select
 from pydantic import BaseModel
 
-from app.core.database import get_db
-from app.core.deps import get_admin_user
+from app.core.database import get_db, get_read_db, read_your_writes
+from app.core.deps import get_admin_user, get_superadmin_user
 from app.models.user import User
-from app.models.document import Document
 from app.models.customer import Customer
-from app.models.project import Project
 from app.schemas.auth import UserResponse
+from app.services.aggregates import get_counters, reconcile_counters
+from app.services.pagination import CountMode, apply_page, count_total, split_page
+from app.services.search import contains_filter, similarity_rank
 
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -34,9 +35,10 @@ class UserListResponse(BaseModel):
     """Schema for paginated user list."""
 
     users: list[UserResponse]
-    total: int
+    total: Optional[int]
     page: int
     per_page: int
+    next_cursor: Optional[str] = None
 
 
 class AdminStats(BaseModel):
@@ -53,31 +55,48 @@ async def get_admin_stats(
     admin: User = Depends(get_admin_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get admin dashboard statistics."""
-    # Total users
-    total_users_result = await db.execute(select(func.count(User.id)))
-    total_users = total_users_result.scalar() or 0
+    """Get admin dashboard statistics (from maintained counters)."""
+    counters = await get_counters(db)
 
-    # Total customers
-    customers_result = await db.execute(select(func.count(Customer.id)))
-    total_customers = customers_result.scalar() or 0
+    return AdminStats(
+        total_users=counters["users"],
+        total_customers=counters["customers"],
+        total_projects=counters["projects"],
+        total_documents=counters["documents"],
+    )
 
-    # Total projects
-    projects_result = await db.execute(select(func.count(Project.id)))
-    total_projects = projects_result.scalar() or 0
 
-    # Total documents
-    docs_result = await db.execute(select(func.count(Document.id)))
-    total_documents = docs_result.scalar() or 0
+@router.post("/stats/reconcile", response_model=AdminStats)
+async def reconcile_admin_stats(
+    admin: User = Depends(get_superadmin_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Recount every table into the stats counters (after out-of-ORM changes)."""
+    counters = await reconcile_counters(db)
 
     return AdminStats(
-        total_users=total_users,
-        total_customers=total_customers,
-        total_projects=total_projects,
-        total_documents=total_documents,
+        total_users=counters["users"],
+        total_customers=counters["customers"],
+        total_projects=counters["projects"],
+        total_documents=counters["documents"],
+    )
+
+
+def _user_rows_query():
+    """SELECT of (User, customer_uuid, customer_name) in one statement."""
+    return select(User, Customer.uuid, Customer.name).outerjoin(
+        Customer, User.customer_id == Customer.id
     )
 
 
+def _build_user_response(user: User, customer_uuid, customer_name) -> UserResponse:
+    user_dict = UserResponse.model_validate(user).model_dump()
+    if customer_uuid is not None:
+        user_dict["customer_uuid"] = customer_uuid
+        user_dict["customer_name"] = customer_name
+    return UserResponse(**user_dict)
+
+
 @router.get("/users", response_model=UserListResponse)
 async def list_users(
     page: int = Query(1, ge=1),
@@ -85,61 +104,53 @@ async def list_users(
     search: Optional[str] = None,
     role: Optional[str] = None,
     is_active: Optional[bool] = None,
+    cursor: Optional[str] = Query(
+        None,
+        description=(
+            "next_cursor of the previous page (replaces page); "
+            "not accepted with a ranked search"
+        ),
+    ),
+    count: CountMode = Query(
+        "exact", description="Total to return: exact, estimate or none"
+    ),
     admin: User = Depends(get_admin_user),
     db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
 ):
-    """List all users with pagination and filtering."""
-    # Build query with customer join
-    query = select(User).outerjoin(Customer, User.customer_id == Customer.id)
-    count_query = select(func.count(User.id))
+    """List all users with keyset pagination and filtering."""
+    db = read_your_writes(read_db, db, "users", "customers")
 
     # Apply filters
     filters: list[Any] = []
+    rank = None
     if search:
-        search_filter = User.email.ilike(f"%{search}%") | User.full_name.ilike(
-            f"%{search}%"
-        )
-        filters.append(search_filter)
+        filters.append(contains_filter(search, User.email, User.full_name))
+        rank = await similarity_rank(db, search, User.email, User.full_name)
     if role:
         filters.append(User.role == role)
     if is_active is not None:
         filters.append(User.is_active == is_active)
 
-    if filters:
-        query = query.where(and_(*filters))
-        count_query = count_query.where(and_(*filters))
-
-    # Get total count
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Apply pagination
-    offset = (page - 1) * per_page
-    query = query.order_by(User.created_at.desc()).offset(offset).limit(per_page)
+    total = await count_total(db, User, filters, count)
 
+    # Seek to the cursor (or page), or rank search results by relevance
+    query = apply_page(
+        _user_rows_query().where(*filters), User, page, per_page, cursor, rank
+    )
     result = await db.execute(query)
-    users = result.scalars().all()
-
-    # Populate customer data for each user
-    user_responses = []
-    for user in users:
-        user_dict = UserResponse.model_validate(user).model_dump()
-        if user.customer_id:
-            # Fetch customer to get UUID and name
-            customer_result = await db.execute(
-                select(Customer).where(Customer.id == user.customer_id)
-            )
-            customer = customer_result.scalar_one_or_none()
-            if customer:
-                user_dict["customer_uuid"] = customer.uuid
-                user_dict["customer_name"] = customer.name
-        user_responses.append(UserResponse(**user_dict))
+    rows, next_cursor = split_page(
+        result.all(),
+        per_page,
+        (lambda row: (row[0].created_at, row[0].id)) if rank is None else None,
+    )
 
     return UserListResponse(
-        users=user_responses,
+        users=[_build_user_response(*row) for row in rows],
         total=total,
         page=page,
         per_page=per_page,
+        next_cursor=next_cursor,
     )
 
 
@@ -150,26 +161,15 @@ async def get_user(
     db: AsyncSession = Depends(get_db),
 ):
     """Get a specific user by UUID."""
-    result = await db.execute(select(User).where(User.uuid == user_uuid))
-    user = result.scalar_one_or_none()
-    if user is None:
+    result = await db.execute(_user_rows_query().where(User.uuid == user_uuid))
+    row = result.one_or_none()
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
 
-    # Populate customer data
-    user_dict = UserResponse.model_validate(user).model_dump()
-    if user.customer_id:
-        customer_result = await db.execute(
-            select(Customer).where(Customer.id == user.customer_id)
-        )
-        customer = customer_result.scalar_one_or_none()
-        if customer:
-            user_dict["customer_uuid"] = customer.uuid
-            user_dict["customer_name"] = customer.name
-
-    return UserResponse(**user_dict)
+    return _build_user_response(*row)
 
 
 @router.patch("/users/{user_uuid}", response_model=UserResponse)
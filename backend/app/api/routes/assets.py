@@ -0,0 +1,69 @@
+"""Public branding assets (logos, avatars) behind signed URLs."""
+
+import time
+from uuid import UUID
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+
+from app.core.security import PUBLIC_ASSET_PREFIX, verify_asset_signature
+from app.services.images import logo_response
+from app.services.storage import avatar_key, storage_response
+
+router = APIRouter(prefix=PUBLIC_ASSET_PREFIX)
+
+
+def _verify_request(request: Request, expires: int, signature: str) -> str:
+    """
+    Check the URL signature and return the Cache-Control header to send.
+
+    Asset URLs never change content (they carry a version or a unique
+    filename), so responses are public and immutable until the URL expires.
+    """
+    if not verify_asset_signature(request.url.path, expires, signature):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or expired asset signature",
+        )
+    max_age = max(0, expires - int(time.time()))
+    return f"public, max-age={max_age}, immutable"
+
+
+@router.get("/logos/{project_uuid}/{version}.png")
+async def get_logo_asset(
+    project_uuid: UUID,
+    version: str,
+    expires: int,
+    signature: str,
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, le=4096, description="Display width in pixels"),
+):
+    """
+    Serve a project logo from a signed URL (no database access).
+
+    The variant (width, WebP or PNG) is negotiated from `w` and Accept.
+    """
+    cache_control = _verify_request(request, expires, signature)
+    return await logo_response(
+        request, str(project_uuid), version, width=w, cache_control=cache_control
+    )
+
+
+@router.get("/avatars/{file_id}.gab")
+async def get_avatar_asset(
+    file_id: UUID,
+    expires: int,
+    signature: str,
+    request: Request,
+):
+    """Serve an avatar GAB file from a signed URL (no database access)."""
+    cache_control = _verify_request(request, expires, signature)
+    return await storage_response(
+        request,
+        avatar_key(f"{file_id}.gab"),
+        media_type="application/octet-stream",
+        etag=f'"{file_id}"',
+        cache_control=cache_control,
+        not_found="Avatar file not found",
+    )
@@ -16,6 +16,7 @@ from app.schemas.auth import (
     UserResponse,
 )
 from app.services import auth as auth_service
+from app.services.passwords import check_login_rate
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -48,6 +49,9 @@ async def login(
     db: AsyncSession = Depends(get_db),
 ):
     """Login and receive access and refresh tokens."""
+    ip_address = request.client.host if request.client else None
+    check_login_rate(ip_address, data.email)
+
     user = await auth_service.authenticate_user(db, data.email, data.password)
     if user is None:
         raise HTTPException(
@@ -57,7 +61,6 @@ async def login(
 
     # Get client info
     device_info = request.headers.get("User-Agent", "")[:255]
-    ip_address = request.client.host if request.client else None
 
     # Create session and tokens
     access_token, refresh_token = await auth_service.create_session(
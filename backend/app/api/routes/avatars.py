@@ -3,17 +3,24 @@
 from pathlib import Path
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
 from app.core.database import get_db
 from app.core.deps import get_admin_user, get_current_user
+from app.core.security import sign_asset_path
 from app.models.user import User
 from app.models.project import Project
 from app.models.avatar import Avatar
-from app.services.storage import save_avatar_file, get_avatar_path
+from app.services.storage import (
+    save_avatar_file,
+    get_storage,
+    avatar_key,
+    avatar_asset_path,
+    storage_response,
+    FileTooLargeError,
+)
 from app.schemas.avatar import AvatarResponse, AvatarListResponse
 
 
@@ -23,6 +30,9 @@ customer_router = APIRouter(prefix="/customer/avatars", tags=["customer", "avata
 # File size limit: 50MB
 MAX_FILE_SIZE = 50 * 1024 * 1024
 
+# Avatar files are immutable (a new upload gets a new UUID)
+AVATAR_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
 
 async def _build_avatar_response(avatar: Avatar) -> dict:
     """Helper to build avatar response."""
@@ -33,12 +43,64 @@ async def _build_avatar_response(avatar: Avatar) -> dict:
         "filename": avatar.filename,
         "original_filename": avatar.original_filename,
         "file_size": avatar.file_size,
+        "url": sign_asset_path(avatar_asset_path(avatar.filename)),
         "is_active": avatar.is_active,
         "created_at": avatar.created_at,
         "updated_at": avatar.updated_at,
     }
 
 
+async def _get_customer_avatar(avatar_uuid: UUID, user: User, db: AsyncSession) -> Avatar:
+    """Load an avatar and check that its project belongs to the user's customer."""
+    if not user.customer_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User is not associated with a customer"
+        )
+
+    # One query for the avatar and its owning customer
+    result = await db.execute(
+        select(Avatar, Project.customer_id)
+        .join(Project, Avatar.project_id == Project.id)
+        .where(Avatar.uuid == avatar_uuid)
+    )
+    row = result.one_or_none()
+
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Avatar not found"
+        )
+
+    avatar, customer_id = row
+    if customer_id != user.customer_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+
+    return avatar
+
+
+async def _avatar_file_response(request: Request, avatar: Avatar):
+    """
+    Stream an avatar file with Range support.
+
+    Stored filenames are UUIDs that are never rewritten, so the avatar UUID
+    is a strong ETag and the response can be cached as immutable.
+    """
+    return await storage_response(
+        request,
+        avatar_key(avatar.filename),
+        media_type="application/octet-stream",
+        filename=avatar.original_filename,
+        disposition="attachment",
+        etag=f'"{avatar.uuid}"',
+        cache_control=AVATAR_CACHE_CONTROL,
+        not_found="Avatar file not found",
+    )
+
+
 # Admin endpoints
 @router.post("/projects/{project_uuid}/upload", response_model=AvatarResponse, status_code=status.HTTP_201_CREATED)
 async def upload_avatar_admin(
@@ -64,23 +126,17 @@ async def upload_avatar_admin(
             detail="Project not found"
         )
 
-    # Check file size
-    file_size = 0
-    content = await file.read()
-    file_size = len(content)
-    
-    if file_size > MAX_FILE_SIZE:
+    # Stream file to disk, enforcing the size limit while copying
+    try:
+        stored_filename, original_filename, file_size = await save_avatar_file(
+            file, max_size=MAX_FILE_SIZE
+        )
+    except FileTooLargeError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"File size exceeds maximum of {MAX_FILE_SIZE / 1024 / 1024}MB"
         )
 
-    # Reset file pointer
-    await file.seek(0)
-
-    # Save file
-    stored_filename, original_filename = await save_avatar_file(file)
-
     # Create avatar record
     avatar = Avatar(
         project_id=project.id,
@@ -144,9 +200,7 @@ async def delete_avatar_admin(
         )
 
     # Delete physical file
-    file_path = get_avatar_path(avatar.filename)
-    if file_path.exists():
-        file_path.unlink()
+    await get_storage().delete(avatar_key(avatar.filename))
 
     # Delete from database
     await db.delete(avatar)
@@ -158,6 +212,7 @@ async def delete_avatar_admin(
 @router.get("/{avatar_uuid}/download")
 async def download_avatar_admin(
     avatar_uuid: UUID,
+    request: Request,
     admin: User = Depends(get_admin_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -171,24 +226,7 @@ async def download_avatar_admin(
             detail="Avatar not found"
         )
 
-    file_path = get_avatar_path(avatar.filename)
-    if not file_path.exists():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Avatar file not found"
-        )
-
-    # Read file content
-    with open(file_path, "rb") as f:
-        content = f.read()
-
-    return Response(
-        content=content,
-        media_type="application/octet-stream",
-        headers={
-            "Content-Disposition": f'attachment; filename="{avatar.original_filename}"'
-        }
-    )
+    return await _avatar_file_response(request, avatar)
 
 
 # Customer endpoints
@@ -228,23 +266,17 @@ async def upload_avatar_customer(
             detail="Access denied"
         )
 
-    # Check file size
-    file_size = 0
-    content = await file.read()
-    file_size = len(content)
-    
-    if file_size > MAX_FILE_SIZE:
+    # Stream file to disk, enforcing the size limit while copying
+    try:
+        stored_filename, original_filename, file_size = await save_avatar_file(
+            file, max_size=MAX_FILE_SIZE
+        )
+    except FileTooLargeError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"File size exceeds maximum of {MAX_FILE_SIZE / 1024 / 1024}MB"
         )
 
-    # Reset file pointer
-    await file.seek(0)
-
-    # Save file
-    stored_filename, original_filename = await save_avatar_file(file)
-
     # Create avatar record
     avatar = Avatar(
         project_id=project.id,
@@ -310,35 +342,10 @@ async def delete_avatar_customer(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete an avatar (customer only, must own project)."""
-    if not user.customer_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User is not associated with a customer"
-        )
-
-    result = await db.execute(select(Avatar).where(Avatar.uuid == avatar_uuid))
-    avatar = result.scalar_one_or_none()
-
-    if not avatar:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Avatar not found"
-        )
-
-    # Verify project belongs to customer
-    project_result = await db.execute(select(Project).where(Project.id == avatar.project_id))
-    project = project_result.scalar_one_or_none()
-    
-    if not project or project.customer_id != user.customer_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
+    avatar = await _get_customer_avatar(avatar_uuid, user, db)
 
     # Delete physical file
-    file_path = get_avatar_path(avatar.filename)
-    if file_path.exists():
-        file_path.unlink()
+    await get_storage().delete(avatar_key(avatar.filename))
 
     # Delete from database
     await db.delete(avatar)
@@ -350,50 +357,10 @@ async def delete_avatar_customer(
 @customer_router.get("/{avatar_uuid}/download")
 async def download_avatar_customer(
     avatar_uuid: UUID,
+    request: Request,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Download an avatar file (customer only, must own project)."""
-    if not user.customer_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User is not associated with a customer"
-        )
-
-    result = await db.execute(select(Avatar).where(Avatar.uuid == avatar_uuid))
-    avatar = result.scalar_one_or_none()
-
-    if not avatar:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Avatar not found"
-        )
-
-    # Verify project belongs to customer
-    project_result = await db.execute(select(Project).where(Project.id == avatar.project_id))
-    project = project_result.scalar_one_or_none()
-    
-    if not project or project.customer_id != user.customer_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
-
-    file_path = get_avatar_path(avatar.filename)
-    if not file_path.exists():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Avatar file not found"
-        )
-
-    # Read file content
-    with open(file_path, "rb") as f:
-        content = f.read()
-
-    return Response(
-        content=content,
-        media_type="application/octet-stream",
-        headers={
-            "Content-Disposition": f'attachment; filename="{avatar.original_filename}"'
-        }
-    )
+    avatar = await _get_customer_avatar(avatar_uuid, user, db)
+    return await _avatar_file_response(request, avatar)
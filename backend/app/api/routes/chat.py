@@ -6,11 +6,17 @@ from pydantic import BaseModel
 from typing import Optional
 from uuid import UUID
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.core.deps import get_current_user_optional, get_current_user
-from app.services.chat import generate_response
+from app.core.deps import get_current_tenant, get_current_user
+from app.services.chat import (
+    generate_response,
+    generate_spoken_response,
+    get_project_voice,
+)
 from app.models.chat_message import ChatMessage
 from app.models.user import User
+from app.services.tenants import Tenant
 
 
 router = APIRouter()
@@ -18,11 +24,15 @@ router = APIRouter()
 
 class ChatRequest(BaseModel):
     query: str
-    project_id: int | None = None  # For multi-tenant isolation
+    project_id: int | None = None  # For multi-tenant isolation (default: tenant)
     document_id: int | None = None
     session_id: str | None = None  # Optional session grouping
 
 
+class SpeakRequest(ChatRequest):
+    voice: str | None = None  # Defaults to the project's voice
+
+
 class ChatMessageResponse(BaseModel):
     id: int
     role: str
@@ -41,6 +51,13 @@ class SaveMessageRequest(BaseModel):
     document_filter_id: int | None = None
 
 
+def _project_id(request: ChatRequest, tenant: Tenant | None) -> int | None:
+    """The project to scope retrieval to: explicit, else the request's tenant."""
+    if request.project_id is not None:
+        return request.project_id
+    return tenant.project_id if tenant is not None else None
+
+
 @router.get("/history")
 async def get_chat_history(
     session_id: Optional[str] = None,
@@ -122,40 +139,74 @@ async def clear_chat_history(
 @router.post("/")
 async def chat(
     request: ChatRequest,
-    db: AsyncSession = Depends(get_db),
-    current_user: User | None = Depends(get_current_user_optional),
+    tenant: Tenant | None = Depends(get_current_tenant),
 ):
     """
     Chat with your documents using RAG.
 
-    For multi-tenant security, pass project_id to scope retrieval.
+    For multi-tenant security, pass project_id to scope retrieval; on a
+    tenant subdomain it defaults to that tenant's project.
     Retrieves relevant chunks from uploaded documents and generates
-    a response using the local LLM (Ollama).
+    a response using the local LLM (Ollama). The endpoint takes no database
+    session: retrieval uses its own, released before the answer streams.
     """
     return StreamingResponse(
         generate_response(
             request.query,
-            db,
-            project_id=request.project_id,
+            project_id=_project_id(request, tenant),
+            document_id=request.document_id,
+        ),
+        media_type="text/event-stream",
+    )
+
+
+@router.post("/speak")
+async def chat_speak(
+    request: SpeakRequest,
+    tenant: Tenant | None = Depends(get_current_tenant),
+):
+    """
+    Chat with spoken answers, streamed as server-sent events.
+
+    Sentences are synthesized while the LLM is still generating, so audio
+    for the first sentence arrives long before the answer is complete.
+    See generate_spoken_response for the event format.
+    """
+    project_id = _project_id(request, tenant)
+    voice = request.voice
+    if voice is None and tenant is not None and tenant.project_id == project_id:
+        voice = tenant.voice
+    elif voice is None and project_id is not None:
+        voice = await get_project_voice(project_id)
+
+    return StreamingResponse(
+        generate_spoken_response(
+            request.query,
+            voice=voice or settings.tts_voice,
+            project_id=project_id,
             document_id=request.document_id,
         ),
         media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 @router.post("/query")
-async def chat_query(request: ChatRequest, db: AsyncSession = Depends(get_db)):
+async def chat_query(
+    request: ChatRequest,
+    tenant: Tenant | None = Depends(get_current_tenant),
+):
     """
     Non-streaming chat endpoint.
 
-    For multi-tenant security, pass project_id to scope retrieval.
+    For multi-tenant security, pass project_id to scope retrieval; on a
+    tenant subdomain it defaults to that tenant's project.
     Returns the complete response after generation.
     """
     response_parts = []
     async for chunk in generate_response(
         request.query,
-        db,
-        project_id=request.project_id,
+        project_id=_project_id(request, tenant),
         document_id=request.document_id,
     ):
         response_parts.append(chunk)
@@ -5,9 +5,9 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, read_your_writes
 from app.core.deps import get_admin_user
 from app.models.user import User
 from app.models.customer import Customer
@@ -18,71 +18,90 @@ from app.schemas.customer import (
     CustomerResponse,
     CustomerListResponse,
 )
+from app.services.aggregates import count_by
+from app.services.pagination import CountMode, apply_page, count_total, split_page
+from app.services.search import contains_filter, similarity_rank
 
 
 router = APIRouter(prefix="/admin/customers", tags=["admin", "customers"])
 
 
+def _build_customer_response(customer: Customer, projects_count: int) -> CustomerResponse:
+    """Helper to build customer response with its projects count."""
+    return CustomerResponse(
+        id=customer.id,
+        uuid=customer.uuid,
+        name=customer.name,
+        contact_name=customer.contact_name,
+        contact_phone=customer.contact_phone,
+        email=customer.email,
+        is_active=customer.is_active,
+        created_at=customer.created_at,
+        updated_at=customer.updated_at,
+        projects_count=projects_count,
+    )
+
+
+async def _projects_count(db: AsyncSession, customer: Customer) -> int:
+    return (await count_by(db, Project.customer_id, [customer.id]))[customer.id]
+
+
 @router.get("", response_model=CustomerListResponse)
 async def list_customers(
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
     search: Optional[str] = Query(None, description="Search by name"),
+    cursor: Optional[str] = Query(
+        None,
+        description=(
+            "next_cursor of the previous page (replaces page); "
+            "not accepted with a ranked search"
+        ),
+    ),
+    count: CountMode = Query(
+        "exact", description="Total to return: exact, estimate or none"
+    ),
     admin: User = Depends(get_admin_user),
     db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
 ):
-    """List all customers with pagination and search."""
-    # Build query
-    query = select(Customer)
-    count_query = select(func.count(Customer.id))
+    """List all customers with keyset pagination and search."""
+    db = read_your_writes(read_db, db, "customers", "projects")
 
     # Apply search filter
+    filters = []
+    rank = None
     if search:
-        search_filter = Customer.name.ilike(f"%{search}%")
-        query = query.where(search_filter)
-        count_query = count_query.where(search_filter)
-
-    # Get total count
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
+        filters.append(contains_filter(search, Customer.name))
+        rank = await similarity_rank(db, search, Customer.name)
 
-    # Apply pagination and ordering
-    query = query.order_by(Customer.created_at.desc())
-    query = query.offset((page - 1) * per_page).limit(per_page)
+    total = await count_total(db, Customer, filters, count)
 
-    # Execute query
+    # Seek to the cursor (or page), or rank search results by relevance
+    query = apply_page(
+        select(Customer).where(*filters), Customer, page, per_page, cursor, rank
+    )
     result = await db.execute(query)
-    customers = list(result.scalars().all())
-
-    # Add projects count for each customer
-    customer_responses = []
-    for customer in customers:
-        # Count projects for this customer
-        projects_count_result = await db.execute(
-            select(func.count(Project.id)).where(Project.customer_id == customer.id)
-        )
-        projects_count = projects_count_result.scalar() or 0
-
-        # Create response with projects count
-        customer_dict = {
-            "id": customer.id,
-            "uuid": customer.uuid,
-            "name": customer.name,
-            "contact_name": customer.contact_name,
-            "contact_phone": customer.contact_phone,
-            "email": customer.email,
-            "is_active": customer.is_active,
-            "created_at": customer.created_at,
-            "updated_at": customer.updated_at,
-            "projects_count": projects_count,
-        }
-        customer_responses.append(CustomerResponse(**customer_dict))
+    customers, next_cursor = split_page(
+        result.scalars().all(),
+        per_page,
+        (lambda c: (c.created_at, c.id)) if rank is None else None,
+    )
+
+    # Projects count for the whole page in one grouped query
+    projects_counts = await count_by(
+        db, Project.customer_id, [customer.id for customer in customers]
+    )
 
     return CustomerListResponse(
-        customers=customer_responses,
+        customers=[
+            _build_customer_response(customer, projects_counts[customer.id])
+            for customer in customers
+        ],
         total=total,
         page=page,
         per_page=per_page,
+        next_cursor=next_cursor,
     )
 
 
@@ -102,27 +121,7 @@ async def get_customer(
             detail="Customer not found",
         )
 
-    # Count projects
-    projects_count_result = await db.execute(
-        select(func.count(Project.id)).where(Project.customer_id == customer.id)
-    )
-    projects_count = projects_count_result.scalar() or 0
-
-    # Create response
-    customer_dict = {
-        "id": customer.id,
-        "uuid": customer.uuid,
-        "name": customer.name,
-        "contact_name": customer.contact_name,
-        "contact_phone": customer.contact_phone,
-        "email": customer.email,
-        "is_active": customer.is_active,
-        "created_at": customer.created_at,
-        "updated_at": customer.updated_at,
-        "projects_count": projects_count,
-    }
-
-    return CustomerResponse(**customer_dict)
+    return _build_customer_response(customer, await _projects_count(db, customer))
 
 
 @router.post("", response_model=CustomerResponse, status_code=status.HTTP_201_CREATED)
@@ -145,21 +144,7 @@ async def create_customer(
     await db.commit()
     await db.refresh(customer)
 
-    # Return response
-    customer_dict = {
-        "id": customer.id,
-        "uuid": customer.uuid,
-        "name": customer.name,
-        "contact_name": customer.contact_name,
-        "contact_phone": customer.contact_phone,
-        "email": customer.email,
-        "is_active": customer.is_active,
-        "created_at": customer.created_at,
-        "updated_at": customer.updated_at,
-        "projects_count": 0,
-    }
-
-    return CustomerResponse(**customer_dict)
+    return _build_customer_response(customer, 0)
 
 
 @router.patch("/{customer_uuid}", response_model=CustomerResponse)
@@ -194,27 +179,7 @@ async def update_customer(
     await db.commit()
     await db.refresh(customer)
 
-    # Count projects
-    projects_count_result = await db.execute(
-        select(func.count(Project.id)).where(Project.customer_id == customer.id)
-    )
-    projects_count = projects_count_result.scalar() or 0
-
-    # Create response
-    customer_dict = {
-        "id": customer.id,
-        "uuid": customer.uuid,
-        "name": customer.name,
-        "contact_name": customer.contact_name,
-        "contact_phone": customer.contact_phone,
-        "email": customer.email,
-        "is_active": customer.is_active,
-        "created_at": customer.created_at,
-        "updated_at": customer.updated_at,
-        "projects_count": projects_count,
-    }
-
-    return CustomerResponse(**customer_dict)
+    return _build_customer_response(customer, await _projects_count(db, customer))
 
 
 @router.delete("/{customer_uuid}", status_code=status.HTTP_204_NO_CONTENT)
@@ -233,17 +198,7 @@ async def delete_customer(
             detail="Customer not found",
         )
 
-    # Check if customer has projects
-    projects_count_result = await db.execute(
-        select(func.count(Project.id)).where(Project.customer_id == customer.id)
-    )
-    projects_count = projects_count_result.scalar() or 0
-
-    if projects_count > 0:
-        # This is just a warning in the API response headers, not blocking deletion
-        # The cascade delete will handle cleanup
-        pass
-
+    # Projects (and their documents) are removed by the cascade
     await db.delete(customer)
     await db.commit()
 
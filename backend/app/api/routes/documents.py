@@ -1,13 +1,35 @@
 from pathlib import Path
 from uuid import UUID
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, BackgroundTasks
-from sqlalchemy import select
+from fastapi import (
+    APIRouter,
+    UploadFile,
+    File,
+    Depends,
+    HTTPException,
+    BackgroundTasks,
+    Request,
+)
+from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import (
+    advisory_xact_lock,
+    get_db,
+    get_read_db,
+    read_your_writes,
+)
+from app.core.deps import get_current_tenant
 from app.models import Document
-from app.services.storage import save_uploaded_file, get_file_path
+from app.services.storage import (
+    save_uploaded_file,
+    get_storage,
+    document_key,
+    storage_response,
+    FileTooLargeError,
+)
 from app.services.processor import process_document
+from app.services.retrieval import documents_key
+from app.services.tenants import Tenant
 
 
 router = APIRouter()
@@ -15,6 +37,13 @@ router = APIRouter()
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {".pdf", ".docx", ".txt", ".md"}
 
+# File size limit: 250MB
+MAX_FILE_SIZE = 250 * 1024 * 1024
+
+# Document content never changes for a UUID; revalidate hourly so deletions
+# take effect
+DOCUMENT_CACHE_CONTROL = "private, max-age=3600"
+
 
 def document_to_dict(doc: Document) -> dict:
     """Convert document to API response dict."""
@@ -26,22 +55,37 @@ def document_to_dict(doc: Document) -> dict:
         "error_message": doc.error_message,
         "file_size": doc.file_size,
         "content_type": doc.content_type,
+        "content_hash": doc.content_hash,
         "created_at": doc.created_at.isoformat() if doc.created_at else None,
         "updated_at": doc.updated_at.isoformat() if doc.updated_at else None,
     }
 
 
+def content_lock_key(content_hash: str) -> str:
+    """Advisory lock key serializing reuse and deletion of a stored file."""
+    return f"document-content:{content_hash}"
+
+
 @router.get("/")
 async def list_documents(
-    project_id: int | None = None, db: AsyncSession = Depends(get_db)
+    project_id: int | None = None,
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
+    tenant: Tenant | None = Depends(get_current_tenant),
 ):
     """
     List all uploaded documents with their status.
 
-    For multi-tenant security, pass project_id to filter documents.
+    For multi-tenant security, pass project_id to filter documents; on a
+    tenant subdomain it defaults to that tenant's project.
     """
     query = select(Document).order_by(Document.created_at.desc())
 
+    if project_id is None and tenant is not None:
+        project_id = tenant.project_id
+    # Just-uploaded documents may not have reached the replica yet
+    db = read_your_writes(read_db, db, documents_key(project_id))
+
     if project_id is not None:
         query = query.where(Document.project_id == project_id)
 
@@ -63,34 +107,38 @@ async def get_document_by_uuid(uuid: UUID, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/by-uuid/{uuid}/content")
-async def get_document_content(uuid: UUID, db: AsyncSession = Depends(get_db)):
-    """Serve the document file by UUID."""
-    from fastapi.responses import Response
+async def get_document_content(
+    uuid: UUID, request: Request, db: AsyncSession = Depends(get_db)
+):
+    """
+    Serve the document file by UUID.
 
+    Supports Range requests so PDF viewers can load pages lazily. The ETag
+    is the content hash, so revalidation is answered with 304.
+    """
     result = await db.execute(select(Document).where(Document.uuid == uuid))
     document = result.scalar_one_or_none()
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    file_path = get_file_path(document.filename)
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Document file not found")
-
-    # Read file content
-    with open(file_path, "rb") as f:
-        content = f.read()
-
     # Build headers with CORS
     headers = {
         "Access-Control-Allow-Origin": "*",
         "Access-Control-Allow-Credentials": "true",
-        "Content-Disposition": f'inline; filename="{document.original_filename}"',
+        "Access-Control-Expose-Headers": (
+            "Accept-Ranges, Content-Length, Content-Range, ETag"
+        ),
     }
 
-    return Response(
-        content=content,
+    return await storage_response(
+        request,
+        document_key(document.filename),
         media_type=document.content_type,
+        filename=document.original_filename,
+        etag=f'"{document.content_hash}"' if document.content_hash else None,
+        cache_control=DOCUMENT_CACHE_CONTROL,
         headers=headers,
+        not_found="Document file not found",
     )
 
 
@@ -138,11 +186,26 @@ async def upload_document(
             detail=f"Unsupported file type: {ext}. Allowed: {', '.join(ALLOWED_EXTENSIONS)}",
         )
 
-    # Save file to disk
-    stored_filename, original_filename = await save_uploaded_file(file)
-
-    # Get file size
-    file_size = file.size or 0
+    async def lock_content(content_hash: str) -> None:
+        # Held until the document row commits, so a concurrent delete of the
+        # last other reference cannot remove the stored file we reuse
+        await advisory_xact_lock(db, content_lock_key(content_hash))
+
+    # Stream file to disk (deduplicated by content hash)
+    try:
+        (
+            stored_filename,
+            original_filename,
+            content_hash,
+            file_size,
+        ) = await save_uploaded_file(
+            file, max_size=MAX_FILE_SIZE, lock=lock_content
+        )
+    except FileTooLargeError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File size exceeds maximum of {MAX_FILE_SIZE / 1024 / 1024}MB",
+        )
 
     # Create document record with project_id
     document = Document(
@@ -150,6 +213,7 @@ async def upload_document(
         original_filename=original_filename,
         content_type=file.content_type or "application/octet-stream",
         file_size=file_size,
+        content_hash=content_hash,
         status="pending",
         project_id=project_id,  # Associate with project
     )
@@ -190,13 +254,23 @@ async def delete_document(document_id: int, db: AsyncSession = Depends(get_db)):
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    # Delete physical file
-    file_path = get_file_path(document.filename)
-    if file_path.exists():
-        file_path.unlink()
+    filename, content_hash = document.filename, document.content_hash
 
     # Delete from database (cascades to chunks)
     await db.delete(document)
     await db.commit()
 
+    # Delete physical file unless another document shares it. Counted after
+    # the commit, so concurrent deletes of the last two references cannot
+    # both see the other one and leave the file behind, and under the
+    # upload's lock, so an upload reusing the file cannot lose it.
+    if content_hash is not None:
+        await advisory_xact_lock(db, content_lock_key(content_hash))
+    references_result = await db.execute(
+        select(func.count(Document.id)).where(Document.filename == filename)
+    )
+    if not references_result.scalar():
+        await get_storage().delete(document_key(filename))
+    await db.commit()
+
     return {"message": "Document deleted", "id": document_id}
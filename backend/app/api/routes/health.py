@@ -2,7 +2,8 @@ from fastapi import APIRouter, Depends
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, pool_stats
+from app.services.passwords import password_pool_stats
 
 
 router = APIRouter()
@@ -20,3 +21,15 @@ async def db_health_check(db: AsyncSession = Depends(get_db)):
         return {"status": "healthy", "database": "connected"}
     except Exception as e:
         return {"status": "unhealthy", "database": str(e)}
+
+
+@router.get("/health/password-hashing")
+async def password_hashing_health():
+    """Queue depth and throughput of the bcrypt worker pool."""
+    return password_pool_stats()
+
+
+@router.get("/health/db-pool")
+async def db_pool_health():
+    """Utilization of this process's database connection pool."""
+    return pool_stats()
@@ -1,74 +1,66 @@
 """Project management API routes (admin only)."""
 
+import logging
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    status,
+    Query,
+    Request,
+    UploadFile,
+    File,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, read_your_writes
 from app.core.deps import get_admin_user, get_current_user
 from app.models.user import User
 from app.models.customer import Customer
 from app.models.project import Project
-from app.models.document import Document
 from app.schemas.project import (
     ProjectCreate,
     ProjectUpdate,
     ProjectResponse,
     ProjectListResponse,
 )
-from app.services.storage import save_logo_file, get_logo_path
+from app.services.storage import (
+    save_logo_file,
+    logo_asset_path,
+    logo_asset_version,
+    logo_version,
+    FileTooLargeError,
+)
+from app.services.images import (
+    delete_logo_version,
+    generate_logo_variants,
+    logo_response,
+)
+from app.services.embedding import resolve_embedding_model
+from app.services.processor import switch_project_embedding_model
+from app.services.pagination import CountMode, apply_page, count_total, split_page
+from app.services.projects import (
+    PROJECT_RESPONSE_TABLES,
+    fetch_project_responses,
+    get_project_response,
+    list_project_responses,
+    project_rows_query,
+)
+from app.services.search import contains_filter, similarity_rank
+
+logger = logging.getLogger(__name__)
 
 
 router = APIRouter(prefix="/admin/projects", tags=["admin", "projects"])
 customer_router = APIRouter(prefix="/customer/projects", tags=["customer", "projects"])
 
-
-async def _build_project_response(project: Project, db: AsyncSession) -> dict:
-    """Helper to build project response with counts and customer name."""
-    # Count documents
-    docs_count_result = await db.execute(
-        select(func.count(Document.id)).where(Document.project_id == project.id)
-    )
-    documents_count = docs_count_result.scalar() or 0
-
-    # Get customer name and uuid
-    customer_result = await db.execute(
-        select(Customer.name, Customer.uuid).where(Customer.id == project.customer_id)
-    )
-    customer_data = customer_result.one_or_none()
-    customer_name = customer_data[0] if customer_data else None
-    customer_uuid = customer_data[1] if customer_data else None
-
-    return {
-        "id": project.id,
-        "uuid": project.uuid,
-        "customer_id": project.customer_id,
-        "name": project.name,
-        "slug": project.slug,
-        "description": project.description,
-        "subdomain": project.subdomain,
-        "logo": project.logo,
-        "title": project.title,
-        "subtitle": project.subtitle,
-        "body": project.body,
-        "color_primary": project.color_primary,
-        "color_secondary": project.color_secondary,
-        "color_background": project.color_background,
-        "avatar": project.avatar,
-        "voice": project.voice,
-        "return_link": project.return_link,
-        "return_link_text": project.return_link_text,
-        "is_active": project.is_active,
-        "created_at": project.created_at,
-        "updated_at": project.updated_at,
-        "documents_count": documents_count,
-        "customer_name": customer_name,
-        "customer_uuid": customer_uuid,
-    }
+# Logo file size limit: 5MB
+MAX_LOGO_SIZE = 5 * 1024 * 1024
 
 
 @router.get("", response_model=ProjectListResponse)
@@ -77,51 +69,51 @@ async def list_projects(
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
     customer_id: Optional[int] = Query(None, description="Filter by customer ID"),
     search: Optional[str] = Query(None, description="Search by name or subdomain"),
+    cursor: Optional[str] = Query(
+        None,
+        description=(
+            "next_cursor of the previous page (replaces page); "
+            "not accepted with a ranked search"
+        ),
+    ),
+    count: CountMode = Query(
+        "exact", description="Total to return: exact, estimate or none"
+    ),
     admin: User = Depends(get_admin_user),
     db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
 ):
-    """List all projects with pagination and filters."""
-    # Build query
-    query = select(Project)
-    count_query = select(func.count(Project.id))
+    """List all projects with keyset pagination and filters."""
+    db = read_your_writes(read_db, db, *PROJECT_RESPONSE_TABLES)
 
     # Apply filters
     filters = []
+    rank = None
     if customer_id:
         filters.append(Project.customer_id == customer_id)
     if search:
-        search_filter = Project.name.ilike(f"%{search}%") | Project.subdomain.ilike(
-            f"%{search}%"
-        )
-        filters.append(search_filter)
+        filters.append(contains_filter(search, Project.name, Project.subdomain))
+        rank = await similarity_rank(db, search, Project.name, Project.subdomain)
 
-    if filters:
-        query = query.where(and_(*filters))
-        count_query = count_query.where(and_(*filters))
+    total = await count_total(db, Project, filters, count)
 
-    # Get total count
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Apply pagination and ordering
-    query = query.order_by(Project.created_at.desc())
-    query = query.offset((page - 1) * per_page).limit(per_page)
-
-    # Execute query
-    result = await db.execute(query)
-    projects = list(result.scalars().all())
-
-    # Build responses
-    project_responses = []
-    for project in projects:
-        project_dict = await _build_project_response(project, db)
-        project_responses.append(ProjectResponse(**project_dict))
+    # One query for the page, including document counts and customer names;
+    # one extra row tells whether there is a next page
+    query = apply_page(
+        project_rows_query(*filters), Project, page, per_page, cursor, rank
+    )
+    project_dicts, next_cursor = split_page(
+        await fetch_project_responses(db, query),
+        per_page,
+        (lambda p: (p["created_at"], p["id"])) if rank is None else None,
+    )
 
     return ProjectListResponse(
-        projects=project_responses,
+        projects=[ProjectResponse(**project_dict) for project_dict in project_dicts],
         total=total,
         page=page,
         per_page=per_page,
+        next_cursor=next_cursor,
     )
 
 
@@ -132,16 +124,14 @@ async def get_project(
     db: AsyncSession = Depends(get_db),
 ):
     """Get a specific project by UUID."""
-    result = await db.execute(select(Project).where(Project.uuid == project_uuid))
-    project = result.scalar_one_or_none()
+    project_dict = await get_project_response(db, Project.uuid == project_uuid)
 
-    if not project:
+    if not project_dict:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found",
         )
 
-    project_dict = await _build_project_response(project, db)
     return ProjectResponse(**project_dict)
 
 
@@ -191,6 +181,7 @@ async def create_project(
         voice=data.voice,
         return_link=data.return_link,
         return_link_text=data.return_link_text,
+        embedding_model=data.embedding_model,
         is_active=True,
     )
 
@@ -198,7 +189,7 @@ async def create_project(
     await db.commit()
     await db.refresh(project)
 
-    project_dict = await _build_project_response(project, db)
+    project_dict = await get_project_response(db, Project.id == project.id)
     return ProjectResponse(**project_dict)
 
 
@@ -206,10 +197,18 @@ async def create_project(
 async def update_project(
     project_uuid: UUID,
     data: ProjectUpdate,
+    background_tasks: BackgroundTasks,
     admin: User = Depends(get_admin_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Update a project."""
+    """
+    Update a project.
+
+    Switching embedding_model embeds the project's existing chunks with the
+    new model in the background. Until that completes the new model is
+    reported as pending_embedding_model and retrieval keeps using the old
+    one; repeating the request retries a failed backfill.
+    """
     result = await db.execute(select(Project).where(Project.uuid == project_uuid))
     project = result.scalar_one_or_none()
 
@@ -232,16 +231,46 @@ async def update_project(
 
     # Update fields
     update_data = data.model_dump(exclude_unset=True)
+    switch_embedding_model = False
+    if "embedding_model" in update_data:
+        embedding_model = update_data.pop("embedding_model")
+        if resolve_embedding_model(embedding_model) == resolve_embedding_model(
+            project.embedding_model
+        ):
+            # Nothing to embed; also cancels a pending switch
+            project.embedding_model = embedding_model
+            project.pending_embedding_model = None
+        else:
+            project.pending_embedding_model = resolve_embedding_model(embedding_model)
+            switch_embedding_model = True
     for field, value in update_data.items():
         setattr(project, field, value)
 
     await db.commit()
     await db.refresh(project)
 
-    project_dict = await _build_project_response(project, db)
+    if switch_embedding_model:
+        background_tasks.add_task(
+            embed_project_background, project.id, project.pending_embedding_model
+        )
+
+    project_dict = await get_project_response(db, Project.id == project.id)
     return ProjectResponse(**project_dict)
 
 
+async def embed_project_background(project_id: int, model: str):
+    """Background task to embed a project's chunks with its new model."""
+    from app.core.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        try:
+            await switch_project_embedding_model(project_id, model, db)
+        except Exception:
+            # Log error but don't raise (background task); the old model
+            # stays active and the new one pending
+            logger.exception("Error embedding project %s with %s", project_id, model)
+
+
 @router.delete("/{project_uuid}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_project(
     project_uuid: UUID,
@@ -271,40 +300,31 @@ async def list_customer_projects(
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
 ):
     """List projects for the current customer user."""
+    db = read_your_writes(read_db, db, *PROJECT_RESPONSE_TABLES)
+
     if not user.customer_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User is not associated with a customer",
         )
 
-    # Build query filtered by user's customer_id
-    query = select(Project).where(Project.customer_id == user.customer_id)
-    count_query = select(func.count(Project.id)).where(
-        Project.customer_id == user.customer_id
-    )
+    # Filter by user's customer_id
+    customer_filter = Project.customer_id == user.customer_id
+    count_query = select(func.count(Project.id)).where(customer_filter)
 
     # Get total count
     total_result = await db.execute(count_query)
     total = total_result.scalar() or 0
 
-    # Apply pagination and ordering
-    query = query.order_by(Project.created_at.desc())
-    query = query.offset((page - 1) * per_page).limit(per_page)
-
-    # Execute query
-    result = await db.execute(query)
-    projects = list(result.scalars().all())
-
-    # Build responses
-    project_responses = []
-    for project in projects:
-        project_dict = await _build_project_response(project, db)
-        project_responses.append(ProjectResponse(**project_dict))
+    project_dicts = await list_project_responses(
+        db, customer_filter, offset=(page - 1) * per_page, limit=per_page
+    )
 
     return ProjectListResponse(
-        projects=project_responses,
+        projects=[ProjectResponse(**project_dict) for project_dict in project_dicts],
         total=total,
         page=page,
         per_page=per_page,
@@ -324,24 +344,21 @@ async def get_customer_project(
             detail="User is not associated with a customer",
         )
 
-    result = await db.execute(select(Project).where(Project.uuid == project_uuid))
-    project = result.scalar_one_or_none()
+    project_dict = await get_project_response(db, Project.uuid == project_uuid)
 
-    if not project:
+    if not project_dict:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found",
         )
 
     # Verify the project belongs to the user's customer
-    if project.customer_id != user.customer_id:
+    if project_dict["customer_id"] != user.customer_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied",
         )
 
-
-    project_dict = await _build_project_response(project, db)
     return ProjectResponse(**project_dict)
 
 
@@ -408,13 +425,14 @@ async def update_customer_project(
     await db.commit()
     await db.refresh(project)
 
-    project_dict = await _build_project_response(project, db)
+    project_dict = await get_project_response(db, Project.id == project.id)
     return ProjectResponse(**project_dict)
 
 
 @customer_router.post("/{project_uuid}/logo")
 async def upload_project_logo(
     project_uuid: UUID,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
@@ -450,22 +468,41 @@ async def upload_project_logo(
         )
 
     # Save the logo file
-    filename = await save_logo_file(file, str(project_uuid))
+    try:
+        filename, content_hash = await save_logo_file(
+            file, str(project_uuid), max_size=MAX_LOGO_SIZE
+        )
+    except FileTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File size exceeds maximum of {MAX_LOGO_SIZE / 1024 / 1024}MB",
+        )
     
-    # Update project logo field
-    project.logo = f"/api/customer/projects/{project_uuid}/logo"
+    # Point the logo at the public asset URL (signed when returned)
+    previous_version = logo_asset_version(project.logo)
+    version = logo_version(content_hash)
+    project.logo = logo_asset_path(str(project_uuid), version)
     await db.commit()
 
+    # Resized/WebP variants are built off the request path
+    if previous_version and previous_version != version:
+        background_tasks.add_task(
+            delete_logo_version, str(project_uuid), previous_version
+        )
+    background_tasks.add_task(generate_logo_variants, str(project_uuid), version)
+
     return {"message": "Logo uploaded successfully", "filename": filename}
 
 
 @customer_router.get("/{project_uuid}/logo")
 async def get_project_logo(
     project_uuid: UUID,
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, le=4096, description="Display width in pixels"),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get the logo for a project."""
+    """Get the logo for a project (variant negotiated from Accept and `w`)."""
     if not user.customer_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -488,14 +525,10 @@ async def get_project_logo(
             detail="You do not have permission to access this project",
         )
 
-    # Get logo file path
-    logo_filename = f"{project_uuid}.png"
-    logo_path = get_logo_path(logo_filename)
-
-    if not logo_path.exists():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Logo not found",
-        )
-
-    return FileResponse(logo_path, media_type="image/png")
+    return await logo_response(
+        request,
+        str(project_uuid),
+        logo_asset_version(project.logo),
+        width=w,
+        cache_control="private, no-cache",
+    )
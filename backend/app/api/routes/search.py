@@ -0,0 +1,67 @@
+"""Admin search autocomplete API routes."""
+
+from typing import Literal
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db, get_read_db, read_your_writes
+from app.core.deps import get_admin_user
+from app.models.customer import Customer
+from app.models.project import Project
+from app.models.user import User
+from app.services.search import prefix_filter
+
+
+router = APIRouter(prefix="/admin/search", tags=["admin", "search"])
+
+# Autocomplete source -> (model, label column, columns matched by prefix)
+AUTOCOMPLETE_SOURCES = {
+    "users": (User, User.email, (User.email, User.full_name)),
+    "customers": (Customer, Customer.name, (Customer.name,)),
+    "projects": (Project, Project.name, (Project.name, Project.subdomain)),
+}
+
+
+class Suggestion(BaseModel):
+    """Schema for one autocomplete suggestion."""
+
+    uuid: UUID
+    label: str
+
+
+class AutocompleteResponse(BaseModel):
+    """Schema for autocomplete suggestions."""
+
+    suggestions: list[Suggestion]
+
+
+@router.get("/autocomplete", response_model=AutocompleteResponse)
+async def autocomplete(
+    q: str = Query(..., min_length=1, max_length=100, description="Prefix typed so far"),
+    source: Literal["users", "customers", "projects"] = Query(
+        ..., description="What to suggest"
+    ),
+    limit: int = Query(10, ge=1, le=50),
+    admin: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
+):
+    """Suggest users, customers or projects whose name starts with `q`."""
+    db = read_your_writes(read_db, db, source)
+    model, label, columns = AUTOCOMPLETE_SOURCES[source]
+
+    # Shortest matches first: the closest completions of the prefix
+    result = await db.execute(
+        select(model.uuid, label)
+        .where(prefix_filter(q, *columns))
+        .order_by(func.length(label), label)
+        .limit(limit)
+    )
+
+    return AutocompleteResponse(
+        suggestions=[Suggestion(uuid=uuid, label=text) for uuid, text in result.all()]
+    )
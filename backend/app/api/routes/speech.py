@@ -1,11 +1,29 @@
 """Speech API routes for transcription (STT) and synthesis (TTS)."""
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Request
+import asyncio
+
+from fastapi import (
+    APIRouter,
+    UploadFile,
+    File,
+    HTTPException,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.responses import Response, JSONResponse
-from pydantic import BaseModel
-
+from pydantic import BaseModel, ValidationError
+
+from app.core.config import settings
+from app.services.chat import (
+    NO_DOCUMENTS_MESSAGE,
+    RetrievalPrefetcher,
+    format_sources,
+    stream_answer,
+)
 from app.services.speech import (
     transcribe_audio,
+    transcribe_stream,
     synthesize_speech,
     synthesize_for_avatar,
 )
@@ -23,6 +41,13 @@ class SynthesizeRequest(BaseModel):
     voice: str | None = None
 
 
+class StreamStartMessage(BaseModel):
+    language: str | None = None
+    answer: bool = False  # Answer the final transcript over the same socket
+    project_id: int | None = None  # For multi-tenant isolation
+    document_id: int | None = None
+
+
 @router.post("/transcribe", response_model=TranscribeResponse)
 async def transcribe(
     audio: UploadFile = File(..., description="Audio file to transcribe"),
@@ -49,6 +74,96 @@ async def transcribe(
         raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
 
 
+@router.websocket("/stream")
+async def stream_transcription(websocket: WebSocket):
+    """
+    Streaming speech recognition over a WebSocket.
+
+    Protocol:
+    1. Client sends a JSON start message (StreamStartMessage).
+    2. Client sends audio frames (WebM/Opus) as binary messages, then
+       {"type": "end"} when the user stops speaking.
+    3. Server sends {"type": "interim", "transcript", "stable"} updates and
+       one {"type": "final", "transcript"}.
+    4. With "answer": true, retrieval already starts on a stable partial
+       transcript, and the answer follows as {"type": "token", "text"}
+       messages, then {"type": "sources", "text"} and {"type": "done"}.
+    """
+    await websocket.accept()
+
+    try:
+        start = StreamStartMessage.model_validate(await websocket.receive_json())
+    except (ValidationError, ValueError):
+        await websocket.send_json({"type": "error", "detail": "Invalid start message"})
+        await websocket.close()
+        return
+    except WebSocketDisconnect:
+        return
+
+    audio: asyncio.Queue = asyncio.Queue()
+
+    async def receive_audio() -> None:
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message.get("bytes"):
+                    await audio.put(message["bytes"])
+                elif message.get("text"):
+                    # Any text message ({"type": "end"}) ends the audio
+                    break
+        finally:
+            await audio.put(None)
+
+    async def audio_chunks():
+        while (chunk := await audio.get()) is not None:
+            yield chunk
+
+    receiver = asyncio.create_task(receive_audio())
+    prefetcher = RetrievalPrefetcher(start.project_id, start.document_id)
+    try:
+        transcript = ""
+        async for update in transcribe_stream(audio_chunks(), start.language):
+            transcript = update["transcript"]
+            if update["is_final"]:
+                break
+            stable = update["stability"] >= settings.stt_stable_partial_threshold
+            if stable and start.answer:
+                prefetcher.update(transcript)
+            await websocket.send_json(
+                {"type": "interim", "transcript": transcript, "stable": stable}
+            )
+
+        await websocket.send_json({"type": "final", "transcript": transcript})
+
+        if start.answer and transcript:
+            chunks = await prefetcher.result(transcript)
+            if chunks:
+                async for token in stream_answer(transcript, chunks):
+                    await websocket.send_json({"type": "token", "text": token})
+                await websocket.send_json(
+                    {"type": "sources", "text": "".join(format_sources(chunks))}
+                )
+            else:
+                await websocket.send_json(
+                    {"type": "token", "text": NO_DOCUMENTS_MESSAGE}
+                )
+            await websocket.send_json({"type": "done"})
+
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        await websocket.send_json(
+            {"type": "error", "detail": f"Transcription failed: {str(e)}"}
+        )
+        await websocket.close()
+    finally:
+        prefetcher.cancel()
+        receiver.cancel()
+
+
 @router.post("/synthesize")
 async def synthesize(request: SynthesizeRequest):
     """
@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.deps import get_current_user
-from app.core.security import hash_password, verify_password
+from app.services.passwords import hash_password, verify_password
 from app.models.user import User
 from app.schemas.auth import (
     UserResponse,
@@ -50,13 +50,13 @@ async def change_password(
     db: AsyncSession = Depends(get_db),
 ):
     """Change current user's password."""
-    if not verify_password(data.current_password, current_user.password_hash):
+    if not await verify_password(data.current_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect",
         )
 
-    current_user.password_hash = hash_password(data.new_password)
+    current_user.password_hash = await hash_password(data.new_password)
     await db.commit()
     return None
 
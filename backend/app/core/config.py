@@ -1,5 +1,6 @@
 from pathlib import Path
 
+from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -17,6 +18,23 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str
+    # Connection pool per process (ignored for SQLite)
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_seconds: float = 30
+    db_pool_recycle_seconds: int = 1800
+    # asyncpg prepared statements cached per connection
+    db_statement_cache_size: int = 500
+    # Server-side statement timeout (0 disables)
+    db_statement_timeout_ms: int = 30000
+    # Behind PgBouncer in transaction mode: no cached prepared statements
+    db_pgbouncer_mode: bool = False
+    # Read replica for retrieval and listings (unset: everything on primary)
+    database_read_url: str | None = None
+    # Reads go to the primary while the replica lags more than this, and for
+    # this long after this process commits related writes
+    replica_max_lag_seconds: float = 5
+    replica_lag_check_seconds: float = 5
 
     # API
     api_host: str = "0.0.0.0"
@@ -29,25 +47,93 @@ class Settings(BaseSettings):
     # Ollama Configuration
     ollama_base_url: str = "http://localhost:11434"
     embedding_model: str = "nomic-embed-text"
+    # Available embedding models as "name:dimensions" pairs
+    embedding_models: str = (
+        "nomic-embed-text:768,all-minilm:384,mxbai-embed-large:1024"
+    )
     llm_model: str = "llama3.2"
     chunk_size: int = 500
     chunk_overlap: int = 50
 
+    # Retrieval Configuration
+    # ANN index used for search: "full" (vector), "halfvec" or "binary".
+    # Quantized modes re-score top candidates against full-precision vectors;
+    # build a mode's indexes with scripts/build_vector_indexes.py before
+    # switching to it.
+    vector_index_mode: str = "full"
+    vector_rescore_factor: int = 4
+
     # Auth Configuration
     secret_key: str = "change-me-in-production-min-32-chars"
     access_token_expire_minutes: int = 15
     refresh_token_expire_days: int = 7
+    # Authenticated users are cached in-process for this long (0 disables).
+    # Changes made through the ORM invalidate the entry immediately; the TTL
+    # bounds staleness across worker processes.
+    user_cache_ttl_seconds: int = 30
+    user_cache_max_entries: int = 10000
+    # bcrypt cost factor for new hashes; with password_rehash_on_login,
+    # older hashes are upgraded transparently when the user logs in
+    bcrypt_rounds: int = 12
+    password_rehash_on_login: bool = False
+    # bcrypt runs in a bounded thread pool; calls beyond workers + queue get 503
+    password_hash_workers: int = 2
+    password_hash_max_queue: int = 32
+    # Login attempts allowed per minute per client IP and per email (0 disables)
+    login_rate_per_ip: int = 30
+    login_rate_per_email: int = 10
 
     # Initial Admin User (optional)
     admin_username: str | None = None
     admin_password: str | None = None
 
+    # File Storage ("local" or "s3"; s3 works with MinIO and other stand-ins)
+    storage_backend: str = "local"
+    s3_bucket: str | None = None
+    s3_prefix: str = ""
+    s3_endpoint_url: str | None = None
+    s3_region: str | None = None
+    s3_access_key_id: str | None = None
+    s3_secret_access_key: str | None = None
+    s3_multipart_chunk_mb: int = 8
+    storage_presign_expire_seconds: int = 3600
+    # Lifetime of signed public asset URLs (logos, avatars)
+    asset_url_expire_seconds: int = 7 * 24 * 3600
+
+    # Public project configuration cached per subdomain (0 disables)
+    tenant_cache_ttl_seconds: int = 60
+    tenant_cache_max_entries: int = 10000
+
+    # Worker processes for CPU-bound work (logo encoding, audio alignment).
+    # IMAGE_PROCESS_WORKERS, its former name, is still read.
+    worker_processes: int = Field(
+        2, validation_alias=AliasChoices("worker_processes", "image_process_workers")
+    )
+
     # Speech Configuration
+    speech_provider: str = "google"  # "google" or "fake" (offline, for tests)
     tts_voice: str = "en-US-Neural2-F"  # Google Cloud TTS voice
+    # Synthesized audio cache (disk LRU + in-memory hot tier)
+    tts_cache_enabled: bool = True
+    tts_cache_max_mb: int = 512
+    tts_cache_memory_mb: int = 32
+    # Streaming recognition: interim transcripts at least this stable (0-1)
+    # start retrieval before the user has finished speaking
+    stt_stable_partial_threshold: float = 0.8
+    # Sentences synthesized concurrently while streaming spoken answers
+    tts_stream_concurrency: int = 3
 
     @property
     def cors_origins_list(self) -> list[str]:
         return [origin.strip() for origin in self.cors_origins.split(",")]
 
+    @property
+    def embedding_dimensions(self) -> dict[str, int]:
+        dimensions = {}
+        for entry in self.embedding_models.split(","):
+            name, _, dim = entry.strip().rpartition(":")
+            dimensions[name] = int(dim)
+        return dimensions
+
 
 settings = Settings()  # type: ignore
@@ -1,15 +1,89 @@
-from typing import AsyncGenerator
+"""
+Async engines and sessions.
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+Pool sizing, statement caching and the statement timeout come from
+settings (db_*). With db_pgbouncer_mode, asyncpg caches no prepared
+statements and names each one uniquely, as required behind PgBouncer in
+transaction pooling mode where consecutive statements may run on
+different server connections.
+
+With database_read_url set, read-only work (retrieval, listings, public
+config) uses sessions from get_read_db / read_session_factory on a
+replica. They fall back to the primary while the replica's replay lag
+exceeds replica_max_lag_seconds, and, for the keys a caller names (table
+names, or ("project", id) for a project's documents), for that long after
+this process committed a write to them, so e.g. a just-processed document
+is searchable at once.
+"""
+
+import logging
+import time
+from typing import AsyncGenerator, Hashable
+from uuid import uuid4
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+    async_sessionmaker,
+)
+from sqlalchemy.orm import DeclarativeBase, Session
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+
+def engine_options(url: URL) -> tuple[URL, dict]:
+    """The URL and create_async_engine() options for `url`, from settings."""
+    options: dict = {"echo": settings.debug, "pool_pre_ping": True}
+    if url.get_backend_name() == "sqlite":
+        return url, options
+
+    options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+    )
+    if url.get_driver_name() != "asyncpg":
+        return url, options
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,
-    pool_pre_ping=True,
+    connect_args: dict = {}
+    if settings.db_pgbouncer_mode:
+        # SQLAlchemy's and asyncpg's statement caches both off; unique names
+        # keep statements prepared on one server connection from clashing
+        url = url.update_query_dict({"prepared_statement_cache_size": "0"})
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = (
+            lambda: f"__asyncpg_{uuid4()}__"
+        )
+    else:
+        url = url.update_query_dict(
+            {"prepared_statement_cache_size": str(settings.db_statement_cache_size)}
+        )
+        # PgBouncer rejects startup parameters it does not track, so there
+        # the timeout belongs on the role (ALTER ROLE ... SET statement_timeout)
+        if settings.db_statement_timeout_ms > 0:
+            connect_args["server_settings"] = {
+                "statement_timeout": str(settings.db_statement_timeout_ms)
+            }
+    options["connect_args"] = connect_args
+    return url, options
+
+
+def _create_engine(database_url: str) -> AsyncEngine:
+    url, options = engine_options(make_url(database_url))
+    return create_async_engine(url, **options)
+
+
+engine = _create_engine(settings.database_url)
+read_engine = (
+    _create_engine(settings.database_read_url)
+    if settings.database_read_url
+    else engine
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -18,6 +92,12 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
+ReadSessionLocal = async_sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
 
 class Base(DeclarativeBase):
     pass
@@ -29,3 +109,175 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             yield session
         finally:
             await session.close()
+
+
+async def advisory_xact_lock(db: AsyncSession, key: str) -> None:
+    """
+    Lock `key` until the session's transaction ends.
+
+    Uses a PostgreSQL transaction-level advisory lock; a no-op on other
+    databases.
+    """
+    connection = await db.connection()
+    if connection.dialect.name == "postgresql":
+        await db.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": key}
+        )
+
+
+# Replay lag of the replica in seconds; zero while it has replayed all it
+# received (an idle primary sends nothing, which is not lag)
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+_replica_ok = False
+_replica_lag: float | None = None
+_replica_checked_at = float("-inf")
+
+# Write key -> monotonic time of the last commit touching it
+_recent_writes: dict[Hashable, float] = {}
+
+
+async def replica_available() -> bool:
+    """Whether a replica is configured and within replica_max_lag_seconds."""
+    global _replica_ok, _replica_lag, _replica_checked_at
+    if read_engine is engine:
+        return False
+    now = time.monotonic()
+    if now - _replica_checked_at < settings.replica_lag_check_seconds:
+        return _replica_ok
+
+    # Claim the check first so concurrent requests reuse the last result
+    _replica_checked_at = now
+    try:
+        async with read_engine.connect() as connection:
+            lag = (await connection.execute(REPLICA_LAG_SQL)).scalar()
+        _replica_lag = float(lag or 0)
+        _replica_ok = _replica_lag <= settings.replica_max_lag_seconds
+    except Exception:
+        logger.exception("Replica lag check failed; reading from the primary")
+        _replica_lag = None
+        _replica_ok = False
+    return _replica_ok
+
+
+def mark_written(*keys: Hashable) -> None:
+    """Record a committed write to `keys` (see module docstring)."""
+    now = time.monotonic()
+    for key in keys:
+        _recent_writes[key] = now
+    if len(_recent_writes) > 10_000:
+        cutoff = now - settings.replica_max_lag_seconds
+        for key, written_at in list(_recent_writes.items()):
+            if written_at < cutoff:
+                del _recent_writes[key]
+
+
+def recently_written(*keys: Hashable) -> bool:
+    """Whether this process committed a write to one of `keys` in the lag window."""
+    cutoff = time.monotonic() - settings.replica_max_lag_seconds
+    return any(_recent_writes.get(key, float("-inf")) >= cutoff for key in keys)
+
+
+async def read_session_factory(*keys: Hashable) -> async_sessionmaker:
+    """Sessions for reads of `keys`: the replica when it is fresh enough."""
+    if recently_written(*keys) or not await replica_available():
+        return AsyncSessionLocal
+    return ReadSessionLocal
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """A read-only session, on the replica unless it lags (see module docstring)."""
+    session_factory = await read_session_factory()
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+def read_your_writes(
+    read_db: AsyncSession, db: AsyncSession, *keys: Hashable
+) -> AsyncSession:
+    """`read_db`, or the primary session `db` if `keys` were just written."""
+    return db if recently_written(*keys) else read_db
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_writes(session: Session, flush_context) -> None:
+    keys = session.info.setdefault("written_keys", set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        keys.add(instance.__tablename__)
+        project_id = getattr(instance, "project_id", None)
+        if project_id is not None:
+            keys.add(("project", project_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _record_writes(session: Session) -> None:
+    keys = session.info.pop("written_keys", None)
+    if keys:
+        mark_written(*keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_writes(session: Session) -> None:
+    session.info.pop("written_keys", None)
+
+
+# Pool counters, reported by pool_stats()
+_checkouts = 0
+_peak_checked_out = 0
+_timeouts = 0
+
+
+def record_pool_timeout() -> None:
+    """Count a request that gave up waiting for a pooled connection."""
+    global _timeouts
+    _timeouts += 1
+
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _count_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+    global _checkouts, _peak_checked_out
+    _checkouts += 1
+    checked_out = getattr(engine.sync_engine.pool, "checkedout", None)
+    if checked_out is not None:
+        _peak_checked_out = max(_peak_checked_out, checked_out())
+
+
+def _pool_snapshot(pool) -> dict:
+    stats = {"pool": type(pool).__name__}
+    if hasattr(pool, "checkedout"):
+        size = pool.size()
+        capacity = size + max(pool._max_overflow, 0)
+        checked_out = pool.checkedout()
+        stats.update(
+            size=size,
+            max_overflow=pool._max_overflow,
+            checked_out=checked_out,
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            timeout_seconds=pool.timeout(),
+            utilization=round(checked_out / capacity, 3) if capacity else None,
+        )
+    return stats
+
+
+def pool_stats() -> dict:
+    """Connection pool utilization of this process."""
+    stats = _pool_snapshot(engine.sync_engine.pool)
+    stats.update(
+        checkouts=_checkouts,
+        peak_checked_out=_peak_checked_out,
+        timeouts=_timeouts,
+    )
+    if read_engine is not engine:
+        stats["replica"] = {
+            **_pool_snapshot(read_engine.sync_engine.pool),
+            "available": _replica_ok,
+            "lag_seconds": _replica_lag,
+        }
+    return stats
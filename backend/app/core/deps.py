@@ -1,15 +1,18 @@
-"""Dependency injection for authentication."""
+"""Dependency injection for authentication and tenant resolution."""
 
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy import select
 
-from app.core.database import get_db
+from app.core.database import get_db, read_session_factory
 from app.core.security import decode_token
+from app.core.user_cache import cache_user, get_cached_user
 from app.models.user import User
+from app.services.projects import PROJECT_RESPONSE_TABLES
+from app.services.tenants import Tenant, resolve_tenant
 
 
 security = HTTPBearer(auto_error=False)
@@ -19,7 +22,12 @@ async def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: AsyncSession = Depends(get_db),
 ) -> User:
-    """Get the current authenticated user from JWT token."""
+    """
+    Get the current authenticated user from JWT token.
+
+    Users are served from a short-lived in-process cache when possible,
+    saving a database round trip per request.
+    """
     if credentials is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -52,8 +60,12 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    result = await db.execute(select(User).where(User.id == int(user_id)))
-    user = result.scalar_one_or_none()
+    user = await get_cached_user(db, int(user_id))
+    if user is None:
+        result = await db.execute(select(User).where(User.id == int(user_id)))
+        user = result.scalar_one_or_none()
+        if user is not None:
+            cache_user(user)
 
     if user is None:
         raise HTTPException(
@@ -104,3 +116,29 @@ async def get_superadmin_user(user: User = Depends(get_current_user)) -> User:
             detail="Superadmin access required",
         )
     return user
+
+
+async def get_tenant_session_factory() -> async_sessionmaker:
+    """Session factory for resolving tenants outside the request session."""
+    return await read_session_factory(*PROJECT_RESPONSE_TABLES)
+
+
+async def get_current_tenant(
+    request: Request,
+    session_factory: async_sessionmaker = Depends(get_tenant_session_factory),
+) -> Optional[Tenant]:
+    """
+    The tenant of the request's subdomain, or None without one.
+
+    Normally already resolved by SubdomainMiddleware; resolved here only
+    when the middleware could not (e.g. the database was unreachable), in
+    a short-lived session so streaming endpoints hold no connection.
+    """
+    tenant = getattr(request.state, "tenant", None)
+    if tenant is not None:
+        return tenant
+    subdomain = getattr(request.state, "subdomain", None)
+    if not subdomain:
+        return None
+    async with session_factory() as db:
+        return await resolve_tenant(db, subdomain)
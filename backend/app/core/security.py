@@ -1,17 +1,29 @@
 """Security utilities for authentication."""
 
+import base64
+import hashlib
+import hmac
+import json
+import re
+import time
 from datetime import datetime, timedelta
 from typing import Optional
+from urllib.parse import urlencode
 
 import bcrypt
-from jose import jwt, JWTError  # type: ignore
+from jose import jwt  # type: ignore
 
 from app.core.config import settings
 
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt."""
-    salt = bcrypt.gensalt()
+    """
+    Hash a password using bcrypt.
+
+    Blocks for the whole bcrypt computation; async code should use
+    app.services.passwords instead.
+    """
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
     return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
 
 
@@ -22,6 +34,15 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     )
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a bcrypt hash uses a cost factor other than bcrypt_rounds."""
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds != settings.bcrypt_rounds
+
+
 def create_access_token(user_id: int, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     if expires_delta is None:
@@ -50,10 +71,105 @@ def create_refresh_token(user_id: int) -> tuple[str, datetime]:
     return token, expires_at
 
 
+_B64URL_SEGMENT = re.compile(r"[A-Za-z0-9_-]*")
+
+
+def _b64url_decode(segment: str) -> bytes:
+    """
+    Decode an unpadded base64url JWT segment, strictly.
+
+    Padding, characters outside the alphabet and non-zero trailing bits are
+    rejected, so each value has exactly one encoding and a signature cannot
+    be altered into another accepted token.
+    """
+    if not _B64URL_SEGMENT.fullmatch(segment):
+        raise ValueError("Invalid base64url segment")
+    data = base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+    if base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii") != segment:
+        raise ValueError("Non-canonical base64url segment")
+    return data
+
+
 def decode_token(token: str) -> Optional[dict]:
-    """Decode and validate a JWT token."""
+    """
+    Decode and validate a JWT token.
+
+    Only HS256 tokens are issued, so the signature and expiry are checked
+    directly with hmac rather than through the generic JOSE machinery;
+    this runs on every authenticated request.
+    """
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=["HS256"])
-        return payload
-    except JWTError:
+        header_segment, payload_segment, signature_segment = token.split(".")
+        header = json.loads(_b64url_decode(header_segment))
+        if not isinstance(header, dict) or header.get("alg") != "HS256":
+            return None
+
+        expected = hmac.new(
+            settings.secret_key.encode("utf-8"),
+            f"{header_segment}.{payload_segment}".encode("ascii"),
+            hashlib.sha256,
+        ).digest()
+        if not hmac.compare_digest(expected, _b64url_decode(signature_segment)):
+            return None
+
+        payload = json.loads(_b64url_decode(payload_segment))
+    except (ValueError, UnicodeError):
+        # Malformed segments, base64 or JSON (binascii.Error is a ValueError)
+        return None
+
+    if not isinstance(payload, dict):
         return None
+    expires = payload.get("exp")
+    if not isinstance(expires, (int, float)) or expires <= time.time():
+        return None
+    return payload
+
+
+# Public branding assets are served under this prefix with signed URLs
+PUBLIC_ASSET_PREFIX = "/api/public/assets"
+
+
+def _asset_signature(path: str, expires: int) -> str:
+    """HMAC-SHA256 of "<path>:<expires>" keyed with the secret key (base64url)."""
+    digest = hmac.new(
+        settings.secret_key.encode("utf-8"),
+        f"{path}:{expires}".encode("utf-8"),
+        hashlib.sha256,
+    ).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+def sign_asset_path(path: str, now: Optional[float] = None) -> str:
+    """
+    Append an expiring signature to a public asset path.
+
+    The expiry is rounded up to a multiple of asset_url_expire_seconds, so the
+    URL stays identical for a whole period and caches well; it is valid for
+    one to two periods.
+    """
+    period = settings.asset_url_expire_seconds
+    now = time.time() if now is None else now
+    expires = (int(now) // period + 2) * period
+    query = urlencode({"expires": expires, "signature": _asset_signature(path, expires)})
+    return f"{path}?{query}"
+
+
+def sign_asset_url(url: Optional[str]) -> Optional[str]:
+    """Sign a URL if it points at a public asset; other URLs are unchanged."""
+    if url and url.startswith(PUBLIC_ASSET_PREFIX + "/"):
+        return sign_asset_path(url)
+    return url
+
+
+def verify_asset_signature(
+    path: str, expires: int, signature: str, now: Optional[float] = None
+) -> bool:
+    """Check a signed asset URL without touching the database."""
+    now = time.time() if now is None else now
+    if expires < now:
+        return False
+    # Bytes, since compare_digest rejects non-ASCII str with TypeError
+    return hmac.compare_digest(
+        _asset_signature(path, expires).encode("ascii"),
+        signature.encode("utf-8", "replace"),
+    )
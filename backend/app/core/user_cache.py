@@ -0,0 +1,75 @@
+"""
+Short-lived in-process cache of authenticated users.
+
+Column values of users loaded by get_current_user are kept for
+user_cache_ttl_seconds, so most authenticated requests skip the user query.
+Any update or delete of a User flushed through the ORM drops its entry, so
+deactivation and role changes take effect on the next request in this
+process; other processes see them once the TTL expires.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.models.user import User
+
+# user_id -> (expires_at, column values)
+_entries: "OrderedDict[int, tuple[float, dict]]" = OrderedDict()
+
+
+def cache_user(user: User) -> None:
+    """Remember a freshly loaded user's column values."""
+    if settings.user_cache_ttl_seconds <= 0:
+        return
+    state = inspect(user)
+    keys = [column.key for column in state.mapper.column_attrs]
+    if any(key not in state.dict for key in keys):
+        # Partially loaded (e.g. just flushed); only cache complete rows
+        return
+    values = {key: state.dict[key] for key in keys}
+    _entries[user.id] = (time.monotonic() + settings.user_cache_ttl_seconds, values)
+    _entries.move_to_end(user.id)
+    while len(_entries) > settings.user_cache_max_entries:
+        _entries.popitem(last=False)
+
+
+async def get_cached_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    """
+    Return the cached user attached to `db`, or None on a miss.
+
+    The instance is merged without loading, so no query is issued; it
+    behaves like a user selected in this session.
+    """
+    entry = _entries.get(user_id)
+    if entry is None:
+        return None
+    expires_at, values = entry
+    if expires_at < time.monotonic():
+        _entries.pop(user_id, None)
+        return None
+
+    user = User(**values)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop a user from the cache."""
+    _entries.pop(user_id, None)
+
+
+def clear_user_cache() -> None:
+    """Drop all cached users."""
+    _entries.clear()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_change(mapper, connection, target: User) -> None:
+    invalidate_user(target.id)
@@ -1,12 +1,15 @@
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import select
+from fastapi.responses import JSONResponse
+from sqlalchemy import exc, select
 
 from app.core.config import settings
-from app.core.database import AsyncSessionLocal
-from app.core.security import hash_password
+from app.core.database import AsyncSessionLocal, record_pool_timeout
+from app.services.passwords import hash_password, shutdown_password_pool
+from app.services.workers import shutdown_process_pool
+from app.services.speech import close_speech_provider, init_speech_provider
 from app.models.user import User
 from app.api.routes import (
     health,
@@ -22,6 +25,8 @@ from app.api.routes import (
     public,
     database,
     avatars,
+    assets,
+    search,
 )
 from app.middleware import SubdomainMiddleware
 
@@ -49,7 +54,7 @@ async def seed_admin_user():
         # Create new admin user
         admin_user = User(
             email=settings.admin_username.lower(),
-            password_hash=hash_password(settings.admin_password),
+            password_hash=await hash_password(settings.admin_password),
             full_name="Admin",
             role="superadmin",
             is_active=True,
@@ -64,8 +69,13 @@ async def seed_admin_user():
 async def lifespan(app: FastAPI):
     # Startup
     await seed_admin_user()
+    # Long-lived speech clients (gRPC channels reused across requests)
+    init_speech_provider()
     yield
     # Shutdown
+    await close_speech_provider()
+    shutdown_process_pool()
+    shutdown_password_pool()
 
 
 app = FastAPI(
@@ -87,12 +97,26 @@ app.add_middleware(
 # Subdomain middleware
 app.add_middleware(SubdomainMiddleware)
 
+
+@app.exception_handler(exc.TimeoutError)
+async def pool_timeout_handler(request: Request, error: exc.TimeoutError):
+    """Every pooled connection stayed busy for db_pool_timeout_seconds."""
+    record_pool_timeout()
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database is busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+
 # Routes
 app.include_router(health.router, tags=["Health"])
 app.include_router(public.router, tags=["Public"])
+app.include_router(assets.router, tags=["Public Assets"])
 app.include_router(auth.router, prefix="/api", tags=["Auth"])
 app.include_router(users.router, prefix="/api", tags=["Users"])
 app.include_router(admin.router, prefix="/api", tags=["Admin"])
+app.include_router(search.router, prefix="/api", tags=["Search"])
 app.include_router(database.router, prefix="/api/admin/database", tags=["Database"])
 app.include_router(customers.router, prefix="/api", tags=["Customers"])
 app.include_router(projects.router, prefix="/api", tags=["Projects"])
@@ -1,38 +1,93 @@
 """Subdomain middleware for multi-tenant routing."""
 
-from typing import Callable
+import ipaddress
+import logging
+from typing import Optional
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from app.core.database import read_session_factory
+from app.services.projects import PROJECT_RESPONSE_TABLES
+from app.services.tenants import resolve_tenant
 
-class SubdomainMiddleware(BaseHTTPMiddleware):
+logger = logging.getLogger(__name__)
+
+
+def subdomain_from_host(host: str) -> Optional[str]:
+    """
+    Extract the tenant subdomain from a Host header value.
+
+    e.g. "acme.docutok.com" -> "acme", "acme.localhost:5173" -> "acme";
+    bare domains, "localhost" and IP addresses have no subdomain.
+    """
+    host = host.strip().lower()
+    if host.startswith("["):
+        # IPv6 literal
+        return None
+    host = host.rsplit(":", 1)[0].rstrip(".")
+    try:
+        ipaddress.ip_address(host)
+        return None
+    except ValueError:
+        pass
+
+    parts = host.split(".")
+    if len(parts) > 2 or (len(parts) == 2 and parts[1] == "localhost"):
+        return parts[0] or None
+    return None
+
+
+class SubdomainMiddleware:
     """
-    Middleware to extract subdomain from request and store in request state.
+    Middleware to resolve the request's tenant and store it in request state.
 
     For local development, subdomain can be passed via X-Subdomain header.
     In production, it's extracted from the Host header.
+
+    Sets request.state.subdomain and request.state.tenant (the cached
+    Tenant of the active project on that subdomain, or None). Tenants come
+    from the tenant registry, so a steady-state request costs a dict lookup.
+    This is a plain ASGI middleware: unlike BaseHTTPMiddleware it does not
+    wrap the response stream, so streamed chat answers pass straight through.
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Check for custom header (useful for local dev)
-        subdomain = request.headers.get("X-Subdomain")
+    def __init__(self, app: ASGIApp, session_factory=None):
+        self.app = app
+        self.session_factory = session_factory
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
 
-        if not subdomain:
-            # Extract from Host header
-            host = request.headers.get("host", "")
-            parts = host.split(".")
+        subdomain = None
+        host = ""
+        for name, value in scope["headers"]:
+            if name == b"x-subdomain":
+                subdomain = value.decode("latin-1").strip().lower() or None
+            elif name == b"host":
+                host = value.decode("latin-1")
+        if subdomain is None:
+            subdomain = subdomain_from_host(host)
+        elif "." in subdomain or ":" in subdomain:
+            # Proxies may forward the whole host (proxy_set_header X-Subdomain $host)
+            subdomain = subdomain_from_host(subdomain)
 
-            # If we have multiple parts, the first is likely the subdomain
-            # e.g., "acme.docutok.com" -> "acme"
-            if len(parts) > 2:
-                subdomain = parts[0]
-            elif len(parts) == 2 and "localhost" not in host:
-                # e.g., "acme.localhost" -> "acme"
-                subdomain = parts[0]
+        state = scope.setdefault("state", {})
+        state["subdomain"] = subdomain
+        state["tenant"] = await self._resolve(subdomain) if subdomain else None
 
-        # Store subdomain in request state for downstream use
-        request.state.subdomain = subdomain
+        await self.app(scope, receive, send)
 
-        response = await call_next(request)
-        return response
+    async def _resolve(self, subdomain: str):
+        try:
+            session_factory = self.session_factory or await read_session_factory(
+                *PROJECT_RESPONSE_TABLES
+            )
+            # The session only connects on a registry miss
+            async with session_factory() as db:
+                return await resolve_tenant(db, subdomain)
+        except Exception:
+            # Routes fall back to resolving the tenant themselves
+            logger.exception("Could not resolve tenant for subdomain %r", subdomain)
+            return None
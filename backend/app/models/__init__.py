@@ -1,5 +1,6 @@
 from app.models.document import Document
 from app.models.chunk import Chunk
+from app.models.chunk_embedding import ChunkEmbedding
 from app.models.user import User
 from app.models.session import Session
 from app.models.faq import FAQ
@@ -7,10 +8,12 @@ from app.models.chat_message import ChatMessage
 from app.models.customer import Customer
 from app.models.project import Project
 from app.models.avatar import Avatar
+from app.models.counter import Counter
 
 __all__ = [
     "Document",
     "Chunk",
+    "ChunkEmbedding",
     "User",
     "Session",
     "FAQ",
@@ -18,4 +21,5 @@ __all__ = [
     "Customer",
     "Project",
     "Avatar",
+    "Counter",
 ]
@@ -1,12 +1,12 @@
 from sqlalchemy import ForeignKey, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from pgvector.sqlalchemy import Vector
 from typing import TYPE_CHECKING
 
 from app.core.database import Base
 
 if TYPE_CHECKING:
     from app.models.document import Document
+    from app.models.chunk_embedding import ChunkEmbedding
 
 
 class Chunk(Base):
@@ -20,8 +20,8 @@ class Chunk(Base):
     page_number: Mapped[int | None]
     chunk_index: Mapped[int]
 
-    # Vector embedding (768 dimensions for Ollama nomic-embed-text)
-    embedding = mapped_column(Vector(768), nullable=True)
-
     # Relationships
     document: Mapped["Document"] = relationship(back_populates="chunks")
+    embeddings: Mapped[list["ChunkEmbedding"]] = relationship(
+        back_populates="chunk", cascade="all, delete-orphan", passive_deletes=True
+    )
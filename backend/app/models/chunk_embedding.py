@@ -0,0 +1,32 @@
+"""Chunk embedding model, one row per (chunk, embedding model)."""
+
+from sqlalchemy import ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from pgvector.sqlalchemy import Vector
+from typing import TYPE_CHECKING
+
+from app.core.database import Base
+
+if TYPE_CHECKING:
+    from app.models.chunk import Chunk
+
+
+class ChunkEmbedding(Base):
+    """
+    Vector embedding of a chunk produced by a specific embedding model.
+
+    The column is dimension-less so models of different sizes can share the
+    table; each model gets its own partial HNSW index on
+    ``embedding::vector(<dims>)`` (see migration 0007).
+    """
+
+    __tablename__ = "chunk_embeddings"
+
+    chunk_id: Mapped[int] = mapped_column(
+        ForeignKey("chunks.id", ondelete="CASCADE"), primary_key=True
+    )
+    model: Mapped[str] = mapped_column(String(100), primary_key=True)
+    embedding = mapped_column(Vector(), nullable=False)
+
+    # Relationships
+    chunk: Mapped["Chunk"] = relationship(back_populates="embeddings")
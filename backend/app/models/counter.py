@@ -0,0 +1,57 @@
+"""
+Incrementally maintained row counts.
+
+Counters are adjusted in the same transaction as every ORM insert or
+delete of a counted model. The listeners are registered here, with the
+models, so they apply to every code path that imports app.models (API,
+scripts, background tasks); rows changed outside the ORM are brought back
+in line by app.services.aggregates.reconcile_counters.
+"""
+
+from sqlalchemy import BigInteger, String, event, update
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+from app.models.customer import Customer
+from app.models.document import Document
+from app.models.project import Project
+from app.models.user import User
+
+
+class Counter(Base):
+    """
+    A named running count (e.g. total documents).
+
+    Kept up to date as rows are inserted and deleted (see module
+    docstring), so dashboards never scan whole tables.
+    """
+
+    __tablename__ = "counters"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+# Counter name -> model whose rows it counts
+COUNTED_MODELS = {
+    "users": User,
+    "customers": Customer,
+    "projects": Project,
+    "documents": Document,
+}
+
+
+def _counter_listener(name: str, delta: int):
+    def adjust(mapper, connection, target) -> None:
+        connection.execute(
+            update(Counter)
+            .where(Counter.name == name)
+            .values(value=Counter.value + delta)
+        )
+
+    return adjust
+
+
+for _name, _model in COUNTED_MODELS.items():
+    event.listen(_model, "after_insert", _counter_listener(_name, 1))
+    event.listen(_model, "after_delete", _counter_listener(_name, -1))
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 import uuid as uuid_lib
-from sqlalchemy import Integer, String, Boolean, DateTime, func
+from sqlalchemy import Integer, String, Boolean, DateTime, func, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from app.core.database import Base
@@ -18,6 +18,8 @@ class Customer(Base):
     """Customer organization model."""
 
     __tablename__ = "customers"
+    # Keyset pagination order (newest first)
+    __table_args__ = (Index("ix_customers_created_at_id", "created_at", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     uuid: Mapped[uuid_lib.UUID] = mapped_column(
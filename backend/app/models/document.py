@@ -1,6 +1,6 @@
 import uuid as uuid_lib
 from datetime import datetime
-from sqlalchemy import DateTime, String, Text, func, ForeignKey, Integer
+from sqlalchemy import DateTime, String, Text, func, ForeignKey, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import TYPE_CHECKING, Optional
@@ -15,6 +15,12 @@ if TYPE_CHECKING:
 
 class Document(Base):
     __tablename__ = "documents"
+    # Per-project listing order (newest first)
+    __table_args__ = (
+        Index(
+            "ix_documents_project_id_created_at_id", "project_id", "created_at", "id"
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     uuid: Mapped[uuid_lib.UUID] = mapped_column(
@@ -24,6 +30,10 @@ class Document(Base):
     original_filename: Mapped[str] = mapped_column(String(255))
     content_type: Mapped[str] = mapped_column(String(100))
     file_size: Mapped[int]
+    # SHA-256 of the file content; the stored file is shared by identical uploads
+    content_hash: Mapped[Optional[str]] = mapped_column(
+        String(64), nullable=True, index=True
+    )
     status: Mapped[str] = mapped_column(String(50), default="pending")
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
@@ -49,7 +59,7 @@ class Document(Base):
 
     # Relationships
     chunks: Mapped[list["Chunk"]] = relationship(
-        back_populates="document", cascade="all, delete-orphan"
+        back_populates="document", cascade="all, delete-orphan", passive_deletes=True
     )
     owner: Mapped[Optional["User"]] = relationship(back_populates="documents")
     project: Mapped[Optional["Project"]] = relationship(back_populates="documents")
@@ -3,7 +3,16 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 import uuid as uuid_lib
-from sqlalchemy import Integer, String, Boolean, DateTime, Text, ForeignKey, func
+from sqlalchemy import (
+    Integer,
+    String,
+    Boolean,
+    DateTime,
+    Text,
+    ForeignKey,
+    func,
+    Index,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from app.core.database import Base
@@ -18,6 +27,8 @@ class Project(Base):
     """Project model with branding and configuration."""
 
     __tablename__ = "projects"
+    # Keyset pagination order (newest first)
+    __table_args__ = (Index("ix_projects_created_at_id", "created_at", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     uuid: Mapped[uuid_lib.UUID] = mapped_column(
@@ -59,6 +70,13 @@ class Project(Base):
     avatar: Mapped[str] = mapped_column(String(500), nullable=False)
     voice: Mapped[str] = mapped_column(String(100), nullable=False)
 
+    # Retrieval (None uses settings.embedding_model)
+    embedding_model: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    # Model being backfilled; becomes embedding_model once every chunk has it
+    pending_embedding_model: Mapped[str | None] = mapped_column(
+        String(100), nullable=True
+    )
+
     # Navigation
     return_link: Mapped[str | None] = mapped_column(String(500), nullable=True)
     return_link_text: Mapped[str | None] = mapped_column(String(100), nullable=True)
@@ -25,6 +25,7 @@ class AvatarResponse(AvatarBase):
     filename: str
     original_filename: str
     file_size: int
+    url: str | None = None  # Signed public download URL
     is_active: bool
     created_at: datetime
     updated_at: datetime | None
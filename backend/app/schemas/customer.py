@@ -48,6 +48,7 @@ class CustomerListResponse(BaseModel):
     """Schema for paginated customer list."""
 
     customers: list[CustomerResponse]
-    total: int
+    total: Optional[int]
     page: int
     per_page: int
+    next_cursor: Optional[str] = None
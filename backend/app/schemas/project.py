@@ -6,6 +6,8 @@ from datetime import datetime
 from uuid import UUID
 import re
 
+from app.core.config import settings
+
 
 class ProjectBase(BaseModel):
     """Base schema for project."""
@@ -28,6 +30,18 @@ class ProjectBase(BaseModel):
     voice: str = Field(min_length=1, max_length=100)
     return_link: Optional[str] = Field(None, max_length=500)
     return_link_text: Optional[str] = Field(None, max_length=100)
+    embedding_model: Optional[str] = Field(None, max_length=100)
+
+    @field_validator("embedding_model")
+    @classmethod
+    def validate_embedding_model(cls, v: Optional[str]) -> Optional[str]:
+        """Validate embedding model is a configured model."""
+        if v is not None and v not in settings.embedding_dimensions:
+            raise ValueError(
+                f"Unknown embedding model. Available: "
+                f"{', '.join(settings.embedding_dimensions)}"
+            )
+        return v
 
     @field_validator("subdomain")
     @classmethod
@@ -83,8 +97,20 @@ class ProjectUpdate(BaseModel):
     voice: Optional[str] = Field(None, min_length=1, max_length=100)
     return_link: Optional[str] = Field(None, max_length=500)
     return_link_text: Optional[str] = Field(None, max_length=100)
+    embedding_model: Optional[str] = Field(None, max_length=100)
     is_active: Optional[bool] = None
 
+    @field_validator("embedding_model")
+    @classmethod
+    def validate_embedding_model(cls, v: Optional[str]) -> Optional[str]:
+        """Validate embedding model is a configured model."""
+        if v is not None and v not in settings.embedding_dimensions:
+            raise ValueError(
+                f"Unknown embedding model. Available: "
+                f"{', '.join(settings.embedding_dimensions)}"
+            )
+        return v
+
     @field_validator("subdomain")
     @classmethod
     def validate_subdomain(cls, v: Optional[str]) -> Optional[str]:
@@ -115,6 +141,8 @@ class ProjectResponse(ProjectBase):
     uuid: UUID
     customer_id: int
     logo: Optional[str]
+    # Set while existing chunks are embedded with a newly chosen model
+    pending_embedding_model: Optional[str] = None
     is_active: bool
     created_at: datetime
     updated_at: datetime
@@ -129,6 +157,7 @@ class ProjectListResponse(BaseModel):
     """Schema for paginated project list."""
 
     projects: list[ProjectResponse]
-    total: int
+    total: Optional[int]
     page: int
     per_page: int
+    next_cursor: Optional[str] = None
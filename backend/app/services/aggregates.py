@@ -0,0 +1,69 @@
+"""
+Aggregate queries for admin lists and the stats dashboard.
+
+List endpoints count related rows for a whole page with one grouped query
+(count_by) instead of one query per row. Dashboard totals come from the
+counters table (maintained by listeners in app.models.counter), so reading
+them is a primary-key lookup rather than a COUNT(*) over each table.
+"""
+
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.counter import COUNTED_MODELS, Counter
+
+
+async def count_by(db: AsyncSession, column, keys: Iterable[Any]) -> dict[Any, int]:
+    """
+    Count rows grouped by `column` for the given keys, in one query.
+
+    Keys without rows are reported as 0.
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+    result = await db.execute(
+        select(column, func.count()).where(column.in_(keys)).group_by(column)
+    )
+    counts = dict(result.all())
+    return {key: counts.get(key, 0) for key in keys}
+
+
+async def reconcile_counters(
+    db: AsyncSession, names: Optional[Iterable[str]] = None
+) -> dict[str, int]:
+    """
+    Recompute counters from the tables (all, or just `names`) and store them.
+
+    Needed when a counter row is missing (e.g. a fresh database not created
+    through migrations) or rows were changed outside the ORM (raw SQL, bulk
+    imports); run through POST /api/admin/stats/reconcile.
+    """
+    values = {}
+    for name in names or COUNTED_MODELS:
+        model = COUNTED_MODELS[name]
+        values[name] = (
+            await db.execute(select(func.count()).select_from(model))
+        ).scalar() or 0
+        await db.merge(Counter(name=name, value=values[name]))
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Another request seeded the same counter first
+        await db.rollback()
+    return values
+
+
+async def get_counters(db: AsyncSession) -> dict[str, int]:
+    """Current totals of every counted model."""
+    result = await db.execute(
+        select(Counter.name, Counter.value).where(Counter.name.in_(COUNTED_MODELS))
+    )
+    values = dict(result.all())
+    missing = [name for name in COUNTED_MODELS if name not in values]
+    if missing:
+        values.update(await reconcile_counters(db, missing))
+    return values
@@ -8,13 +8,14 @@ from sqlalchemy import select, delete
 
 from app.models.user import User
 from app.models.session import Session
+from app.core.config import settings
 from app.core.security import (
-    hash_password,
-    verify_password,
     create_access_token,
     create_refresh_token,
     decode_token,
+    password_needs_rehash,
 )
+from app.services.passwords import hash_password, verify_password
 from app.schemas.auth import UserRegister
 
 
@@ -28,7 +29,7 @@ async def create_user(db: AsyncSession, data: UserRegister) -> User:
     """Create a new user account."""
     user = User(
         email=data.email.lower(),
-        password_hash=hash_password(data.password),
+        password_hash=await hash_password(data.password),
         full_name=data.full_name,
     )
     db.add(user)
@@ -40,14 +41,23 @@ async def create_user(db: AsyncSession, data: UserRegister) -> User:
 async def authenticate_user(
     db: AsyncSession, email: str, password: str
 ) -> Optional[User]:
-    """Authenticate a user with email and password."""
+    """
+    Authenticate a user with email and password.
+
+    With password_rehash_on_login, a hash made with an outdated bcrypt cost
+    factor is replaced (committed with the login's other updates).
+    """
     user = await get_user_by_email(db, email)
     if user is None:
         return None
-    if not verify_password(password, user.password_hash):
+    if not await verify_password(password, user.password_hash):
         return None
     if not user.is_active:
         return None
+    if settings.password_rehash_on_login and password_needs_rehash(
+        user.password_hash
+    ):
+        user.password_hash = await hash_password(password)
     return user
 
 
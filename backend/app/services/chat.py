@@ -1,9 +1,15 @@
+import asyncio
+import re
 from typing import AsyncGenerator
 from langchain_ollama import ChatOllama
 from langchain_core.messages import HumanMessage, SystemMessage
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
-from app.services.retrieval import search_similar_chunks
+from app.core.database import read_session_factory
+from app.models.project import Project
+from app.services.retrieval import documents_key, search_similar_chunks
+from app.services.speech_stream import format_sse, stream_speech_events
 
 # Initialize LLM (lazy loading)
 _llm = None
@@ -24,28 +30,101 @@ SYSTEM_PROMPT = """You are a helpful document assistant. Answer questions based
 If the answer is not in the context, say "I couldn't find that information in the documents."
 Always cite your sources using [Source: filename, Page X] format."""
 
+NO_DOCUMENTS_MESSAGE = (
+    "I don't have any documents to search. Please upload some documents first."
+)
 
-async def generate_response(
+
+async def retrieve_chunks(
     query: str,
     db: AsyncSession,
     project_id: int | None = None,
     document_id: int | None = None,
-) -> AsyncGenerator[str, None]:
+) -> list[dict]:
+    """Retrieve the chunks used as context (filtered by project_id for isolation)."""
+    return await search_similar_chunks(
+        query, db, project_id=project_id, document_id=document_id, limit=5
+    )
+
+
+async def retrieve_context(
+    query: str,
+    project_id: int | None = None,
+    document_id: int | None = None,
+) -> list[dict]:
     """
-    Generate a streaming response with RAG context using Ollama.
+    Retrieve the context chunks in a short-lived session of their own.
 
-    For multi-tenant security, pass project_id to scope retrieval to project documents.
+    The session, and its pooled connection, is closed before the answer is
+    streamed, so a slow LLM holds no database connection and the pool size
+    does not cap concurrent chat streams.
     """
+    session_factory = await read_session_factory(documents_key(project_id))
+    async with session_factory() as db:
+        return await retrieve_chunks(query, db, project_id, document_id)
 
-    # Retrieve relevant chunks (filtered by project_id for isolation)
-    chunks = await search_similar_chunks(
-        query, db, project_id=project_id, document_id=document_id, limit=5
-    )
 
-    if not chunks:
-        yield "I don't have any documents to search. Please upload some documents first."
-        return
+async def get_project_voice(project_id: int) -> str | None:
+    """A project's configured voice, looked up in a short-lived session."""
+    session_factory = await read_session_factory("projects")
+    async with session_factory() as db:
+        result = await db.execute(
+            select(Project.voice).where(Project.id == project_id)
+        )
+        return result.scalar_one_or_none()
+
+
+def _query_key(text: str) -> str:
+    """Normalize a transcript for comparing partial and final queries."""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+class RetrievalPrefetcher:
+    """
+    Start retrieval on a stable partial transcript of a spoken query.
+
+    If the final transcript matches the prefetched one (ignoring case and
+    punctuation), its chunks are reused; otherwise retrieval runs again.
+    Each retrieval uses its own short-lived session (see retrieve_context).
+    """
 
+    # Partial transcripts shorter than this are not worth retrieving for
+    MIN_WORDS = 3
+
+    def __init__(self, project_id: int | None = None, document_id: int | None = None):
+        self.project_id = project_id
+        self.document_id = document_id
+        self._key: str | None = None
+        self._task: asyncio.Task | None = None
+
+    async def _retrieve(self, query: str) -> list[dict]:
+        return await retrieve_context(query, self.project_id, self.document_id)
+
+    def update(self, transcript: str) -> None:
+        """Prefetch for a stable partial transcript (replacing a stale prefetch)."""
+        key = _query_key(transcript)
+        if key == self._key or len(key.split()) < self.MIN_WORDS:
+            return
+        self.cancel()
+        self._key = key
+        self._task = asyncio.create_task(self._retrieve(transcript))
+
+    async def result(self, transcript: str) -> list[dict]:
+        """Chunks for the final transcript, reusing the prefetch if it matches."""
+        if self._task is not None and _query_key(transcript) == self._key:
+            return await self._task
+        self.cancel()
+        return await self._retrieve(transcript)
+
+    def cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self._key = None
+
+
+async def stream_answer(query: str, chunks: list[dict]) -> AsyncGenerator[str, None]:
+    """Stream the LLM answer to a query, given the retrieved chunks."""
     # Build context from retrieved chunks
     context = "\n\n---\n\n".join(
         [f"[{c['filename']}, Page {c['page']}]:\n{c['content']}" for c in chunks]
@@ -63,11 +142,76 @@ async def generate_response(
         if chunk.content:
             yield str(chunk.content)
 
-    # Append sources with UUIDs for linking
-    yield "\n\n**Sources:**\n"
+
+def format_sources(chunks: list[dict]) -> list[str]:
+    """Markdown source list with UUIDs for linking."""
+    lines = ["\n\n**Sources:**\n"]
     seen_docs = set()
     for c in chunks:
         doc_key = c["document_uuid"]
         if doc_key not in seen_docs:
             seen_docs.add(doc_key)
-            yield f"- [{c['filename']}](/documents/{c['document_uuid']}), Page {c['page']}\n"
+            lines.append(
+                f"- [{c['filename']}](/documents/{c['document_uuid']}), Page {c['page']}\n"
+            )
+    return lines
+
+
+async def generate_response(
+    query: str,
+    project_id: int | None = None,
+    document_id: int | None = None,
+) -> AsyncGenerator[str, None]:
+    """
+    Generate a streaming response with RAG context using Ollama.
+
+    For multi-tenant security, pass project_id to scope retrieval to project documents.
+    No database connection is held while the answer streams.
+    """
+    chunks = await retrieve_context(query, project_id, document_id)
+
+    if not chunks:
+        yield NO_DOCUMENTS_MESSAGE
+        return
+
+    async for token in stream_answer(query, chunks):
+        yield token
+
+    # Append sources with UUIDs for linking
+    for line in format_sources(chunks):
+        yield line
+
+
+async def generate_spoken_response(
+    query: str,
+    voice: str,
+    project_id: int | None = None,
+    document_id: int | None = None,
+) -> AsyncGenerator[str, None]:
+    """
+    Stream the answer as server-sent events with sentence-level speech.
+
+    Events: "text" ({text}) for each LLM token, "audio" ({index, text,
+    audioContent, timepoints}) for each sentence in order, "audio_error"
+    ({index, error}) if a sentence could not be synthesized, "sources"
+    ({text}) with the markdown source list, and a final "done". Sources are
+    not spoken. As in generate_response, retrieval's session is closed
+    before the answer streams.
+    """
+    chunks = await retrieve_context(query, project_id, document_id)
+
+    async def answer_tokens() -> AsyncGenerator[str, None]:
+        if not chunks:
+            yield NO_DOCUMENTS_MESSAGE
+            return
+        async for token in stream_answer(query, chunks):
+            yield token
+
+    async for event, data in stream_speech_events(
+        answer_tokens(), voice, settings.tts_stream_concurrency
+    ):
+        yield format_sse(event, data)
+
+    if chunks:
+        yield format_sse("sources", {"text": "".join(format_sources(chunks))})
+    yield format_sse("done", {})
@@ -2,37 +2,54 @@ import asyncio
 from langchain_ollama import OllamaEmbeddings
 from app.core.config import settings
 
-# Initialize embeddings model (lazy loading)
-_embeddings_model = None
+# Initialize embeddings models (lazy loading, one per model name)
+_embeddings_models: dict[str, OllamaEmbeddings] = {}
 
 
-def get_embeddings_model() -> OllamaEmbeddings:
+def resolve_embedding_model(model: str | None = None) -> str:
+    """Return the model name to use, validating it against the registry."""
+    model = model or settings.embedding_model
+    if model not in settings.embedding_dimensions:
+        raise ValueError(f"Unknown embedding model: {model}")
+    return model
+
+
+def get_embedding_dimensions(model: str | None = None) -> int:
+    """Get the vector dimensions produced by an embedding model."""
+    return settings.embedding_dimensions[resolve_embedding_model(model)]
+
+
+def get_embeddings_model(model: str | None = None) -> OllamaEmbeddings:
     """Get or create the embeddings model instance."""
-    global _embeddings_model
-    if _embeddings_model is None:
-        _embeddings_model = OllamaEmbeddings(
-            model=settings.embedding_model, base_url=settings.ollama_base_url
+    model = resolve_embedding_model(model)
+    if model not in _embeddings_models:
+        _embeddings_models[model] = OllamaEmbeddings(
+            model=model, base_url=settings.ollama_base_url
         )
-    return _embeddings_model
+    return _embeddings_models[model]
 
 
-def _generate_embeddings_sync(texts: list[str]) -> list[list[float]]:
+def _generate_embeddings_sync(
+    texts: list[str], model: str | None = None
+) -> list[list[float]]:
     """Synchronous embedding generation."""
-    model = get_embeddings_model()
-    return model.embed_documents(texts)
+    embeddings_model = get_embeddings_model(model)
+    return embeddings_model.embed_documents(texts)
 
 
-def _generate_embedding_sync(text: str) -> list[float]:
+def _generate_embedding_sync(text: str, model: str | None = None) -> list[float]:
     """Synchronous single embedding generation."""
-    model = get_embeddings_model()
-    return model.embed_query(text)
+    embeddings_model = get_embeddings_model(model)
+    return embeddings_model.embed_query(text)
 
 
-async def generate_embeddings(texts: list[str]) -> list[list[float]]:
+async def generate_embeddings(
+    texts: list[str], model: str | None = None
+) -> list[list[float]]:
     """Generate embeddings for a list of texts using Ollama (async wrapper)."""
-    return await asyncio.to_thread(_generate_embeddings_sync, texts)
+    return await asyncio.to_thread(_generate_embeddings_sync, texts, model)
 
 
-async def generate_embedding(text: str) -> list[float]:
+async def generate_embedding(text: str, model: str | None = None) -> list[float]:
     """Generate embedding for a single text (async wrapper)."""
-    return await asyncio.to_thread(_generate_embedding_sync, text)
+    return await asyncio.to_thread(_generate_embedding_sync, text, model)
@@ -0,0 +1,215 @@
+"""
+Logo image pipeline.
+
+Uploaded logos are re-encoded into fixed-width variants (WebP and PNG,
+metadata stripped) in a process pool, off the request path. Variants are
+stored next to the original and picked per request from the Accept header
+and a requested width; until they exist, the original is served, marked
+for revalidation so caches pick up the variant once it is built.
+"""
+
+import asyncio
+import hashlib
+import io
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import Response
+
+from app.services.storage import (
+    get_storage,
+    logo_key,
+    logo_original_key,
+    logo_version,
+    put_bytes,
+    storage_response,
+)
+from app.services.workers import run_in_process
+
+# Variant widths in pixels (never upscaled beyond the original)
+LOGO_WIDTHS = (64, 128, 256, 512)
+
+# Variant formats, in order of preference when the client accepts them
+LOGO_FORMATS = {"webp": "image/webp", "png": "image/png"}
+
+# Sent with the original while variants are being built: it must not be
+# kept under a URL that will serve an optimized variant shortly
+ORIGINAL_CACHE_CONTROL = "no-cache"
+
+
+def logo_variant_key(project_uuid: str, version: str, width: int, fmt: str) -> str:
+    """Storage key of a logo variant."""
+    return f"logos/variants/{project_uuid}/{version}/{width}.{fmt}"
+
+
+def render_logo_variants(source: bytes) -> dict[tuple[int, str], bytes]:
+    """
+    Encode every (width, format) variant of a logo (runs in a worker process).
+
+    Only pixel data is written, so EXIF, text chunks and ICC profiles are
+    dropped.
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(source)) as image:
+        image.load()
+        image = image.convert("RGBA")
+
+    variants = {}
+    for width in LOGO_WIDTHS:
+        target = image
+        if width < image.width:
+            height = max(1, round(image.height * width / image.width))
+            target = image.resize((width, height), Image.Resampling.LANCZOS)
+        for fmt in LOGO_FORMATS:
+            output = io.BytesIO()
+            if fmt == "webp":
+                target.save(output, format="WEBP", quality=85, method=6)
+            else:
+                target.save(output, format="PNG", optimize=True)
+            variants[(width, fmt)] = output.getvalue()
+    return variants
+
+
+async def find_logo_original(project_uuid: str, version: str) -> Optional[str]:
+    """
+    Storage key of a logo version's original, or None if it is not stored.
+
+    Logos uploaded before originals were kept per version live at
+    logos/<uuid>.png; that file is adopted (copied to its versioned key)
+    only if its content is this version.
+    """
+    storage = get_storage()
+    key = logo_original_key(project_uuid, version)
+    if await storage.exists(key):
+        return key
+
+    legacy_key = logo_key(f"{project_uuid}.png")
+    if not await storage.exists(legacy_key):
+        return None
+    async with storage.local_path(legacy_key) as path:
+        data = await asyncio.to_thread(path.read_bytes)
+    if logo_version(hashlib.sha256(data).hexdigest()) != version:
+        return None
+    await put_bytes(key, data)
+    return key
+
+
+async def generate_logo_variants(project_uuid: str, version: str) -> None:
+    """
+    Build and store all variants of a project's logo.
+
+    Runs as a background task after upload; errors are logged and the
+    original keeps being served.
+    """
+    try:
+        storage = get_storage()
+        key = await find_logo_original(project_uuid, version)
+        if key is None:
+            return
+        async with storage.local_path(key) as path:
+            source = await asyncio.to_thread(path.read_bytes)
+
+        variants = await run_in_process(render_logo_variants, source)
+
+        for (width, fmt), data in variants.items():
+            await put_bytes(logo_variant_key(project_uuid, version, width, fmt), data)
+    except Exception as e:
+        print(f"Error generating logo variants for project {project_uuid}: {e}")
+
+
+async def delete_logo_version(project_uuid: str, version: str) -> None:
+    """Delete the stored original and variants of a previous logo version."""
+    storage = get_storage()
+    await storage.delete(logo_original_key(project_uuid, version))
+    await storage.delete(logo_key(f"{project_uuid}.png"))
+    for width in LOGO_WIDTHS:
+        for fmt in LOGO_FORMATS:
+            await storage.delete(logo_variant_key(project_uuid, version, width, fmt))
+
+
+def accepts_media_type(accept: Optional[str], media_type: str) -> bool:
+    """Whether an Accept header lists `media_type` explicitly with q > 0."""
+    for entry in (accept or "").split(","):
+        name, *params = [part.strip() for part in entry.split(";")]
+        if name.lower() != media_type:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        return quality > 0
+    return False
+
+
+def negotiate_logo_variant(accept: Optional[str], width: Optional[int]) -> tuple[int, str]:
+    """
+    Pick the variant for a request.
+
+    The width is the smallest variant at least as wide as requested (the
+    largest if none is, or if no width was requested); WebP is used when
+    the client accepts it.
+    """
+    fmt = "webp" if accepts_media_type(accept, "image/webp") else "png"
+    if width is None:
+        return LOGO_WIDTHS[-1], fmt
+    for candidate in LOGO_WIDTHS:
+        if candidate >= width:
+            return candidate, fmt
+    return LOGO_WIDTHS[-1], fmt
+
+
+async def logo_response(
+    request: Request,
+    project_uuid: str,
+    version: Optional[str],
+    width: Optional[int] = None,
+    cache_control: Optional[str] = None,
+) -> Response:
+    """
+    Serve the best logo variant for the request, or the original.
+
+    `cache_control` applies to variants; the original is only a stand-in
+    until they exist, so it is sent with ORIGINAL_CACHE_CONTROL and an ETag
+    distinct from every variant's. Versions that are no longer stored
+    (replaced by a newer upload) are not found.
+    """
+    if version is not None:
+        variant_width, fmt = negotiate_logo_variant(
+            request.headers.get("accept"), width
+        )
+        key = logo_variant_key(project_uuid, version, variant_width, fmt)
+        if await get_storage().exists(key):
+            return await storage_response(
+                request,
+                key,
+                media_type=LOGO_FORMATS[fmt],
+                etag=f'"{version}-{variant_width}.{fmt}"',
+                cache_control=cache_control,
+                headers={"Vary": "Accept"},
+                not_found="Logo not found",
+            )
+
+    if version is not None:
+        key = await find_logo_original(project_uuid, version)
+        if key is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Logo not found",
+            )
+    else:
+        key = logo_key(f"{project_uuid}.png")
+
+    return await storage_response(
+        request,
+        key,
+        media_type="image/png",
+        etag=f'"{version}-original"' if version else None,
+        cache_control=ORIGINAL_CACHE_CONTROL,
+        headers={"Vary": "Accept"},
+        not_found="Logo not found",
+    )
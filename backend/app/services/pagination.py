@@ -0,0 +1,133 @@
+"""
+Keyset (cursor) pagination for admin lists.
+
+Lists are ordered newest first on (created_at, id), which composite indexes
+cover. A page after the first is requested with the opaque `next_cursor`
+of the previous one; the database seeks straight to it instead of scanning
+and discarding OFFSET rows. `page` is still accepted for numbered
+navigation, but deep pages cost more.
+
+Totals are optional: "exact" runs COUNT(*), "estimate" reads the planner's
+row estimate from pg_class.reltuples (unfiltered lists on PostgreSQL; exact
+otherwise), "none" skips counting.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Literal, Optional, Sequence, TypeVar
+
+from fastapi import HTTPException, status
+from sqlalchemy import ColumnElement, Select, func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+CountMode = Literal["exact", "estimate", "none"]
+
+T = TypeVar("T")
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque cursor pointing just after the row (created_at, row_id)."""
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Parse a cursor from encode_cursor(); raises HTTPException(400) if invalid."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def keyset_order(model) -> tuple:
+    """ORDER BY for keyset pages: newest first, id breaking ties."""
+    return (model.created_at.desc(), model.id.desc())
+
+
+def keyset_filter(model, cursor: str):
+    """WHERE clause selecting the rows after `cursor` in keyset_order()."""
+    created_at, row_id = decode_cursor(cursor)
+    return tuple_(model.created_at, model.id) < tuple_(created_at, row_id)
+
+
+def apply_page(
+    query: Select,
+    model,
+    page: int,
+    per_page: int,
+    cursor: Optional[str] = None,
+    rank: Optional[ColumnElement] = None,
+) -> Select:
+    """
+    Order and window a list query, fetching per_page + 1 rows (see split_page).
+
+    With a search `rank`, rows are ordered by relevance and paged by number
+    only, since cursors follow the (created_at, id) order; a cursor is then
+    rejected with 400 rather than ignored.
+    """
+    if rank is not None:
+        if cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Ranked search results are paged by number, not cursor",
+            )
+        query = query.order_by(rank.desc(), *keyset_order(model))
+        return query.offset((page - 1) * per_page).limit(per_page + 1)
+
+    query = query.order_by(*keyset_order(model))
+    if cursor:
+        query = query.where(keyset_filter(model, cursor))
+    else:
+        query = query.offset((page - 1) * per_page)
+    return query.limit(per_page + 1)
+
+
+def split_page(
+    rows: Sequence[T],
+    per_page: int,
+    key: Optional[Callable[[T], tuple[datetime, int]]],
+) -> tuple[list[T], Optional[str]]:
+    """
+    Trim a page fetched with limit per_page + 1.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page, or
+    when `key` (giving (created_at, id) of a row) is None.
+    """
+    if len(rows) <= per_page or key is None:
+        return list(rows[:per_page]), None
+    rows = list(rows[:per_page])
+    return rows, encode_cursor(*key(rows[-1]))
+
+
+async def count_total(
+    db: AsyncSession, model, filters: Sequence[Any], mode: CountMode = "exact"
+) -> Optional[int]:
+    """Total rows for a list, per `mode` (see module docstring)."""
+    if mode == "none":
+        return None
+
+    if mode == "estimate" and not filters:
+        connection = await db.connection()
+        if connection.dialect.name == "postgresql":
+            result = await db.execute(
+                text(
+                    "SELECT reltuples::bigint FROM pg_class "
+                    "WHERE oid = CAST(:table AS regclass)"
+                ),
+                {"table": model.__tablename__},
+            )
+            estimate = result.scalar()
+            # -1 until the table has been vacuumed or analyzed
+            if estimate is not None and estimate >= 0:
+                return estimate
+
+    query = select(func.count()).select_from(model)
+    if filters:
+        query = query.where(*filters)
+    return (await db.execute(query)).scalar() or 0
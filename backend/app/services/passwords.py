@@ -0,0 +1,162 @@
+"""
+Password hashing off the event loop, with admission control.
+
+bcrypt takes 100-300 ms per call and releases the GIL while it runs, so it
+is executed in a small dedicated thread pool: a login storm then queues
+behind that pool instead of stalling every other request (chat streams,
+speech) on the worker. When the queue is full, callers get 503 at once
+rather than waiting; login attempts are additionally rate limited per
+client IP and per email before any hashing happens.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, status
+
+from app.core import security
+from app.core.config import settings
+
+_thread_pool: Optional[ThreadPoolExecutor] = None
+
+# Pool counters, reported by password_pool_stats()
+_in_flight = 0
+_completed = 0
+_rejected = 0
+
+
+def get_password_pool() -> ThreadPoolExecutor:
+    """Get or create the password hashing thread pool."""
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(
+            max_workers=settings.password_hash_workers,
+            thread_name_prefix="bcrypt",
+        )
+    return _thread_pool
+
+
+def shutdown_password_pool() -> None:
+    """Stop the password hashing pool (called on application shutdown)."""
+    global _thread_pool
+    if _thread_pool is not None:
+        _thread_pool.shutdown(cancel_futures=True)
+        _thread_pool = None
+
+
+def password_pool_stats() -> dict:
+    """Queue depth and throughput of the password hashing pool."""
+    return {
+        "workers": settings.password_hash_workers,
+        "in_flight": _in_flight,
+        "queued": max(0, _in_flight - settings.password_hash_workers),
+        "max_queue": settings.password_hash_max_queue,
+        "completed": _completed,
+        "rejected": _rejected,
+    }
+
+
+async def _run_bounded(func: Callable[..., Any], *args: Any) -> Any:
+    global _in_flight, _completed, _rejected
+    capacity = settings.password_hash_workers + settings.password_hash_max_queue
+    if _in_flight >= capacity:
+        _rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many password checks in progress, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+    _in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_password_pool(), func, *args)
+    finally:
+        _in_flight -= 1
+        _completed += 1
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password with bcrypt in the password pool."""
+    return await _run_bounded(security.hash_password, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its bcrypt hash in the password pool."""
+    return await _run_bounded(
+        security.verify_password, plain_password, hashed_password
+    )
+
+
+class RateLimiter:
+    """
+    Token bucket per key: `per_minute` attempts, refilled continuously.
+
+    At most `max_keys` buckets are kept; the least recently used are
+    dropped first (a dropped bucket starts full again).
+    """
+
+    def __init__(self, per_minute: int, max_keys: int = 100_000):
+        self.per_minute = per_minute
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+
+    def acquire(self, key: str) -> float:
+        """Take one token for `key`; returns 0, or seconds until one is free."""
+        now = time.monotonic()
+        rate = self.per_minute / 60
+        tokens, updated_at = self._buckets.get(key, (self.per_minute, now))
+        tokens = min(self.per_minute, tokens + (now - updated_at) * rate)
+
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            return (1 - tokens) / rate
+
+        self._buckets[key] = (tokens - 1, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return 0.0
+
+
+_login_limiters: Optional[tuple[RateLimiter, RateLimiter]] = None
+
+
+def check_login_rate(ip_address: Optional[str], email: str) -> None:
+    """
+    Admit a login attempt or raise HTTPException(429).
+
+    Applied before the password is checked, so throttled attempts cost no
+    bcrypt work.
+    """
+    global _login_limiters
+    if _login_limiters is None:
+        _login_limiters = (
+            RateLimiter(settings.login_rate_per_ip),
+            RateLimiter(settings.login_rate_per_email),
+        )
+    ip_limiter, email_limiter = _login_limiters
+
+    retry_after = 0.0
+    if ip_limiter.per_minute > 0 and ip_address:
+        retry_after = ip_limiter.acquire(ip_address)
+    if not retry_after and email_limiter.per_minute > 0:
+        retry_after = email_limiter.acquire(email.lower())
+
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, please retry later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+def reset_login_rate_limits() -> None:
+    """Forget all login attempts (limits are re-read from settings)."""
+    global _login_limiters
+    _login_limiters = None
@@ -1,16 +1,25 @@
+from sqlalchemy import insert, literal, select
+from sqlalchemy.orm import aliased
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models import Document, Chunk
-from app.services.storage import get_file_path
+from app.models import Document, Chunk, ChunkEmbedding, Project
+from app.services.storage import get_storage, document_key
 from app.services.extraction import extract_text
 from app.services.chunking import chunk_text
-from app.services.embedding import generate_embeddings
+from app.services.embedding import generate_embeddings, resolve_embedding_model
+from app.services.retrieval import get_project_embedding_model
+
+# Chunks embedded per Ollama call when backfilling
+EMBED_BATCH_SIZE = 128
 
 
 async def process_document(document_id: int, db: AsyncSession):
     """
     Full RAG pipeline: extract → chunk → embed → store.
 
-    This processes a document and creates searchable vector embeddings.
+    This processes a document and creates searchable vector embeddings
+    using the embedding model active for the document's project. If a
+    document with identical content was already processed, its chunks and
+    embeddings are copied instead.
     """
     # Get document
     document = await db.get(Document, document_id)
@@ -21,9 +30,30 @@ async def process_document(document_id: int, db: AsyncSession):
     await db.commit()
 
     try:
-        # Extract text from file
-        file_path = get_file_path(document.filename)
-        pages = extract_text(file_path)
+        model = await get_project_embedding_model(db, document.project_id)
+
+        source_id = await _find_processed_duplicate(db, document)
+        if source_id is not None:
+            # One transaction: a failure leaves no partial copy behind
+            chunks_created = await _copy_chunks(db, source_id, document.id, model)
+            await embed_missing_chunks(
+                db, model, Chunk.document_id == document.id, commit=False
+            )
+
+            document.status = "ready"
+            await db.commit()
+
+            return {
+                "document_id": document.id,
+                "chunks_created": chunks_created,
+                "embedding_model": model,
+                "reused_document_id": source_id,
+                "status": "ready",
+            }
+
+        # Extract text from file (downloaded to a temp file if stored remotely)
+        async with get_storage().local_path(document_key(document.filename)) as path:
+            pages = extract_text(path)
 
         if not pages:
             raise ValueError("No text content extracted from document")
@@ -36,7 +66,7 @@ async def process_document(document_id: int, db: AsyncSession):
 
         # Generate embeddings (batch for efficiency)
         texts = [c["content"] for c in chunks]
-        embeddings = await generate_embeddings(texts)
+        embeddings = await generate_embeddings(texts, model)
 
         # Store chunks with embeddings
         for chunk_data, embedding in zip(chunks, embeddings):
@@ -45,7 +75,7 @@ async def process_document(document_id: int, db: AsyncSession):
                 content=chunk_data["content"],
                 page_number=chunk_data["page"],
                 chunk_index=chunk_data["chunk_index"],
-                embedding=embedding,
+                embeddings=[ChunkEmbedding(model=model, embedding=embedding)],
             )
             db.add(chunk)
 
@@ -55,11 +85,144 @@ async def process_document(document_id: int, db: AsyncSession):
         return {
             "document_id": document.id,
             "chunks_created": len(chunks),
+            "embedding_model": model,
             "status": "ready",
         }
 
     except Exception as e:
+        await db.rollback()
         document.status = "error"
         document.error_message = str(e)
         await db.commit()
         raise
+
+
+async def _find_processed_duplicate(db: AsyncSession, document: Document) -> int | None:
+    """Find an already-processed document with the same content, if any."""
+    if document.content_hash is None:
+        return None
+
+    result = await db.execute(
+        select(Document.id)
+        .where(Document.content_hash == document.content_hash)
+        .where(Document.filename == document.filename)
+        .where(Document.status == "ready")
+        .where(Document.id != document.id)
+        .order_by(Document.id.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _copy_chunks(
+    db: AsyncSession, source_id: int, target_id: int, model: str
+) -> int:
+    """
+    Copy a document's chunks, and its embeddings for `model`, to another document.
+
+    Runs as two INSERT ... SELECT statements so chunk text and vectors never
+    leave the database. Returns the number of chunks copied.
+    """
+    result = await db.execute(
+        insert(Chunk).from_select(
+            ["document_id", "content", "page_number", "chunk_index"],
+            select(
+                literal(target_id), Chunk.content, Chunk.page_number, Chunk.chunk_index
+            ).where(Chunk.document_id == source_id),
+        )
+    )
+    copied = result.rowcount or 0
+
+    # chunk_index is unique within a document, so it pairs copies with sources
+    source = aliased(Chunk)
+    target = aliased(Chunk)
+    await db.execute(
+        insert(ChunkEmbedding).from_select(
+            ["chunk_id", "model", "embedding"],
+            select(target.id, ChunkEmbedding.model, ChunkEmbedding.embedding)
+            .join(source, ChunkEmbedding.chunk_id == source.id)
+            .join(
+                target,
+                (target.chunk_index == source.chunk_index)
+                & (target.document_id == target_id),
+            )
+            .where(source.document_id == source_id)
+            .where(ChunkEmbedding.model == model),
+        )
+    )
+    return copied
+
+
+async def embed_missing_chunks(
+    db: AsyncSession, model: str, *filters, commit: bool = True
+) -> int:
+    """
+    Embed chunks matching `filters` that have no embedding for `model` yet.
+
+    Chunk text is already stored, so only the embedding step runs. Commits
+    after each batch unless `commit` is False, in which case the caller
+    commits. Returns the number of chunks embedded.
+    """
+    model = resolve_embedding_model(model)
+    has_embedding = (
+        select(ChunkEmbedding.chunk_id)
+        .where(ChunkEmbedding.chunk_id == Chunk.id)
+        .where(ChunkEmbedding.model == model)
+        .exists()
+    )
+    query = (
+        select(Chunk.id, Chunk.content)
+        .join(Document, Chunk.document_id == Document.id)
+        .where(*filters)
+        .where(~has_embedding)
+        .order_by(Chunk.id)
+        .limit(EMBED_BATCH_SIZE)
+    )
+
+    total = 0
+    while True:
+        rows = (await db.execute(query)).all()
+        if not rows:
+            return total
+
+        embeddings = await generate_embeddings([row.content for row in rows], model)
+        db.add_all(
+            ChunkEmbedding(chunk_id=row.id, model=model, embedding=embedding)
+            for row, embedding in zip(rows, embeddings)
+        )
+        if commit:
+            await db.commit()
+        total += len(rows)
+
+
+async def embed_project_chunks(project_id: int, model: str, db: AsyncSession) -> int:
+    """
+    Embed every chunk of a project that has no embedding for the given model yet.
+
+    Used when a project switches embedding models. Returns the number of
+    chunks embedded.
+    """
+    return await embed_missing_chunks(db, model, Document.project_id == project_id)
+
+
+async def switch_project_embedding_model(
+    project_id: int, model: str, db: AsyncSession
+) -> int:
+    """
+    Backfill a project's pending embedding model, then make it active.
+
+    Retrieval keeps using the current model until every chunk has an
+    embedding for the new one. Nothing is promoted if the project has
+    since chosen another model. Returns the number of chunks embedded.
+    """
+    total = await embed_project_chunks(project_id, model, db)
+
+    project = await db.get(Project, project_id)
+    if project is None or project.pending_embedding_model != model:
+        return total
+    project.embedding_model = model
+    project.pending_embedding_model = None
+    await db.commit()
+
+    # Documents processed with the previous model while backfilling
+    return total + await embed_project_chunks(project_id, model, db)
@@ -0,0 +1,106 @@
+"""
+Project queries that return response-ready rows.
+
+Every project endpoint needs the project plus its document count and
+customer name/UUID. These are fetched in one statement: the customer via a
+LEFT JOIN and the count via a correlated subquery (evaluated only for the
+rows returned, using the documents.project_id index), so a page of N
+projects costs one query instead of 2N + 1.
+"""
+
+from typing import Optional
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import sign_asset_url
+from app.models.customer import Customer
+from app.models.document import Document
+from app.models.project import Project
+from app.services.pagination import keyset_order
+
+# Tables a project response is built from (for read-your-writes routing)
+PROJECT_RESPONSE_TABLES = ("projects", "documents", "customers")
+
+
+def project_rows_query(*filters) -> Select:
+    """SELECT of (Project, documents_count, customer_name, customer_uuid)."""
+    documents_count = (
+        select(func.count(Document.id))
+        .where(Document.project_id == Project.id)
+        .correlate(Project)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Project,
+            documents_count.label("documents_count"),
+            Customer.name.label("customer_name"),
+            Customer.uuid.label("customer_uuid"),
+        )
+        .outerjoin(Customer, Customer.id == Project.customer_id)
+        .where(*filters)
+    )
+
+
+def build_project_response(
+    project: Project,
+    documents_count: Optional[int],
+    customer_name: Optional[str],
+    customer_uuid,
+) -> dict:
+    """Build a ProjectResponse dict from a project_rows_query() row."""
+    return {
+        "id": project.id,
+        "uuid": project.uuid,
+        "customer_id": project.customer_id,
+        "name": project.name,
+        "slug": project.slug,
+        "description": project.description,
+        "subdomain": project.subdomain,
+        "logo": sign_asset_url(project.logo),
+        "title": project.title,
+        "subtitle": project.subtitle,
+        "body": project.body,
+        "color_primary": project.color_primary,
+        "color_secondary": project.color_secondary,
+        "color_background": project.color_background,
+        "avatar": project.avatar,
+        "voice": project.voice,
+        "return_link": project.return_link,
+        "return_link_text": project.return_link_text,
+        "embedding_model": project.embedding_model,
+        "pending_embedding_model": project.pending_embedding_model,
+        "is_active": project.is_active,
+        "created_at": project.created_at,
+        "updated_at": project.updated_at,
+        "documents_count": documents_count or 0,
+        "customer_name": customer_name,
+        "customer_uuid": customer_uuid,
+    }
+
+
+async def fetch_project_responses(db: AsyncSession, query: Select) -> list[dict]:
+    """Run a (windowed) project_rows_query() and build the response dicts."""
+    result = await db.execute(query)
+    return [build_project_response(*row) for row in result.all()]
+
+
+async def list_project_responses(
+    db: AsyncSession, *filters, offset: int = 0, limit: Optional[int] = None
+) -> list[dict]:
+    """Project response dicts matching `filters`, newest first, in one query."""
+    query = (
+        project_rows_query(*filters)
+        .order_by(*keyset_order(Project))
+        .offset(offset)
+        .limit(limit)
+    )
+    return await fetch_project_responses(db, query)
+
+
+async def get_project_response(db: AsyncSession, *filters) -> Optional[dict]:
+    """The response dict of the project matching `filters`, or None."""
+    result = await db.execute(project_rows_query(*filters))
+    row = result.one_or_none()
+    return build_project_response(*row) if row else None
@@ -1,6 +1,53 @@
-from sqlalchemy import text
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.services.embedding import generate_embedding
+from app.core.config import settings
+from app.models.project import Project
+from app.services.embedding import (
+    generate_embedding,
+    get_embedding_dimensions,
+    resolve_embedding_model,
+)
+
+
+def documents_key(project_id: int | None):
+    """Write key of a project's documents, for read-your-writes replica routing."""
+    return ("project", project_id) if project_id is not None else "documents"
+
+
+async def get_project_embedding_model(db: AsyncSession, project_id: int | None) -> str:
+    """Get the active embedding model for a project (settings default if unset)."""
+    model = None
+    if project_id is not None:
+        result = await db.execute(
+            select(Project.embedding_model).where(Project.id == project_id)
+        )
+        model = result.scalar_one_or_none()
+    return resolve_embedding_model(model)
+
+
+def _index_distance(mode: str, dimensions: int, embedding_str: str) -> str:
+    """
+    SQL distance expression matching the ANN index for a storage mode.
+
+    The expressions must match the index definitions in
+    app.services.vector_indexes exactly for the planner to use them.
+    """
+    if mode == "full":
+        return (
+            f"e.embedding::vector({dimensions}) <=> "
+            f"'{embedding_str}'::vector({dimensions})"
+        )
+    if mode == "halfvec":
+        return (
+            f"e.embedding::halfvec({dimensions}) <=> "
+            f"'{embedding_str}'::halfvec({dimensions})"
+        )
+    if mode == "binary":
+        return (
+            f"binary_quantize(e.embedding::vector({dimensions}))::bit({dimensions}) "
+            f"<~> binary_quantize('{embedding_str}'::vector({dimensions}))"
+        )
+    raise ValueError(f"Unknown vector index mode: {mode}")
 
 
 async def search_similar_chunks(
@@ -9,21 +56,63 @@ async def search_similar_chunks(
     project_id: int | None = None,
     document_id: int | None = None,
     limit: int = 5,
+    model: str | None = None,
 ) -> list[dict]:
     """
     Find chunks most similar to the query using pgvector.
 
     IMPORTANT: For multi-tenant security, always pass project_id to scope results.
 
+    The query is embedded with the project's active embedding model (or
+    `model`, if given) and matched against that model's embeddings only, so
+    the search uses the model's own HNSW index. With a quantized
+    `vector_index_mode` the candidates come from the halfvec/binary index
+    and are re-ranked by full-precision similarity.
+
     Returns list of {id, content, page, document_id, document_uuid, filename, similarity}.
     """
-    query_embedding = await generate_embedding(query)
+    if model is None:
+        model = await get_project_embedding_model(db, project_id)
+    else:
+        model = resolve_embedding_model(model)
+
+    query_embedding = await generate_embedding(query, model)
+
+    return await search_by_embedding(
+        query_embedding,
+        db,
+        model,
+        project_id=project_id,
+        document_id=document_id,
+        limit=limit,
+    )
+
+
+async def search_by_embedding(
+    query_embedding: list[float],
+    db: AsyncSession,
+    model: str,
+    project_id: int | None = None,
+    document_id: int | None = None,
+    limit: int = 5,
+    mode: str | None = None,
+) -> list[dict]:
+    """
+    Find chunks closest to an already-computed query embedding.
+
+    `mode` overrides settings.vector_index_mode (used by the recall script).
+    """
+    model = resolve_embedding_model(model)
+    dimensions = get_embedding_dimensions(model)
+    mode = mode or settings.vector_index_mode
 
     # Convert embedding to pgvector format string
     embedding_str = "[" + ",".join(str(x) for x in query_embedding) + "]"
 
-    # Build WHERE clause based on filters
-    where_conditions = ["d.status = 'ready'"]
+    # Build WHERE clause based on filters. The model name is inlined (it is
+    # validated against the registry above) so the planner can match the
+    # per-model partial index predicate.
+    where_conditions = ["d.status = 'ready'", f"e.model = '{model}'"]
     params = {"limit": limit}
 
     if project_id is not None:
@@ -36,22 +125,53 @@ async def search_similar_chunks(
 
     where_clause = " AND ".join(where_conditions)
 
-    # pgvector cosine similarity search
-    sql = text(f"""
-        SELECT 
-            c.id,
-            c.content,
-            c.page_number,
-            c.document_id,
-            d.uuid as document_uuid,
-            d.original_filename,
-            1 - (c.embedding <=> '{embedding_str}'::vector) as similarity
-        FROM chunks c
-        JOIN documents d ON c.document_id = d.id
-        WHERE {where_clause}
-        ORDER BY c.embedding <=> '{embedding_str}'::vector
-        LIMIT :limit
-    """)
+    # Full-precision cosine distance, used for the final ranking
+    distance = _index_distance("full", dimensions, embedding_str)
+
+    if mode == "full":
+        # pgvector cosine similarity search (expression matches the index)
+        sql = text(f"""
+            SELECT
+                c.id,
+                c.content,
+                c.page_number,
+                c.document_id,
+                d.uuid as document_uuid,
+                d.original_filename,
+                1 - ({distance}) as similarity
+            FROM chunk_embeddings e
+            JOIN chunks c ON e.chunk_id = c.id
+            JOIN documents d ON c.document_id = d.id
+            WHERE {where_clause}
+            ORDER BY {distance}
+            LIMIT :limit
+        """)
+    else:
+        # Take candidates from the compact quantized index, then re-score
+        # them against the full-precision vectors
+        params["candidates"] = limit * settings.vector_rescore_factor
+        index_distance = _index_distance(mode, dimensions, embedding_str)
+        sql = text(f"""
+            SELECT *
+            FROM (
+                SELECT
+                    c.id,
+                    c.content,
+                    c.page_number,
+                    c.document_id,
+                    d.uuid as document_uuid,
+                    d.original_filename,
+                    1 - ({distance}) as similarity
+                FROM chunk_embeddings e
+                JOIN chunks c ON e.chunk_id = c.id
+                JOIN documents d ON c.document_id = d.id
+                WHERE {where_clause}
+                ORDER BY {index_distance}
+                LIMIT :candidates
+            ) candidates
+            ORDER BY similarity DESC
+            LIMIT :limit
+        """)
 
     result = await db.execute(sql, params)
 
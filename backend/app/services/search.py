@@ -0,0 +1,44 @@
+"""
+Admin search over users, customers and projects.
+
+Substring and prefix matches are written as ILIKE, which PostgreSQL answers
+from pg_trgm GIN indexes (migration 0012) instead of scanning the table.
+Results are ranked by trigram similarity to the search term; on databases
+without pg_trgm (SQLite in tests) matching still works, unranked.
+"""
+
+from typing import Optional
+
+from sqlalchemy import ColumnElement, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def contains_filter(term: str, *columns) -> ColumnElement:
+    """Rows where any of `columns` contains `term` (case-insensitive)."""
+    pattern = f"%{_escape_like(term)}%"
+    return or_(*(column.ilike(pattern, escape="\\") for column in columns))
+
+
+def prefix_filter(term: str, *columns) -> ColumnElement:
+    """Rows where any of `columns` starts with `term` (case-insensitive)."""
+    pattern = f"{_escape_like(term)}%"
+    return or_(*(column.ilike(pattern, escape="\\") for column in columns))
+
+
+async def similarity_rank(
+    db: AsyncSession, term: str, *columns
+) -> Optional[ColumnElement]:
+    """
+    Relevance of a row to `term`: best trigram similarity over `columns`.
+
+    Returns None when the database has no pg_trgm (results stay unranked).
+    """
+    connection = await db.connection()
+    if connection.dialect.name != "postgresql":
+        return None
+    similarities = [func.similarity(func.coalesce(column, ""), term) for column in columns]
+    return similarities[0] if len(similarities) == 1 else func.greatest(*similarities)
@@ -1,9 +1,140 @@
-"""Speech services for STT and TTS using Google Cloud APIs."""
+"""Speech services for STT and TTS (Google Cloud APIs by default)."""
 
 import base64
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from app.core.config import settings
+from app.services.speech_providers import SpeechProvider, create_speech_provider
+from app.services.storage import UPLOAD_DIR
+from app.services.timepoints import timepoints_for_audio
+from app.services.tts_cache import CachedSpeech, TTSCache, speech_cache_key
+
+# Synthesized audio cache directory (kept with the uploads volume)
+TTS_CACHE_DIR = UPLOAD_DIR / ".cache" / "tts"
+
+_provider: Optional[SpeechProvider] = None
+_tts_cache: Optional[TTSCache] = None
+
+
+def get_speech_provider() -> SpeechProvider:
+    """Get or create the configured speech provider."""
+    global _provider
+    if _provider is None:
+        _provider = create_speech_provider()
+    return _provider
+
+
+def init_speech_provider() -> None:
+    """
+    Create the speech provider at startup so its clients are reused.
+
+    Failures (e.g. missing credentials) are logged rather than raised, so the
+    rest of the API still starts; speech requests retry the creation.
+    """
+    try:
+        get_speech_provider()
+    except Exception as e:
+        print(f"Speech provider unavailable: {e}")
+
+
+def set_speech_provider(provider: Optional[SpeechProvider]) -> None:
+    """Replace the speech provider (e.g. with a fake in tests)."""
+    global _provider
+    _provider = provider
+
+
+async def close_speech_provider() -> None:
+    """Close the speech provider's clients (called on application shutdown)."""
+    global _provider
+    if _provider is not None:
+        await _provider.close()
+        _provider = None
+
+
+def get_tts_cache() -> Optional[TTSCache]:
+    """Get or create the synthesized audio cache (None if disabled)."""
+    global _tts_cache
+    if not settings.tts_cache_enabled:
+        return None
+    if _tts_cache is None:
+        _tts_cache = TTSCache(
+            TTS_CACHE_DIR,
+            max_bytes=settings.tts_cache_max_mb * 1024 * 1024,
+            memory_max_bytes=settings.tts_cache_memory_mb * 1024 * 1024,
+        )
+    return _tts_cache
+
+
+def set_tts_cache(cache: Optional[TTSCache]) -> None:
+    """Replace the synthesized audio cache (e.g. with a temp one in tests)."""
+    global _tts_cache
+    _tts_cache = cache
+
+
+async def _synthesize_cached(
+    text: str, voice: str, speaking_rate: float = 1.0
+) -> bytes:
+    """
+    Synthesize text to MP3, using the audio cache.
+
+    Repeated phrases are served from memory or disk without calling the
+    provider; concurrent requests for the same phrase share one synthesis.
+    No timepoints are computed.
+    """
+
+    async def create() -> CachedSpeech:
+        audio = await get_speech_provider().synthesize(text, voice, speaking_rate)
+        return audio, None
+
+    cache = get_tts_cache()
+    if cache is None:
+        return (await create())[0]
+
+    key = speech_cache_key(voice, speaking_rate, text)
+    return (await cache.get_or_create(key, create))[0]
+
+
+async def _synthesize_timed(
+    text: str, voice: str, speaking_rate: float = 1.0
+) -> tuple[bytes, list[dict]]:
+    """
+    Synthesize text (MP3 plus word timepoints), using the audio cache.
+
+    Timepoints come from SSML marks when the voice supports them, otherwise
+    from aligning the words to the MP3, and are cached with the audio the
+    first time a caller needs them. Audio cached by plain synthesis is
+    aligned in place, unless the voice reports marks, in which case it is
+    synthesized again with them.
+    """
+    provider = get_speech_provider()
+    words = text.split()
+
+    async def create() -> CachedSpeech:
+        audio, marks = await provider.synthesize_timed(words, voice, speaking_rate)
+        return audio, await timepoints_for_audio(audio, words, marks)
+
+    cache = get_tts_cache()
+    if cache is None:
+        return await create()
+
+    key = speech_cache_key(voice, speaking_rate, text)
+    entry = await cache.get(key)
+    if entry is not None:
+        audio, timepoints = entry
+        if timepoints is not None:
+            return audio, timepoints
+        if not provider.reports_timepoints(words, voice):
+            timepoints = await timepoints_for_audio(audio, words)
+            await cache.put_timepoints(key, timepoints)
+            return audio, timepoints
+    return await cache.get_or_create(key, create, timed=True)
+
+
+async def synthesize_segment(
+    text: str, voice: Optional[str] = None
+) -> tuple[bytes, list[dict]]:
+    """Synthesize one sentence for streaming speech (MP3, timepoints)."""
+    return await _synthesize_timed(text, voice or settings.tts_voice)
 
 
 async def transcribe_audio(audio_bytes: bytes, language: Optional[str] = None) -> str:
@@ -17,27 +148,19 @@ async def transcribe_audio(audio_bytes: bytes, language: Optional[str] = None) -
     Returns:
         Transcribed text
     """
-    from google.cloud import speech
-
-    client = speech.SpeechClient()
-    audio = speech.RecognitionAudio(content=audio_bytes)
-
-    config = speech.RecognitionConfig(
-        encoding=speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
-        sample_rate_hertz=48000,
-        language_code=language or "en-US",
-        enable_automatic_punctuation=True,
-    )
+    return await get_speech_provider().transcribe(audio_bytes, language or "en-US")
 
-    response = client.recognize(config=config, audio=audio)
 
-    # Combine all transcription results
-    transcripts = []
-    for result in response.results:
-        if result.alternatives:
-            transcripts.append(result.alternatives[0].transcript)
+def transcribe_stream(
+    audio_chunks: AsyncIterator[bytes], language: Optional[str] = None
+) -> AsyncIterator[dict]:
+    """
+    Transcribe streamed audio, yielding interim and final transcripts.
 
-    return " ".join(transcripts)
+    Each update is {transcript, is_final, stability}; see
+    SpeechProvider.stream_transcribe.
+    """
+    return get_speech_provider().stream_transcribe(audio_chunks, language or "en-US")
 
 
 async def synthesize_speech(text: str, voice: Optional[str] = None) -> bytes:
@@ -51,30 +174,10 @@ async def synthesize_speech(text: str, voice: Optional[str] = None) -> bytes:
     Returns:
         Audio bytes (MP3 format)
     """
-    from google.cloud import texttospeech
-
-    client = texttospeech.TextToSpeechClient()
-
     # Use configured voice or default
-    voice_name = voice or getattr(settings, "tts_voice", "en-US-Neural2-F")
-
-    synthesis_input = texttospeech.SynthesisInput(text=text)
-
-    voice_params = texttospeech.VoiceSelectionParams(
-        language_code="en-US",
-        name=voice_name,
-    )
+    voice_name = voice or settings.tts_voice
 
-    audio_config = texttospeech.AudioConfig(
-        audio_encoding=texttospeech.AudioEncoding.MP3,
-        speaking_rate=1.0,
-    )
-
-    response = client.synthesize_speech(
-        input=synthesis_input, voice=voice_params, audio_config=audio_config
-    )
-
-    return response.audio_content
+    return await _synthesize_cached(text, voice_name)
 
 
 async def synthesize_for_avatar(text: str, voice: Optional[str] = None) -> dict:
@@ -83,7 +186,7 @@ async def synthesize_for_avatar(text: str, voice: Optional[str] = None) -> dict:
 
     Returns JSON with:
     - audioContent: base64 encoded MP3 audio
-    - timepoints: estimated word timing markers
+    - timepoints: word timing markers (SSML marks or aligned to the audio)
 
     Args:
         text: Text to convert to speech
@@ -92,47 +195,13 @@ async def synthesize_for_avatar(text: str, voice: Optional[str] = None) -> dict:
     Returns:
         Dict with audioContent and timepoints for TalkingHead
     """
-    from google.cloud import texttospeech
-
-    client = texttospeech.TextToSpeechClient()
-
     # Use configured voice or default
-    voice_name = voice or getattr(settings, "tts_voice", "en-US-Neural2-F")
-
-    words = text.split()
+    voice_name = voice or settings.tts_voice
 
-    # Create SSML with word marks for timing
-    # Use plain text for synthesis (Studio voices don't support SSML marks)
-    # We estimate timepoints manually below anyway
-    synthesis_input = texttospeech.SynthesisInput(text=text)
-
-    voice_params = texttospeech.VoiceSelectionParams(
-        language_code="en-US",
-        name=voice_name,
-    )
-
-    audio_config = texttospeech.AudioConfig(
-        audio_encoding=texttospeech.AudioEncoding.MP3,
-        speaking_rate=1.0,
-    )
-
-    response = client.synthesize_speech(
-        input=synthesis_input,
-        voice=voice_params,
-        audio_config=audio_config,
-    )
-
-    # Calculate estimated timepoints (Google doesn't always return them)
-    # Estimate ~150ms per word on average
-    timepoints = []
-    estimated_time = 0.0
-    for i, word in enumerate(words):
-        timepoints.append({"markName": str(i), "timeSeconds": estimated_time})
-        # Estimate duration based on word length
-        word_duration = max(0.15, len(word) * 0.06)
-        estimated_time += word_duration
+    # Timepoints are cached alongside the audio
+    audio_content, timepoints = await _synthesize_timed(text, voice_name)
 
     return {
-        "audioContent": base64.b64encode(response.audio_content).decode("utf-8"),
+        "audioContent": base64.b64encode(audio_content).decode("utf-8"),
         "timepoints": timepoints,
     }
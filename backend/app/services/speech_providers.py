@@ -0,0 +1,261 @@
+"""
+Speech providers for STT and TTS.
+
+The Google provider wraps the async Speech-to-Text and Text-to-Speech
+clients; it is created once (in the app lifespan) so the gRPC channels are
+reused across requests. The fake provider needs no credentials or network
+and is used in tests and offline development.
+"""
+
+import html
+import re
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Optional
+
+from app.core.config import settings
+
+# Silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz, 417 bytes, ~26 ms)
+SILENT_MP3_FRAME = bytes.fromhex("fffb9064") + bytes(413)
+SILENT_MP3_FRAME_SECONDS = 1152 / 44100
+
+
+# Google limit on SSML input size
+SSML_MAX_BYTES = 5000
+
+# Voice families that ignore SSML <mark> tags
+_NO_MARK_VOICES = re.compile(r"Studio|Journey|Chirp|Polyglot", re.IGNORECASE)
+
+
+def supports_ssml_marks(voice: str) -> bool:
+    """Whether a Google voice reports timepoints for SSML marks."""
+    return not _NO_MARK_VOICES.search(voice)
+
+
+def words_to_marked_ssml(words: list[str]) -> str:
+    """SSML with a <mark name="i"/> before word i."""
+    marked = " ".join(
+        f'<mark name="{i}"/>{html.escape(word, quote=False)}'
+        for i, word in enumerate(words)
+    )
+    return f"<speak>{marked}</speak>"
+
+
+class SpeechProvider(ABC):
+    """Interface implemented by every speech backend."""
+
+    @abstractmethod
+    async def transcribe(self, audio_bytes: bytes, language: str) -> str:
+        """Transcribe WebM/Opus audio to text."""
+
+    @abstractmethod
+    def stream_transcribe(
+        self, audio_chunks: AsyncIterator[bytes], language: str
+    ) -> AsyncIterator[dict]:
+        """
+        Transcribe streamed WebM/Opus audio.
+
+        Yields {transcript, is_final, stability} updates; `transcript` is
+        the whole utterance so far. The last update has is_final=True.
+        """
+
+    @abstractmethod
+    async def synthesize(self, text: str, voice: str, speaking_rate: float = 1.0) -> bytes:
+        """Synthesize text to MP3 audio."""
+
+    async def synthesize_timed(
+        self, words: list[str], voice: str, speaking_rate: float = 1.0
+    ) -> tuple[bytes, Optional[list[dict]]]:
+        """
+        Synthesize words and return (mp3, timepoints).
+
+        Timepoints ({markName, timeSeconds} per word) are None when the
+        voice cannot report them; the caller then aligns them locally.
+        """
+        return await self.synthesize(" ".join(words), voice, speaking_rate), None
+
+    def reports_timepoints(self, words: list[str], voice: str) -> bool:
+        """Whether synthesize_timed() returns timepoints for these words."""
+        return False
+
+    async def close(self) -> None:
+        """Release network resources."""
+
+
+class GoogleSpeechProvider(SpeechProvider):
+    """Google Cloud Speech-to-Text / Text-to-Speech via the async gRPC clients."""
+
+    def __init__(self):
+        from google.cloud import speech, texttospeech, texttospeech_v1beta1
+
+        self.speech = speech
+        self.texttospeech = texttospeech
+        self.texttospeech_v1beta1 = texttospeech_v1beta1
+        self.stt_client = speech.SpeechAsyncClient()
+        self.tts_client = texttospeech.TextToSpeechAsyncClient()
+        # Timepoints for SSML marks are only exposed by the v1beta1 API
+        self.tts_beta_client = texttospeech_v1beta1.TextToSpeechAsyncClient()
+
+    async def transcribe(self, audio_bytes: bytes, language: str) -> str:
+        speech = self.speech
+        audio = speech.RecognitionAudio(content=audio_bytes)
+
+        config = speech.RecognitionConfig(
+            encoding=speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
+            sample_rate_hertz=48000,
+            language_code=language,
+            enable_automatic_punctuation=True,
+        )
+
+        response = await self.stt_client.recognize(config=config, audio=audio)
+
+        # Combine all transcription results
+        transcripts = []
+        for result in response.results:
+            if result.alternatives:
+                transcripts.append(result.alternatives[0].transcript)
+
+        return " ".join(transcripts)
+
+    async def stream_transcribe(
+        self, audio_chunks: AsyncIterator[bytes], language: str
+    ) -> AsyncIterator[dict]:
+        speech = self.speech
+        streaming_config = speech.StreamingRecognitionConfig(
+            config=speech.RecognitionConfig(
+                encoding=speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
+                sample_rate_hertz=48000,
+                language_code=language,
+                enable_automatic_punctuation=True,
+            ),
+            interim_results=True,
+        )
+
+        async def requests():
+            yield speech.StreamingRecognizeRequest(streaming_config=streaming_config)
+            async for chunk in audio_chunks:
+                yield speech.StreamingRecognizeRequest(audio_content=chunk)
+
+        finalized: list[str] = []
+        responses = await self.stt_client.streaming_recognize(requests=requests())
+        async for response in responses:
+            interim = []
+            stability = 1.0
+            for result in response.results:
+                if not result.alternatives:
+                    continue
+                transcript = result.alternatives[0].transcript.strip()
+                if result.is_final:
+                    finalized.append(transcript)
+                else:
+                    interim.append(transcript)
+                    stability = min(stability, result.stability)
+            yield {
+                "transcript": " ".join(finalized + interim),
+                "is_final": False,
+                "stability": stability,
+            }
+
+        yield {"transcript": " ".join(finalized), "is_final": True, "stability": 1.0}
+
+    async def synthesize(self, text: str, voice: str, speaking_rate: float = 1.0) -> bytes:
+        texttospeech = self.texttospeech
+
+        synthesis_input = texttospeech.SynthesisInput(text=text)
+
+        voice_params = texttospeech.VoiceSelectionParams(
+            language_code="en-US",
+            name=voice,
+        )
+
+        audio_config = texttospeech.AudioConfig(
+            audio_encoding=texttospeech.AudioEncoding.MP3,
+            speaking_rate=speaking_rate,
+        )
+
+        response = await self.tts_client.synthesize_speech(
+            input=synthesis_input, voice=voice_params, audio_config=audio_config
+        )
+
+        return response.audio_content
+
+    async def synthesize_timed(
+        self, words: list[str], voice: str, speaking_rate: float = 1.0
+    ) -> tuple[bytes, Optional[list[dict]]]:
+        if not self.reports_timepoints(words, voice):
+            return await super().synthesize_timed(words, voice, speaking_rate)
+        ssml = words_to_marked_ssml(words)
+
+        tts = self.texttospeech_v1beta1
+        request = tts.SynthesizeSpeechRequest(
+            input=tts.SynthesisInput(ssml=ssml),
+            voice=tts.VoiceSelectionParams(language_code="en-US", name=voice),
+            audio_config=tts.AudioConfig(
+                audio_encoding=tts.AudioEncoding.MP3,
+                speaking_rate=speaking_rate,
+            ),
+            enable_time_pointing=[
+                tts.SynthesizeSpeechRequest.TimepointType.SSML_MARK
+            ],
+        )
+        response = await self.tts_beta_client.synthesize_speech(request=request)
+
+        timepoints = [
+            {"markName": tp.mark_name, "timeSeconds": tp.time_seconds}
+            for tp in response.timepoints
+        ]
+        return response.audio_content, timepoints
+
+    def reports_timepoints(self, words: list[str], voice: str) -> bool:
+        ssml = words_to_marked_ssml(words)
+        return (
+            supports_ssml_marks(voice) and len(ssml.encode("utf-8")) <= SSML_MAX_BYTES
+        )
+
+    async def close(self) -> None:
+        await self.stt_client.transport.close()
+        await self.tts_client.transport.close()
+        await self.tts_beta_client.transport.close()
+
+
+class FakeSpeechProvider(SpeechProvider):
+    """
+    Local provider for tests and offline development.
+
+    Transcription decodes the audio payload as UTF-8 text (streamed chunks
+    become interim transcripts); synthesis returns silent MP3 audio lasting
+    `seconds_per_word` per word.
+    """
+
+    def __init__(self, seconds_per_word: float = 0.3):
+        self.seconds_per_word = seconds_per_word
+        self.calls: list[tuple[str, str, float]] = []
+
+    async def transcribe(self, audio_bytes: bytes, language: str) -> str:
+        return audio_bytes.decode("utf-8", errors="ignore").strip()
+
+    async def stream_transcribe(
+        self, audio_chunks: AsyncIterator[bytes], language: str
+    ) -> AsyncIterator[dict]:
+        received = b""
+        async for chunk in audio_chunks:
+            received += chunk
+            transcript = " ".join(received.decode("utf-8", errors="ignore").split())
+            yield {"transcript": transcript, "is_final": False, "stability": 0.9}
+        transcript = " ".join(received.decode("utf-8", errors="ignore").split())
+        yield {"transcript": transcript, "is_final": True, "stability": 1.0}
+
+    async def synthesize(self, text: str, voice: str, speaking_rate: float = 1.0) -> bytes:
+        self.calls.append((text, voice, speaking_rate))
+        seconds = len(text.split()) * self.seconds_per_word / speaking_rate
+        frames = max(1, round(seconds / SILENT_MP3_FRAME_SECONDS))
+        return SILENT_MP3_FRAME * frames
+
+
+def create_speech_provider(name: Optional[str] = None) -> SpeechProvider:
+    """Create the provider selected by settings.speech_provider."""
+    name = name or settings.speech_provider
+    if name == "google":
+        return GoogleSpeechProvider()
+    if name == "fake":
+        return FakeSpeechProvider()
+    raise ValueError(f"Unknown speech provider: {name}")
@@ -0,0 +1,136 @@
+"""
+Sentence-level speech streaming.
+
+LLM tokens are split into sentences as they arrive; each sentence is
+synthesized as soon as it is complete (a bounded number at a time) and the
+audio segments are emitted strictly in sentence order, interleaved with the
+text tokens. The avatar can start speaking after the first sentence instead
+of after the whole answer.
+"""
+
+import asyncio
+import base64
+import json
+import re
+from typing import AsyncIterator, Optional
+
+from app.services.speech import synthesize_segment
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed by
+# whitespace, or a line break
+SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+|\n+")
+
+# Fragments shorter than this are merged into the next sentence
+MIN_SENTENCE_CHARS = 12
+
+
+class SentenceSplitter:
+    """Incrementally split streamed text into sentences."""
+
+    def __init__(self, min_chars: int = MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self.buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        """Add streamed text and return the sentences it completes."""
+        self.buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self.buffer):
+            candidate = self.buffer[start : match.end()].strip()
+            if len(candidate) >= self.min_chars:
+                sentences.append(candidate)
+                start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """Return whatever text is left at the end of the stream."""
+        rest = self.buffer.strip()
+        self.buffer = ""
+        return rest or None
+
+
+def speakable_text(sentence: str) -> str:
+    """Strip citations and markdown that should not be read aloud."""
+    text = re.sub(r"\[Source:[^\]]*\]", " ", sentence)
+    text = re.sub(r"\[([^\]]*)\]\([^)]*\)", r"\1", text)  # markdown links
+    text = re.sub(r"[*_`]+", "", text)  # emphasis and code markers
+    text = re.sub(r"[#>|]+", " ", text)  # headings, quotes, tables
+    return " ".join(text.split())
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_speech_events(
+    tokens: AsyncIterator[str], voice: str, max_concurrency: int
+) -> AsyncIterator[tuple[str, dict]]:
+    """
+    Yield ("text", ...) events as tokens arrive and ("audio", ...) events
+    for each sentence, in order, as soon as its synthesis finishes.
+
+    At most `max_concurrency` sentences are synthesized at once. A failed
+    sentence yields an ("audio_error", ...) event and the stream continues.
+    """
+    events: asyncio.Queue = asyncio.Queue()
+    segments: asyncio.Queue = asyncio.Queue()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    done = object()
+
+    async def synthesize(index: int, sentence: str) -> tuple[str, dict]:
+        async with semaphore:
+            try:
+                audio, timepoints = await synthesize_segment(sentence, voice)
+            except Exception as e:
+                return "audio_error", {"index": index, "error": str(e)}
+        return "audio", {
+            "index": index,
+            "text": sentence,
+            "audioContent": base64.b64encode(audio).decode("utf-8"),
+            "timepoints": timepoints,
+        }
+
+    async def read_tokens() -> None:
+        splitter = SentenceSplitter()
+        index = 0
+
+        def start(sentence: str) -> None:
+            nonlocal index
+            spoken = speakable_text(sentence)
+            if spoken:
+                segments.put_nowait(asyncio.create_task(synthesize(index, spoken)))
+                index += 1
+
+        try:
+            async for token in tokens:
+                await events.put(("text", {"text": token}))
+                for sentence in splitter.feed(token):
+                    start(sentence)
+            rest = splitter.flush()
+            if rest:
+                start(rest)
+        finally:
+            segments.put_nowait(done)
+
+    async def emit_segments() -> None:
+        # Sentence order is preserved by awaiting tasks in creation order
+        while (task := await segments.get()) is not done:
+            await events.put(await task)
+        await events.put(done)
+
+    reader = asyncio.create_task(read_tokens())
+    emitter = asyncio.create_task(emit_segments())
+    try:
+        while (event := await events.get()) is not done:
+            yield event
+        await reader  # surface LLM errors
+    finally:
+        for task in (reader, emitter):
+            task.cancel()
+        while not segments.empty():
+            task = segments.get_nowait()
+            if task is not done:
+                task.cancel()
@@ -1,67 +1,286 @@
+import asyncio
+import hashlib
 import uuid
 from pathlib import Path
-from fastapi import UploadFile
+from typing import Awaitable, Callable, Optional
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.responses import FileResponse, RedirectResponse, Response, StreamingResponse
 
-# Upload directory relative to backend
+from app.core.config import settings
+from app.core.security import PUBLIC_ASSET_PREFIX
+from app.services.storage_backends import (
+    StorageBackend,
+    content_disposition,
+    create_storage_backend,
+)
+
+# Upload directory relative to backend (root of the local storage backend)
 UPLOAD_DIR = Path(__file__).parent.parent.parent / "uploads"
-AVATAR_UPLOAD_DIR = UPLOAD_DIR / "avatars"
-LOGO_UPLOAD_DIR = UPLOAD_DIR / "logos"
+# Uploads are streamed here before being handed to the storage backend
+STAGING_DIR = UPLOAD_DIR / ".staging"
 
+# Bytes read from the upload per iteration
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
-async def save_uploaded_file(file: UploadFile) -> tuple[str, str]:
-    """Save uploaded file and return (stored_filename, original_filename)."""
-    UPLOAD_DIR.mkdir(exist_ok=True)
+_storage: Optional[StorageBackend] = None
 
-    ext = Path(file.filename).suffix if file.filename else ""
-    stored_filename = f"{uuid.uuid4()}{ext}"
-    file_path = UPLOAD_DIR / stored_filename
 
-    content = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
+def get_storage() -> StorageBackend:
+    """Get or create the configured storage backend."""
+    global _storage
+    if _storage is None:
+        _storage = create_storage_backend(UPLOAD_DIR)
+    return _storage
 
-    return stored_filename, file.filename or "unknown"
 
+def document_key(filename: str) -> str:
+    """Storage key of an uploaded document."""
+    return filename
 
-def get_file_path(filename: str) -> Path:
-    """Get the full path to an uploaded file."""
-    return UPLOAD_DIR / filename
 
+def avatar_key(filename: str) -> str:
+    """Storage key of an avatar GAB file."""
+    return f"avatars/{filename}"
 
-async def save_avatar_file(file: UploadFile) -> tuple[str, str]:
-    """Save uploaded GAB file with UUID filename."""
-    AVATAR_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
-    avatar_uuid = uuid.uuid4()
-    stored_filename = f"{avatar_uuid}.gab"
-    file_path = AVATAR_UPLOAD_DIR / stored_filename
+def logo_key(filename: str) -> str:
+    """Storage key of a project logo."""
+    return f"logos/{filename}"
+
+
+def logo_version(content_hash: str) -> str:
+    """Version of a logo (part of its URL), from its content hash."""
+    return content_hash[:16]
+
+
+def logo_original_key(project_uuid: str, version: str) -> str:
+    """
+    Storage key of one uploaded logo version.
+
+    Each version keeps its own key, so a still-valid signed URL of an older
+    version never serves newer bytes under its immutable ETag.
+    """
+    return logo_key(f"{project_uuid}/{version}.png")
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check an If-None-Match request header against a strong ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+async def storage_response(
+    request: Request,
+    key: str,
+    media_type: str,
+    filename: Optional[str] = None,
+    disposition: str = "inline",
+    etag: Optional[str] = None,
+    cache_control: Optional[str] = None,
+    headers: Optional[dict] = None,
+    not_found: str = "File not found",
+) -> Response:
+    """
+    Serve a stored file without reading it into memory.
+
+    - If-None-Match against `etag` short-circuits to 304 Not Modified.
+    - Object storage redirects to a presigned URL (the store handles Range).
+    - Local files go through FileResponse, which answers Range requests
+      (206) and uses zero-copy sendfile when the ASGI server supports the
+      http.response.pathsend extension.
+    - Anything else is streamed in chunks.
+
+    Raises HTTPException(404) with `not_found` if the file is missing.
+    """
+    headers = dict(headers or {})
+    if etag:
+        headers["ETag"] = etag
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+
+    if etag and etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    storage = get_storage()
+
+    presigned_url = await storage.presigned_url(
+        key,
+        settings.storage_presign_expire_seconds,
+        filename=filename,
+        content_type=media_type,
+        disposition=disposition,
+    )
+    if presigned_url:
+        return RedirectResponse(presigned_url, headers=headers)
+
+    path = storage.local_file(key)
+    if path is not None:
+        try:
+            stat_result = await asyncio.to_thread(path.stat)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=not_found)
+        return FileResponse(
+            path,
+            media_type=media_type,
+            filename=filename,
+            content_disposition_type=disposition,
+            stat_result=stat_result,
+            headers=headers,
+        )
+
+    file_size = await storage.size(key)
+    if file_size is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    headers["Content-Length"] = str(file_size)
+    if filename:
+        headers["Content-Disposition"] = content_disposition(disposition, filename)
+    return StreamingResponse(
+        storage.iter_range(key), media_type=media_type, headers=headers
+    )
+
+
+def logo_asset_path(project_uuid: str, version: str) -> str:
+    """Public (unsigned) asset path of a project logo; `version` busts caches."""
+    return f"{PUBLIC_ASSET_PREFIX}/logos/{project_uuid}/{version}.png"
+
 
-    content = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
+def logo_asset_version(url: Optional[str]) -> Optional[str]:
+    """Version of a logo stored at logo_asset_path(), or None for other URLs."""
+    if not url or not url.startswith(f"{PUBLIC_ASSET_PREFIX}/logos/"):
+        return None
+    return Path(url.split("?")[0]).stem
 
-    return stored_filename, file.filename or "unknown.gab"
 
+def avatar_asset_path(filename: str) -> str:
+    """Public (unsigned) asset path of an avatar GAB file."""
+    return f"{PUBLIC_ASSET_PREFIX}/avatars/{filename}"
 
-def get_avatar_path(filename: str) -> Path:
-    """Get full path to avatar file."""
-    return AVATAR_UPLOAD_DIR / filename
 
+class FileTooLargeError(ValueError):
+    """Raised when an upload exceeds its size limit."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        super().__init__(f"File size exceeds maximum of {max_size} bytes")
+
+
+async def _stream_to_path(
+    file: UploadFile, directory: Path, max_size: int | None = None
+) -> tuple[Path, str, int]:
+    """
+    Copy an upload to a temp file in `directory` chunk by chunk.
+
+    Hashes and size-checks while copying; disk writes run in a worker
+    thread so the event loop is never blocked. Memory use is one chunk
+    regardless of file size. Returns (temp_path, sha256_hex, size); the
+    caller hands the temp file to the storage backend.
+
+    Raises FileTooLargeError (and removes the partial file) if the upload
+    is larger than `max_size`.
+    """
+    # Reject early when the size is already known from the request
+    if max_size is not None and file.size is not None and file.size > max_size:
+        raise FileTooLargeError(max_size)
+
+    directory.mkdir(parents=True, exist_ok=True)
+    temp_path = directory / f".{uuid.uuid4()}.part"
+
+    digest = hashlib.sha256()
+    size = 0
+    f = await asyncio.to_thread(open, temp_path, "wb")
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if max_size is not None and size > max_size:
+                raise FileTooLargeError(max_size)
+            digest.update(chunk)
+            await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        await asyncio.to_thread(f.close)
+        temp_path.unlink(missing_ok=True)
+        raise
+    await asyncio.to_thread(f.close)
+
+    return temp_path, digest.hexdigest(), size
+
+
+async def put_bytes(key: str, data: bytes) -> None:
+    """Store generated content (e.g. image variants) under `key`."""
+    STAGING_DIR.mkdir(parents=True, exist_ok=True)
+    temp_path = STAGING_DIR / f".{uuid.uuid4()}.part"
+    await asyncio.to_thread(temp_path.write_bytes, data)
+    await get_storage().put_file(key, temp_path)
+
+
+async def save_uploaded_file(
+    file: UploadFile,
+    max_size: int | None = None,
+    lock: Callable[[str], Awaitable[None]] | None = None,
+) -> tuple[str, str, str, int]:
+    """
+    Save uploaded file under its content hash.
+
+    Returns (stored_filename, original_filename, content_hash, file_size).
+    Identical uploads map to the same stored file, which is written only once.
+    `lock`, if given, is awaited with the content hash before checking for
+    the stored file, so callers can keep it from being deleted meanwhile.
+    """
+    temp_path, content_hash, file_size = await _stream_to_path(
+        file, STAGING_DIR, max_size
+    )
+    if lock is not None:
+        try:
+            await lock(content_hash)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+    ext = Path(file.filename).suffix.lower() if file.filename else ""
+    stored_filename = f"{content_hash}{ext}"
+
+    storage = get_storage()
+    if await storage.exists(document_key(stored_filename)):
+        temp_path.unlink()
+    else:
+        await storage.put_file(document_key(stored_filename), temp_path)
+
+    return stored_filename, file.filename or "unknown", content_hash, file_size
+
+
+async def save_avatar_file(
+    file: UploadFile, max_size: int | None = None
+) -> tuple[str, str, int]:
+    """
+    Save uploaded GAB file with UUID filename.
+
+    Returns (stored_filename, original_filename, file_size).
+    """
+    temp_path, _, file_size = await _stream_to_path(file, STAGING_DIR, max_size)
+
+    avatar_uuid = uuid.uuid4()
+    stored_filename = f"{avatar_uuid}.gab"
+    await get_storage().put_file(avatar_key(stored_filename), temp_path)
 
-async def save_logo_file(file: UploadFile, project_uuid: str) -> str:
-    """Save uploaded PNG logo with project UUID filename."""
-    LOGO_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    return stored_filename, file.filename or "unknown.gab", file_size
 
-    stored_filename = f"{project_uuid}.png"
-    file_path = LOGO_UPLOAD_DIR / stored_filename
 
-    content = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
+async def save_logo_file(
+    file: UploadFile, project_uuid: str, max_size: int | None = None
+) -> tuple[str, str]:
+    """
+    Save uploaded PNG logo under its project UUID and version.
 
-    return stored_filename
+    Returns (stored_filename, content_hash).
+    """
+    temp_path, content_hash, _ = await _stream_to_path(file, STAGING_DIR, max_size)
 
+    # Moved into place in one step so a logo being served is never half-written
+    version = logo_version(content_hash)
+    stored_filename = f"{project_uuid}/{version}.png"
+    await get_storage().put_file(logo_original_key(project_uuid, version), temp_path)
 
-def get_logo_path(filename: str) -> Path:
-    """Get full path to logo file."""
-    return LOGO_UPLOAD_DIR / filename
+    return stored_filename, content_hash
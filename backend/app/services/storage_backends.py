@@ -0,0 +1,309 @@
+"""
+Storage backends for uploaded files.
+
+Files are addressed by key (e.g. "<sha256>.pdf", "avatars/<uuid>.gab").
+The local backend maps keys to paths under UPLOAD_DIR; the S3 backend maps
+them to objects in a bucket, which lets stateless API replicas share
+uploads. The S3 backend works with any S3-compatible server (MinIO for
+local development) and needs the optional boto3 dependency.
+"""
+
+import asyncio
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Optional
+from urllib.parse import quote
+
+from app.core.config import settings
+
+# Bytes per chunk when streaming file content
+READ_CHUNK_SIZE = 256 * 1024
+
+
+def content_disposition(disposition: str, filename: str) -> str:
+    """
+    Content-Disposition header value naming `filename`.
+
+    As in Starlette's FileResponse, names that are not plain ASCII go in a
+    percent-encoded filename* parameter, here with a printable-ASCII
+    filename fallback for clients that ignore it.
+    """
+    encoded = quote(filename)
+    if encoded == filename:
+        return f'{disposition}; filename="{filename}"'
+    fallback = "".join(c for c in filename if " " <= c <= "~" and c not in '"\\')
+    fallback = fallback.strip()
+    if not fallback:
+        return f"{disposition}; filename*=utf-8''{encoded}"
+    return f"{disposition}; filename=\"{fallback}\"; filename*=utf-8''{encoded}"
+
+
+class StorageBackend(ABC):
+    """Interface implemented by every storage driver."""
+
+    @abstractmethod
+    async def put_file(self, key: str, source: Path) -> None:
+        """Move a local (temporary) file into storage under `key`."""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Return True if `key` is stored."""
+
+    @abstractmethod
+    async def size(self, key: str) -> Optional[int]:
+        """Return the stored size in bytes, or None if missing."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Delete `key` (no error if missing)."""
+
+    @abstractmethod
+    def iter_range(
+        self, key: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Stream bytes `start`..`end` (inclusive) of `key`."""
+
+    @abstractmethod
+    def local_file(self, key: str) -> Optional[Path]:
+        """Return the file's local path if the backend is on local disk."""
+
+    @abstractmethod
+    async def presigned_url(
+        self,
+        key: str,
+        expires_in: int,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+        disposition: str = "inline",
+    ) -> Optional[str]:
+        """Return a time-limited direct download URL, if supported."""
+
+    @asynccontextmanager
+    async def local_path(self, key: str) -> AsyncIterator[Path]:
+        """
+        Yield a local path with the file's content (for parsers that need a file).
+
+        Local files are used in place; remote objects are downloaded to a
+        temporary file that is removed afterwards.
+        """
+        path = self.local_file(key)
+        if path is not None:
+            yield path
+            return
+
+        fd, temp_name = tempfile.mkstemp(suffix=Path(key).suffix)
+        temp_path = Path(temp_name)
+        try:
+            with open(fd, "wb") as f:
+                async for chunk in self.iter_range(key):
+                    await asyncio.to_thread(f.write, chunk)
+            yield temp_path
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+
+class LocalStorageBackend(StorageBackend):
+    """Files on the local filesystem under a root directory."""
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    async def put_file(self, key: str, source: Path) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(shutil.move, source, path)
+
+    async def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    async def size(self, key: str) -> Optional[int]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        return path.stat().st_size
+
+    async def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    async def iter_range(
+        self, key: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        remaining = None if end is None else end - start + 1
+        f = await asyncio.to_thread(open, self._path(key), "rb")
+        try:
+            await asyncio.to_thread(f.seek, start)
+            while remaining is None or remaining > 0:
+                size = READ_CHUNK_SIZE
+                if remaining is not None:
+                    size = min(size, remaining)
+                chunk = await asyncio.to_thread(f.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            await asyncio.to_thread(f.close)
+
+    def local_file(self, key: str) -> Optional[Path]:
+        return self._path(key)
+
+    async def presigned_url(
+        self,
+        key: str,
+        expires_in: int,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+        disposition: str = "inline",
+    ) -> Optional[str]:
+        return None
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    Objects in an S3-compatible bucket.
+
+    Uploads use multipart transfers above `multipart_chunk_size`, reads use
+    ranged GETs, and downloads can be handed off via presigned URLs.
+    boto3 is synchronous, so every call runs in a worker thread.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        multipart_chunk_size: int = 8 * 1024 * 1024,
+    ):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            # Path-style addressing works with MinIO and other stand-ins
+            config=Config(s3={"addressing_style": "path"}),
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_chunk_size,
+            multipart_chunksize=multipart_chunk_size,
+        )
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    async def put_file(self, key: str, source: Path) -> None:
+        try:
+            await asyncio.to_thread(
+                self.client.upload_file,
+                str(source),
+                self.bucket,
+                self._key(key),
+                Config=self.transfer_config,
+            )
+        finally:
+            source.unlink(missing_ok=True)
+
+    async def _head(self, key: str) -> Optional[dict]:
+        from botocore.exceptions import ClientError
+
+        try:
+            return await asyncio.to_thread(
+                self.client.head_object, Bucket=self.bucket, Key=self._key(key)
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return None
+            raise
+
+    async def exists(self, key: str) -> bool:
+        return await self._head(key) is not None
+
+    async def size(self, key: str) -> Optional[int]:
+        head = await self._head(key)
+        return head["ContentLength"] if head else None
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(
+            self.client.delete_object, Bucket=self.bucket, Key=self._key(key)
+        )
+
+    async def iter_range(
+        self, key: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        byte_range = f"bytes={start}-{'' if end is None else end}"
+        response = await asyncio.to_thread(
+            self.client.get_object,
+            Bucket=self.bucket,
+            Key=self._key(key),
+            Range=byte_range,
+        )
+        body = response["Body"]
+        try:
+            while chunk := await asyncio.to_thread(body.read, READ_CHUNK_SIZE):
+                yield chunk
+        finally:
+            body.close()
+
+    def local_file(self, key: str) -> Optional[Path]:
+        return None
+
+    async def presigned_url(
+        self,
+        key: str,
+        expires_in: int,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+        disposition: str = "inline",
+    ) -> Optional[str]:
+        params = {"Bucket": self.bucket, "Key": self._key(key)}
+        if filename:
+            params["ResponseContentDisposition"] = content_disposition(
+                disposition, filename
+            )
+        if content_type:
+            params["ResponseContentType"] = content_type
+        return await asyncio.to_thread(
+            self.client.generate_presigned_url,
+            "get_object",
+            Params=params,
+            ExpiresIn=expires_in,
+        )
+
+
+def create_storage_backend(local_root: Path) -> StorageBackend:
+    """Create the backend selected by settings.storage_backend."""
+    if settings.storage_backend == "local":
+        return LocalStorageBackend(local_root)
+    if settings.storage_backend == "s3":
+        if not settings.s3_bucket:
+            raise ValueError("S3_BUCKET is required when STORAGE_BACKEND=s3")
+        return S3StorageBackend(
+            bucket=settings.s3_bucket,
+            prefix=settings.s3_prefix,
+            endpoint_url=settings.s3_endpoint_url,
+            region=settings.s3_region,
+            access_key_id=settings.s3_access_key_id,
+            secret_access_key=settings.s3_secret_access_key,
+            multipart_chunk_size=settings.s3_multipart_chunk_mb * 1024 * 1024,
+        )
+    raise ValueError(f"Unknown storage backend: {settings.storage_backend}")
+
@@ -0,0 +1,158 @@
+"""
+In-process registry of public tenant (project) configuration by subdomain.
+
+Every public page load fetches its project's branding by subdomain. The
+serialized ProjectResponse is cached here for tenant_cache_ttl_seconds,
+together with a strong ETag, so steady-state requests run no queries at
+all and browsers can revalidate with If-None-Match. Unknown subdomains are
+cached too, so probing random hosts does not reach the database.
+
+ORM changes that alter a cached response drop it: project inserts, updates
+and deletes (including the old subdomain when it changes), documents added
+or removed (documents_count), and customer renames. Entries are dropped
+when the change is flushed and again once it commits, so a request that
+re-reads the old row in between cannot keep it cached. Other processes see
+changes once the TTL expires.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.models.customer import Customer
+from app.models.document import Document
+from app.models.project import Project
+from app.schemas.project import ProjectResponse
+from app.services.projects import get_project_response
+
+
+class Tenant(NamedTuple):
+    """A cached public project configuration, ready to send."""
+
+    project_id: int
+    customer_id: Optional[int]
+    voice: Optional[str]
+    body: bytes
+    etag: str
+
+
+# subdomain -> (expires_at, tenant or None for "no active project")
+_entries: "OrderedDict[str, tuple[float, Optional[Tenant]]]" = OrderedDict()
+
+
+def _build_tenant(project_dict: dict) -> Tenant:
+    body = ProjectResponse(**project_dict).model_dump_json().encode("utf-8")
+    return Tenant(
+        project_id=project_dict["id"],
+        customer_id=project_dict["customer_id"],
+        voice=project_dict["voice"],
+        body=body,
+        etag='"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+    )
+
+
+async def resolve_tenant(db: AsyncSession, subdomain: str) -> Optional[Tenant]:
+    """The active project for `subdomain`, from the registry when possible."""
+    subdomain = subdomain.lower()
+    entry = _entries.get(subdomain)
+    if entry is not None:
+        expires_at, tenant = entry
+        if expires_at >= time.monotonic():
+            return tenant
+        _entries.pop(subdomain, None)
+
+    project_dict = await get_project_response(
+        db,
+        Project.subdomain == subdomain,
+        Project.is_active == True,  # noqa: E712
+    )
+    tenant = _build_tenant(project_dict) if project_dict else None
+
+    if settings.tenant_cache_ttl_seconds > 0:
+        _entries[subdomain] = (
+            time.monotonic() + settings.tenant_cache_ttl_seconds,
+            tenant,
+        )
+        _entries.move_to_end(subdomain)
+        while len(_entries) > settings.tenant_cache_max_entries:
+            _entries.popitem(last=False)
+    return tenant
+
+
+def invalidate_tenant(subdomain: Optional[str]) -> None:
+    """Drop a subdomain from the registry."""
+    if subdomain:
+        _entries.pop(subdomain.lower(), None)
+
+
+def _invalidate_where(field: str, value: Optional[int]) -> None:
+    stale = [
+        subdomain
+        for subdomain, (_, tenant) in _entries.items()
+        if tenant is not None and getattr(tenant, field) == value
+    ]
+    for subdomain in stale:
+        _entries.pop(subdomain, None)
+
+
+def invalidate_project(project_id: Optional[int]) -> None:
+    """Drop the cached configuration of a project, whatever its subdomain."""
+    _invalidate_where("project_id", project_id)
+
+
+def invalidate_customer(customer_id: Optional[int]) -> None:
+    """Drop the cached configurations of a customer's projects."""
+    _invalidate_where("customer_id", customer_id)
+
+
+def clear_tenant_cache() -> None:
+    """Drop all cached tenants."""
+    _entries.clear()
+
+
+def _defer(target, invalidate, key) -> None:
+    """Invalidate now, and again when the owning session commits."""
+    invalidate(key)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("tenant_invalidations", set()).add((invalidate, key))
+
+
+@event.listens_for(Project, "after_insert")
+@event.listens_for(Project, "after_update")
+@event.listens_for(Project, "after_delete")
+def _invalidate_project_on_change(mapper, connection, target: Project) -> None:
+    _defer(target, invalidate_project, target.id)
+    _defer(target, invalidate_tenant, target.subdomain)
+    # A renamed subdomain must stop resolving to the project at once
+    for old_subdomain in inspect(target).attrs.subdomain.history.deleted:
+        _defer(target, invalidate_tenant, old_subdomain)
+
+
+@event.listens_for(Document, "after_insert")
+@event.listens_for(Document, "after_delete")
+def _invalidate_documents_count(mapper, connection, target: Document) -> None:
+    _defer(target, invalidate_project, target.project_id)
+
+
+@event.listens_for(Customer, "after_update")
+@event.listens_for(Customer, "after_delete")
+def _invalidate_customer_on_change(mapper, connection, target: Customer) -> None:
+    _defer(target, invalidate_customer, target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    for invalidate, key in session.info.pop("tenant_invalidations", ()):
+        invalidate(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session) -> None:
+    session.info.pop("tenant_invalidations", None)
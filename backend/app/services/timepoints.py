@@ -0,0 +1,198 @@
+"""
+Word timepoints for avatar lip-sync.
+
+Voices that support SSML marks return exact timepoints from the provider.
+For the others, words are aligned to the synthesized MP3 with a local
+duration model: the frame side information gives, per 576-sample granule,
+how many bits the encoder spent (near zero for silence), which locates
+speech and pauses without decoding the audio. Word durations within the
+speech are proportional to an estimated syllable count.
+"""
+
+import re
+from typing import Optional
+
+from app.services.workers import run_in_process
+
+# Layer III bitrates (kbps) by bitrate index
+_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+# Sample rates by MPEG version bits (3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5)
+_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+GRANULE_SAMPLES = 576
+
+# Granules below this fraction of the loud (90th percentile) granules are silence
+SILENCE_RATIO = 0.15
+
+
+class _BitReader:
+    def __init__(self, data: bytes):
+        self.value = int.from_bytes(data, "big")
+        self.length = len(data) * 8
+        self.position = 0
+
+    def read(self, bits: int) -> int:
+        self.position += bits
+        return (self.value >> (self.length - self.position)) & ((1 << bits) - 1)
+
+
+def _skip_id3(data: bytes) -> int:
+    if data[:3] != b"ID3" or len(data) < 10:
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    return 10 + size
+
+
+def parse_mp3_granules(data: bytes) -> list[tuple[float, int]]:
+    """
+    Scan MP3 frames and return (duration_seconds, coded_bits) per granule.
+
+    Only Layer III frame headers and side information are read. Xing/Info
+    header frames are skipped. Returns [] if the data is not MP3.
+    """
+    granules = []
+    position = _skip_id3(data)
+    first_frame = True
+
+    while position + 4 <= len(data):
+        header = int.from_bytes(data[position : position + 4], "big")
+        version = (header >> 19) & 0x3
+        layer = (header >> 17) & 0x3
+        bitrate_index = (header >> 12) & 0xF
+        rate_index = (header >> 10) & 0x3
+        if (
+            header >> 21 != 0x7FF
+            or version == 1
+            or layer != 1
+            or bitrate_index in (0, 15)
+            or rate_index == 3
+        ):
+            # Not a Layer III frame header: resynchronize
+            position += 1
+            continue
+
+        mpeg1 = version == 3
+        sample_rate = _SAMPLE_RATES[version][rate_index]
+        bitrate = _BITRATES[1 if mpeg1 else 2][bitrate_index] * 1000
+        padding = (header >> 9) & 0x1
+        frame_length = (144 if mpeg1 else 72) * bitrate // sample_rate + padding
+        if frame_length < 4:
+            break
+
+        frame = data[position : position + frame_length]
+        position += frame_length
+        if first_frame and (b"Xing" in frame[:64] or b"Info" in frame[:64]):
+            first_frame = False
+            continue
+        first_frame = False
+
+        channels = 1 if (header >> 6) & 0x3 == 3 else 2
+        side_start = 4 if (header >> 16) & 0x1 else 6  # CRC present
+        if len(frame) < side_start + (17 if channels == 1 else 32):
+            break
+        reader = _BitReader(frame[side_start : side_start + 32])
+
+        if mpeg1:
+            reader.read(9 + (5 if channels == 1 else 3) + 4 * channels)
+            granule_count, channel_bits = 2, 59
+        else:
+            reader.read(8 + (1 if channels == 1 else 2))
+            granule_count, channel_bits = 1, 63
+
+        duration = GRANULE_SAMPLES / sample_rate
+        for _ in range(granule_count):
+            coded_bits = 0
+            for _ in range(channels):
+                coded_bits += reader.read(12)  # part2_3_length
+                reader.read(channel_bits - 12)
+            granules.append((duration, coded_bits))
+
+    return granules
+
+
+def _word_weight(word: str) -> float:
+    """Relative spoken duration of a word (estimated syllables)."""
+    letters = re.sub(r"[^a-z]", "", word.lower())
+    if not letters:
+        # Numbers and symbols are read out: roughly one syllable per 2 chars
+        return max(1.0, len(word) / 2)
+    return float(max(1, len(re.findall(r"[aeiouy]+", letters))))
+
+
+def estimate_timepoints(words: list[str]) -> list[dict]:
+    """Fallback timepoints from word length alone (used for non-MP3 audio)."""
+    timepoints = []
+    estimated_time = 0.0
+    for i, word in enumerate(words):
+        timepoints.append({"markName": str(i), "timeSeconds": estimated_time})
+        estimated_time += max(0.15, len(word) * 0.06)
+    return timepoints
+
+
+def align_words(audio: bytes, words: list[str]) -> list[dict]:
+    """
+    Align word start times to synthesized MP3 audio.
+
+    Speech time (non-silent granules) is divided between the words in
+    proportion to their estimated syllables, so pauses between sentences
+    and at the start of the clip are skipped over rather than spread
+    across the words.
+    """
+    if not words:
+        return []
+    granules = parse_mp3_granules(audio)
+    if not granules:
+        return estimate_timepoints(words)
+
+    loud = sorted(bits for _, bits in granules)[int(0.9 * (len(granules) - 1))]
+    threshold = loud * SILENCE_RATIO
+    active = [bits > threshold for _, bits in granules] if loud else [True] * len(granules)
+
+    weights = [_word_weight(word) for word in words]
+    total_weight = sum(weights)
+    speech_time = sum(d for (d, _), is_active in zip(granules, active) if is_active)
+
+    # Speech-time offset at which each word starts
+    targets = []
+    cumulative = 0.0
+    for weight in weights:
+        targets.append(speech_time * cumulative / total_weight)
+        cumulative += weight
+
+    # Map speech-time offsets back to clip time by walking the granules
+    timepoints = []
+    clip_time = 0.0
+    spoken = 0.0
+    index = 0
+    for i, target in enumerate(targets):
+        while index < len(granules):
+            duration, _ = granules[index]
+            if active[index] and spoken + duration > target:
+                break
+            clip_time += duration
+            if active[index]:
+                spoken += duration
+            index += 1
+        offset = max(0.0, target - spoken)
+        timepoints.append({"markName": str(i), "timeSeconds": round(clip_time + offset, 3)})
+
+    return timepoints
+
+
+async def timepoints_for_audio(
+    audio: bytes, words: list[str], marks: Optional[list[dict]] = None
+) -> list[dict]:
+    """
+    Word timepoints for synthesized audio.
+
+    Uses the provider's SSML mark timepoints when available; otherwise
+    aligns the words to the MP3 in the worker process pool.
+    """
+    if marks is not None and len(marks) == len(words):
+        return marks
+    return await run_in_process(align_words, audio, words)
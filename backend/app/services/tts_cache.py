@@ -0,0 +1,230 @@
+"""
+Content-addressed cache for synthesized speech.
+
+Entries are keyed on (voice, speaking rate, normalized text) and hold the
+MP3 audio plus, once a caller has needed them, its word timepoints (None
+until then; stored in a sidecar file and added with put_timepoints). A
+small in-memory tier serves hot phrases; everything is also kept on disk
+in a size-bounded LRU (file mtimes record recency, so the order survives
+restarts).
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import unicodedata
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+# (mp3_bytes, timepoints or None if not computed)
+CachedSpeech = tuple[bytes, Optional[list[dict]]]
+
+# Bump when the stored audio or timepoint model changes
+CACHE_VERSION = 2
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different inputs share a cache entry."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def speech_cache_key(voice: str, speaking_rate: float, text: str) -> str:
+    """Cache key for a synthesis request."""
+    material = f"{CACHE_VERSION}\n{voice}\n{speaking_rate:.3f}\n{normalize_text(text)}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Two-tier (memory + disk) LRU cache of synthesized speech."""
+
+    def __init__(self, directory: Path, max_bytes: int, memory_max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_max_bytes = memory_max_bytes
+
+        self._memory: OrderedDict[str, CachedSpeech] = OrderedDict()
+        self._memory_bytes = 0
+        # Disk index: key -> entry size, least recently used first
+        self._disk: Optional[OrderedDict[str, int]] = None
+        self._disk_bytes = 0
+        self._lock = asyncio.Lock()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        return self.directory / f"{key}.mp3", self.directory / f"{key}.json"
+
+    def _load_index(self) -> OrderedDict[str, int]:
+        """Scan the cache directory (once) to rebuild the LRU order."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for audio_path in self.directory.glob("*.mp3"):
+            meta_path = audio_path.with_suffix(".json")
+            try:
+                stat = audio_path.stat()
+                size = stat.st_size + meta_path.stat().st_size
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, audio_path.stem, size))
+
+        index = OrderedDict()
+        for _, key, size in sorted(entries):
+            index[key] = size
+        self._disk_bytes = sum(index.values())
+        return index
+
+    async def _disk_index(self) -> OrderedDict[str, int]:
+        if self._disk is None:
+            self._disk = await asyncio.to_thread(self._load_index)
+        return self._disk
+
+    def _remember(self, key: str, entry: CachedSpeech) -> None:
+        """Add an entry to the memory tier, evicting least recently used."""
+        size = len(entry[0])
+        if size > self.memory_max_bytes:
+            return
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = entry
+        self._memory_bytes += size
+        while self._memory_bytes > self.memory_max_bytes:
+            _, (audio, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(audio)
+
+    def _read_entry(self, key: str) -> Optional[CachedSpeech]:
+        audio_path, meta_path = self._paths(key)
+        try:
+            audio = audio_path.read_bytes()
+            timepoints = json.loads(meta_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+        # Mark as recently used for the LRU order after a restart
+        os.utime(audio_path)
+        return audio, timepoints
+
+    def _write_file(self, path: Path, data: bytes) -> int:
+        temp_path = self.directory / f".{uuid.uuid4()}.part"
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+        return len(data)
+
+    def _write_entry(self, key: str, entry: CachedSpeech) -> int:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        audio_path, meta_path = self._paths(key)
+        # Write the metadata first: an .mp3 is only visible once complete
+        size = self._write_file(meta_path, json.dumps(entry[1]).encode("utf-8"))
+        return size + self._write_file(audio_path, entry[0])
+
+    def _write_timepoints(self, key: str, timepoints: list[dict]) -> int:
+        audio_path, meta_path = self._paths(key)
+        audio_size = audio_path.stat().st_size
+        size = self._write_file(meta_path, json.dumps(timepoints).encode("utf-8"))
+        if not audio_path.exists():
+            # Evicted meanwhile; don't leave the sidecar behind
+            meta_path.unlink(missing_ok=True)
+            raise FileNotFoundError(audio_path)
+        return size + audio_size
+
+    def _delete_entry(self, key: str) -> None:
+        for path in self._paths(key):
+            path.unlink(missing_ok=True)
+
+    async def get(self, key: str) -> Optional[CachedSpeech]:
+        """Look up an entry (memory first, then disk)."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry
+
+        index = await self._disk_index()
+        if key not in index:
+            return None
+
+        entry = await asyncio.to_thread(self._read_entry, key)
+        if entry is None:
+            async with self._lock:
+                self._disk_bytes -= index.pop(key, 0)
+            return None
+
+        index.move_to_end(key)
+        self._remember(key, entry)
+        return entry
+
+    async def put(self, key: str, entry: CachedSpeech) -> None:
+        """Store an entry in both tiers, evicting from disk past max_bytes."""
+        self._remember(key, entry)
+
+        index = await self._disk_index()
+        size = await asyncio.to_thread(self._write_entry, key, entry)
+
+        async with self._lock:
+            self._disk_bytes += size - index.pop(key, 0)
+            index[key] = size
+            evicted = []
+            while self._disk_bytes > self.max_bytes and len(index) > 1:
+                old_key, old_size = index.popitem(last=False)
+                self._disk_bytes -= old_size
+                evicted.append(old_key)
+
+        for old_key in evicted:
+            await asyncio.to_thread(self._delete_entry, old_key)
+
+    async def put_timepoints(self, key: str, timepoints: list[dict]) -> None:
+        """Add timepoints to a cached entry's audio."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory[key] = (entry[0], timepoints)
+
+        index = await self._disk_index()
+        if key not in index:
+            return
+        try:
+            size = await asyncio.to_thread(self._write_timepoints, key, timepoints)
+        except FileNotFoundError:
+            return
+        async with self._lock:
+            if key in index:
+                self._disk_bytes += size - index[key]
+                index[key] = size
+
+    async def get_or_create(
+        self,
+        key: str,
+        create: Callable[[], Awaitable[CachedSpeech]],
+        timed: bool = False,
+    ) -> CachedSpeech:
+        """
+        Return the cached entry, or create and store it.
+
+        With `timed`, an entry without timepoints counts as a miss.
+        Concurrent misses for the same key share a single `create` call.
+        """
+        entry = await self.get(key)
+        if entry is not None and (entry[1] is not None or not timed):
+            return entry
+
+        inflight_key = f"{key}:timed" if timed else key
+        pending = self._inflight.get(inflight_key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[inflight_key] = future
+        try:
+            entry = await create()
+            await self.put(key, entry)
+            future.set_result(entry)
+            return entry
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters get the error; don't warn if nobody was waiting
+            future.exception()
+            raise
+        finally:
+            del self._inflight[inflight_key]
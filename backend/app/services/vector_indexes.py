@@ -0,0 +1,72 @@
+"""
+ANN indexes on chunk embeddings for each vector_index_mode.
+
+Every embedding model gets a partial HNSW index per mode: "full" on the
+vector itself (created by migration 0007), "halfvec" on a 16-bit cast
+and "binary" on binary_quantize(). Only the configured mode's indexes
+are read, and each holds memory, so the quantized ones are not created
+by migrations: run scripts/build_vector_indexes.py for a mode before
+setting VECTOR_INDEX_MODE to it. Without its index, retrieval still
+works but scans every embedding of the model.
+
+The indexed expressions must match retrieval._index_distance exactly for
+the planner to use them.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+
+# mode -> indexed expression and operator class, by dimensions
+INDEX_EXPRESSIONS = {
+    "full": "(embedding::vector({d})) vector_cosine_ops",
+    # 16-bit floats: half the index size, near-identical recall
+    "halfvec": "(embedding::halfvec({d})) halfvec_cosine_ops",
+    # 1 bit per dimension: 32x smaller, needs re-scoring
+    "binary": "(binary_quantize(embedding::vector({d}))::bit({d})) bit_hamming_ops",
+}
+
+# Index names by mode; "full" keeps the names from migration 0007
+_INDEX_KINDS = {"full": "hnsw", "halfvec": "halfvec", "binary": "binary"}
+
+
+def index_name(mode: str, model: str) -> str:
+    """Name of a model's index for `mode`."""
+    return f"ix_chunk_embeddings_{_INDEX_KINDS[mode]}_" + model.replace("-", "_")
+
+
+def create_index_sql(mode: str, model: str, dimensions: int) -> str:
+    """CREATE INDEX statement for a model's index in `mode`."""
+    expression = INDEX_EXPRESSIONS[mode].format(d=dimensions)
+    return (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name(mode, model)}"
+        f" ON chunk_embeddings USING hnsw ({expression})"
+        f" WHERE model = '{model}'"
+    )
+
+
+async def build_vector_indexes(
+    connection: AsyncConnection, mode: str, drop_unused: bool = False
+) -> None:
+    """
+    Create the indexes for `mode` for every configured embedding model.
+
+    With `drop_unused`, the other modes' indexes are dropped afterwards to
+    reclaim their memory. `connection` must be in autocommit mode, since
+    CONCURRENTLY cannot run inside a transaction.
+    """
+    if mode not in INDEX_EXPRESSIONS:
+        raise ValueError(f"Unknown vector index mode: {mode}")
+
+    # CONCURRENTLY avoids locking the table against writes while building
+    for model, dimensions in settings.embedding_dimensions.items():
+        await connection.execute(text(create_index_sql(mode, model, dimensions)))
+
+    if drop_unused:
+        for other in INDEX_EXPRESSIONS:
+            if other == mode:
+                continue
+            for model in settings.embedding_dimensions:
+                drop = f"DROP INDEX CONCURRENTLY IF EXISTS {index_name(other, model)}"
+                await connection.execute(text(drop))
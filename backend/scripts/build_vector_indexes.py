@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Build the chunk embedding ANN indexes for a vector index mode.
+
+Run before setting VECTOR_INDEX_MODE to a quantized mode ("halfvec" or
+"binary"); the full-precision indexes come from the migrations. With
+--drop-unused, the other modes' indexes are dropped afterwards, e.g. the
+full-precision ones once a quantized mode is in use.
+
+Usage: python scripts/build_vector_indexes.py [mode] [--drop-unused]
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.core.database import engine
+from app.services.vector_indexes import build_vector_indexes
+
+
+async def main(mode: str, drop_unused: bool):
+    """Build (and optionally prune) the indexes outside a transaction."""
+    async with engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await build_vector_indexes(connection, mode, drop_unused)
+    await engine.dispose()
+    print(f"Vector indexes for mode {mode!r} are in place")
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    mode = args[0] if args else settings.vector_index_mode
+    asyncio.run(main(mode, "--drop-unused" in sys.argv))
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Measure retrieval recall of the quantized vector indexes.
+
+Uses stored chunk embeddings as queries and compares the top-k results of
+each index mode against an exact (sequential scan) full-precision search.
+
+Usage: python scripts/measure_recall.py [model] [samples] [k]
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.services.retrieval import search_by_embedding
+
+MODES = ["full", "halfvec", "binary"]
+
+
+async def measure_recall(model: str, samples: int, k: int):
+    """Print recall@k for each index mode."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            text("""
+                SELECT embedding::text AS embedding
+                FROM chunk_embeddings
+                WHERE model = :model
+                ORDER BY random()
+                LIMIT :samples
+            """),
+            {"model": model, "samples": samples},
+        )
+        queries = [
+            [float(x) for x in row.embedding.strip("[]").split(",")]
+            for row in result.fetchall()
+        ]
+        if not queries:
+            print(f"No embeddings stored for model {model}")
+            return
+
+        # Ground truth: exact search with index scans disabled
+        await db.execute(text("SET LOCAL enable_indexscan = off"))
+        truth = [
+            {r["id"] for r in await search_by_embedding(q, db, model, limit=k, mode="full")}
+            for q in queries
+        ]
+        await db.rollback()
+
+        print(f"model={model} queries={len(queries)} k={k} "
+              f"rescore_factor={settings.vector_rescore_factor}")
+        for mode in MODES:
+            hits = 0
+            for q, expected in zip(queries, truth):
+                found = await search_by_embedding(q, db, model, limit=k, mode=mode)
+                hits += len(expected & {r["id"] for r in found})
+            recall = hits / sum(len(t) for t in truth)
+            print(f"  {mode:8s} recall@{k} = {recall:.4f}")
+
+
+if __name__ == "__main__":
+    model = sys.argv[1] if len(sys.argv) > 1 else settings.embedding_model
+    samples = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    k = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    asyncio.run(measure_recall(model, samples, k))
@@ -3,6 +3,7 @@ Pytest fixtures for DocuTok backend tests.
 """
 
 import asyncio
+from contextlib import asynccontextmanager
 from typing import AsyncGenerator, Generator
 
 import pytest
@@ -12,9 +13,16 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sess
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.core.database import Base, get_db
+from app.core.database import Base, get_db, get_read_db
+from app.core.deps import get_tenant_session_factory
 from app.core.security import hash_password
+from app.core.user_cache import clear_user_cache
+from app.services.passwords import reset_login_rate_limits
+from app.services.tenants import clear_tenant_cache
 from app.models import User
+from app.services.speech import set_speech_provider, set_tts_cache
+from app.services.speech_providers import FakeSpeechProvider
+from app.services.tts_cache import TTSCache
 
 
 # Test database URL (in-memory SQLite for speed)
@@ -40,6 +48,10 @@ async def test_engine():
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    # User and project ids restart in every test database
+    clear_user_cache()
+    clear_tenant_cache()
+    reset_login_rate_limits()
 
     yield engine
 
@@ -69,7 +81,16 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     async def override_get_db():
         yield db_session
 
+    @asynccontextmanager
+    async def test_session():
+        yield db_session
+
+    async def override_session_factory():
+        return test_session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_tenant_session_factory] = override_session_factory
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
@@ -78,6 +99,17 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def speech_provider(tmp_path) -> Generator[FakeSpeechProvider, None, None]:
+    """Use the local fake speech provider and a temporary TTS cache."""
+    provider = FakeSpeechProvider()
+    set_speech_provider(provider)
+    set_tts_cache(TTSCache(tmp_path / "tts", 1024 * 1024, 64 * 1024))
+    yield provider
+    set_speech_provider(None)
+    set_tts_cache(None)
+
+
 @pytest.fixture
 def sync_client(db_session: AsyncSession) -> Generator[TestClient, None, None]:
     """Create a synchronous test client."""
@@ -85,7 +117,16 @@ def sync_client(db_session: AsyncSession) -> Generator[TestClient, None, None]:
     async def override_get_db():
         yield db_session
 
+    @asynccontextmanager
+    async def test_session():
+        yield db_session
+
+    async def override_session_factory():
+        return test_session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_tenant_session_factory] = override_session_factory
 
     with TestClient(app) as tc:
         yield tc
@@ -2,7 +2,17 @@
 Tests for admin endpoints.
 """
 
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
 from httpx import AsyncClient
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.services.pagination import apply_page, encode_cursor
 
 
 class TestAdminStats:
@@ -16,6 +26,94 @@ class TestAdminStats:
         assert "total_users" in data
         assert "total_documents" in data
 
+    async def test_stats_follow_inserts_and_deletes(
+        self, client: AsyncClient, admin_auth_headers, test_user
+    ):
+        """Test counters track rows created and deleted after the first read."""
+        response = await client.get("/api/admin/stats", headers=admin_auth_headers)
+        assert response.json()["total_users"] == 2
+        assert response.json()["total_customers"] == 0
+
+        customer = (
+            await client.post(
+                "/api/admin/customers",
+                headers=admin_auth_headers,
+                json={"name": "Counted"},
+            )
+        ).json()
+        await client.post(
+            "/api/admin/projects",
+            headers=admin_auth_headers,
+            json={
+                "customer_id": customer["id"],
+                "name": "Counted Project",
+                "slug": "counted",
+                "subdomain": "counted",
+                "title": "Counted",
+                "color_primary": "#1976d2",
+                "color_secondary": "#dc004e",
+                "color_background": "#ffffff",
+                "avatar": "/assets/avatars/test.glb",
+                "voice": "en-US-Neural2-F",
+            },
+        )
+
+        response = await client.get("/api/admin/stats", headers=admin_auth_headers)
+        assert response.json()["total_customers"] == 1
+        assert response.json()["total_projects"] == 1
+
+        response = await client.get(
+            f"/api/admin/customers/{customer['uuid']}", headers=admin_auth_headers
+        )
+        assert response.json()["projects_count"] == 1
+
+        # Deleting the customer cascades to its project
+        await client.delete(
+            f"/api/admin/customers/{customer['uuid']}", headers=admin_auth_headers
+        )
+        await client.delete(
+            f"/api/admin/users/{test_user.uuid}", headers=admin_auth_headers
+        )
+
+        response = await client.get("/api/admin/stats", headers=admin_auth_headers)
+        assert response.json() == {
+            "total_users": 1,
+            "total_customers": 0,
+            "total_projects": 0,
+            "total_documents": 0,
+        }
+
+    async def test_reconcile_after_raw_sql(
+        self, client: AsyncClient, admin_auth_headers, auth_headers, db_session
+    ):
+        """Test reconciling picks up rows inserted outside the ORM."""
+        response = await client.get("/api/admin/stats", headers=admin_auth_headers)
+        assert response.json()["total_customers"] == 0
+
+        await db_session.execute(
+            text(
+                "INSERT INTO customers (uuid, name, is_active) "
+                "VALUES (:uuid, 'Raw', true)"
+            ),
+            {"uuid": uuid.uuid4().hex},
+        )
+        await db_session.commit()
+        response = await client.get("/api/admin/stats", headers=admin_auth_headers)
+        assert response.json()["total_customers"] == 0
+
+        response = await client.post(
+            "/api/admin/stats/reconcile", headers=auth_headers
+        )
+        assert response.status_code == 403
+
+        response = await client.post(
+            "/api/admin/stats/reconcile", headers=admin_auth_headers
+        )
+        assert response.status_code == 200
+        assert response.json()["total_customers"] == 1
+        response = await client.get("/api/admin/stats", headers=admin_auth_headers)
+        assert response.json()["total_customers"] == 1
+
     async def test_stats_as_user_forbidden(self, client: AsyncClient, auth_headers):
         """Test regular user cannot access admin stats."""
         response = await client.get("/api/admin/stats", headers=auth_headers)
@@ -40,6 +138,74 @@ class TestAdminUserList:
         assert "users" in data
         assert len(data["users"]) >= 1
 
+    async def test_list_users_keyset_pages(
+        self, client: AsyncClient, admin_auth_headers, db_session: AsyncSession
+    ):
+        """Test cursors walk every user exactly once, newest first."""
+        # Two users share a timestamp so the id tie-breaker is exercised
+        timestamps = [
+            datetime(2020, 1, day, 12, 0, 0, 500, tzinfo=timezone.utc)
+            for day in (1, 2, 2, 3, 4)
+        ]
+        for i, created_at in enumerate(timestamps):
+            db_session.add(
+                User(
+                    email=f"page{i}@example.com",
+                    password_hash="x",
+                    created_at=created_at,
+                )
+            )
+        await db_session.commit()
+
+        emails = []
+        cursor = None
+        while True:
+            params = {"per_page": 2, "count": "none"}
+            if cursor:
+                params["cursor"] = cursor
+            response = await client.get(
+                "/api/admin/users", headers=admin_auth_headers, params=params
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert data["total"] is None
+            emails += [user["email"] for user in data["users"]]
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        assert emails == [
+            "admin@example.com",
+            "page4@example.com",
+            "page3@example.com",
+            "page2@example.com",
+            "page1@example.com",
+            "page0@example.com",
+        ]
+
+        response = await client.get(
+            "/api/admin/users", headers=admin_auth_headers, params={"count": "estimate"}
+        )
+        assert response.json()["total"] == 6
+
+    async def test_list_users_invalid_cursor(
+        self, client: AsyncClient, admin_auth_headers
+    ):
+        """Test a malformed cursor is rejected."""
+        response = await client.get(
+            "/api/admin/users",
+            headers=admin_auth_headers,
+            params={"cursor": "not-a-cursor"},
+        )
+        assert response.status_code == 400
+
+    def test_cursor_rejected_with_ranked_search(self):
+        """Test a cursor is not silently ignored when results are ranked."""
+        cursor = encode_cursor(datetime.now(timezone.utc), 1)
+        with pytest.raises(HTTPException) as exc_info:
+            apply_page(select(User), User, 1, 20, cursor, rank=User.id)
+        assert exc_info.value.status_code == 400
+
 
 class TestAdminUserUpdate:
     """Tests for PATCH /api/admin/users/{id}"""
@@ -91,3 +257,46 @@ class TestAdminUserDelete:
             headers=auth_headers,
         )
         assert response.status_code == 403
+
+
+class TestAdminSearch:
+    """Tests for admin search and GET /api/admin/search/autocomplete"""
+
+    async def test_search_escapes_wildcards(
+        self, client: AsyncClient, admin_auth_headers, test_user
+    ):
+        """Test LIKE wildcards in the search term are matched literally."""
+        response = await client.get(
+            "/api/admin/users", headers=admin_auth_headers, params={"search": "%"}
+        )
+        assert response.json()["users"] == []
+
+        response = await client.get(
+            "/api/admin/users", headers=admin_auth_headers, params={"search": "TEST@"}
+        )
+        assert [u["email"] for u in response.json()["users"]] == ["test@example.com"]
+
+    async def test_autocomplete(self, client: AsyncClient, admin_auth_headers):
+        """Test prefix suggestions, shortest first."""
+        for name in ["Acme Industries", "Acme", "Bolt Acme"]:
+            await client.post(
+                "/api/admin/customers", headers=admin_auth_headers, json={"name": name}
+            )
+
+        response = await client.get(
+            "/api/admin/search/autocomplete",
+            headers=admin_auth_headers,
+            params={"q": "acm", "source": "customers"},
+        )
+        assert response.status_code == 200
+        labels = [s["label"] for s in response.json()["suggestions"]]
+        assert labels == ["Acme", "Acme Industries"]
+
+    async def test_autocomplete_requires_admin(self, client: AsyncClient, auth_headers):
+        """Test regular users cannot use autocomplete."""
+        response = await client.get(
+            "/api/admin/search/autocomplete",
+            headers=auth_headers,
+            params={"q": "a", "source": "users"},
+        )
+        assert response.status_code == 403
@@ -2,7 +2,20 @@
 Tests for authentication endpoints.
 """
 
+import asyncio
+import string
+import time
+
+from fastapi import HTTPException
 from httpx import AsyncClient
+from jose import jwt
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import create_access_token, decode_token, hash_password
+from app.models.user import User
+from app.services import passwords
 
 
 class TestAuthRegister:
@@ -128,3 +141,155 @@ class TestAuthRefresh:
             json={"refresh_token": "invalid-token"},
         )
         assert response.status_code == 401
+
+
+class TestAuthUserCache:
+    """Tests for cached token validation and user lookup"""
+
+    async def test_user_lookup_is_cached(
+        self, client: AsyncClient, auth_headers, test_engine
+    ):
+        """Test repeated requests do not query the user again."""
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            for _ in range(3):
+                response = await client.get("/api/auth/me", headers=auth_headers)
+                assert response.status_code == 200
+        finally:
+            event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+
+        assert len([s for s in statements if "FROM users" in s]) <= 1
+
+    async def test_deactivation_invalidates_cache(
+        self, client: AsyncClient, auth_headers, test_user: User, db_session: AsyncSession
+    ):
+        """Test a deactivated user is rejected on the next request."""
+        response = await client.get("/api/auth/me", headers=auth_headers)
+        assert response.status_code == 200
+
+        test_user.is_active = False
+        await db_session.commit()
+
+        response = await client.get("/api/auth/me", headers=auth_headers)
+        assert response.status_code == 401
+
+    async def test_role_change_invalidates_cache(
+        self, client: AsyncClient, auth_headers, admin_auth_headers, test_user: User
+    ):
+        """Test a promoted user gains admin access immediately."""
+        response = await client.get("/api/admin/stats", headers=auth_headers)
+        assert response.status_code == 403
+
+        response = await client.patch(
+            f"/api/admin/users/{test_user.uuid}",
+            headers=admin_auth_headers,
+            json={"role": "admin"},
+        )
+        assert response.status_code == 200
+
+        response = await client.get("/api/admin/stats", headers=auth_headers)
+        assert response.status_code == 200
+
+    def test_decode_token(self):
+        """Test tokens are verified for signature, algorithm and expiry."""
+        token = create_access_token(42)
+        assert decode_token(token)["sub"] == "42"
+
+        header, payload, signature = token.split(".")
+        assert decode_token(f"{header}.{payload}.{signature[::-1]}") is None
+        assert decode_token("not-a-token") is None
+
+        # Other encodings of the same signature bytes are not accepted
+        alphabet = string.ascii_uppercase + string.ascii_lowercase + string.digits
+        alphabet += "-_"
+        last = alphabet.index(signature[-1])
+        sibling = alphabet[last ^ 1]
+        for forged in (signature + "=", signature[:-1] + sibling, "!" + signature):
+            assert decode_token(f"{header}.{payload}.{forged}") is None
+
+        expired = jwt.encode(
+            {"sub": "42", "type": "access", "exp": int(time.time()) - 1},
+            settings.secret_key,
+            algorithm="HS256",
+        )
+        assert decode_token(expired) is None
+
+        other_alg = jwt.encode(
+            {"sub": "42", "exp": int(time.time()) + 60},
+            settings.secret_key,
+            algorithm="HS384",
+        )
+        assert decode_token(other_alg) is None
+
+
+class TestAuthPasswordHashing:
+    """Tests for bcrypt offloading, login admission control and rehashing"""
+
+    async def test_login_rate_limited_per_email(
+        self, client: AsyncClient, test_user, monkeypatch
+    ):
+        """Test repeated attempts for one email are rejected with 429."""
+        monkeypatch.setattr(settings, "login_rate_per_email", 2)
+        passwords.reset_login_rate_limits()
+
+        for _ in range(2):
+            response = await client.post(
+                "/api/auth/login",
+                json={"email": "test@example.com", "password": "wrong"},
+            )
+            assert response.status_code == 401
+
+        response = await client.post(
+            "/api/auth/login",
+            json={"email": "TEST@example.com", "password": "testpassword"},
+        )
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) >= 1
+
+        response = await client.post(
+            "/api/auth/login",
+            json={"email": "other@example.com", "password": "wrong"},
+        )
+        assert response.status_code == 401
+
+    async def test_rehash_on_login(
+        self, client: AsyncClient, test_user: User, monkeypatch
+    ):
+        """Test a hash with an outdated cost factor is upgraded on login."""
+        assert test_user.password_hash.startswith("$2b$12$")
+        monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+        monkeypatch.setattr(settings, "password_rehash_on_login", True)
+
+        response = await client.post(
+            "/api/auth/login",
+            json={"email": "test@example.com", "password": "testpassword"},
+        )
+        assert response.status_code == 200
+        assert test_user.password_hash.startswith("$2b$04$")
+        assert await passwords.verify_password("testpassword", test_user.password_hash)
+
+    async def test_pool_rejects_when_full(self, monkeypatch):
+        """Test calls beyond the pool's workers and queue fail fast with 503."""
+        monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+        monkeypatch.setattr(settings, "password_hash_max_queue", 0)
+        hashed = hash_password("secret")
+
+        results = await asyncio.gather(
+            *[
+                passwords.verify_password("secret", hashed)
+                for _ in range(settings.password_hash_workers + 2)
+            ],
+            return_exceptions=True,
+        )
+
+        rejected = [r for r in results if isinstance(r, HTTPException)]
+        assert [r.status_code for r in rejected] == [503, 503]
+        assert results[: settings.password_hash_workers] == [True] * (
+            settings.password_hash_workers
+        )
+        assert passwords.password_pool_stats()["in_flight"] == 0
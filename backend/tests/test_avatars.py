@@ -0,0 +1,130 @@
+"""
+Tests for avatar endpoints.
+"""
+
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+
+
+async def _create_project(client: AsyncClient, headers: dict, subdomain: str) -> dict:
+    customer_response = await client.post(
+        "/api/admin/customers",
+        headers=headers,
+        json={"name": f"Customer {subdomain}"},
+    )
+    customer = customer_response.json()
+
+    project_response = await client.post(
+        "/api/admin/projects",
+        headers=headers,
+        json={
+            "customer_id": customer["id"],
+            "name": "Test Project",
+            "slug": subdomain,
+            "subdomain": subdomain,
+            "title": "Test Title",
+            "color_primary": "#1976d2",
+            "color_secondary": "#dc004e",
+            "color_background": "#ffffff",
+            "avatar": "/assets/avatars/test.glb",
+            "voice": "en-US-Neural2-F",
+        },
+    )
+    return project_response.json()
+
+
+async def _upload_avatar(
+    client: AsyncClient, headers: dict, project_uuid: str, content: bytes
+) -> dict:
+    response = await client.post(
+        f"/api/admin/avatars/projects/{project_uuid}/upload",
+        headers=headers,
+        files={"file": ("avatar.gab", content, "application/octet-stream")},
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+class TestAvatarDownload:
+    """Tests for GET /api/admin/avatars/{uuid}/download and customer variant"""
+
+    async def test_admin_download_range_and_etag(
+        self, client: AsyncClient, admin_auth_headers
+    ):
+        """Test streaming download with Range, immutable caching and 304."""
+        project = await _create_project(client, admin_auth_headers, "avatar-dl")
+        content = b"GAB" + bytes(range(256))
+        avatar = await _upload_avatar(
+            client, admin_auth_headers, project["uuid"], content
+        )
+        url = f"/api/admin/avatars/{avatar['uuid']}/download"
+
+        response = await client.get(url, headers=admin_auth_headers)
+        assert response.status_code == 200
+        assert response.content == content
+        assert response.headers["etag"] == f'"{avatar["uuid"]}"'
+        assert "immutable" in response.headers["cache-control"]
+        assert "attachment" in response.headers["content-disposition"]
+
+        response = await client.get(
+            url, headers={**admin_auth_headers, "Range": "bytes=0-2"}
+        )
+        assert response.status_code == 206
+        assert response.content == b"GAB"
+
+        response = await client.get(
+            url, headers={**admin_auth_headers, "If-None-Match": f'"{avatar["uuid"]}"'}
+        )
+        assert response.status_code == 304
+
+    async def test_signed_public_url(self, client: AsyncClient, admin_auth_headers):
+        """Test the signed avatar URL works without authentication."""
+        project = await _create_project(client, admin_auth_headers, "avatar-url")
+        avatar = await _upload_avatar(
+            client, admin_auth_headers, project["uuid"], b"public"
+        )
+
+        response = await client.get(avatar["url"])
+        assert response.status_code == 200
+        assert response.content == b"public"
+        assert "immutable" in response.headers["cache-control"]
+
+        unsigned = avatar["url"].split("?")[0]
+        response = await client.get(unsigned)
+        assert response.status_code == 422
+
+    async def test_customer_download_requires_ownership(
+        self,
+        client: AsyncClient,
+        admin_auth_headers,
+        auth_headers,
+        test_user: User,
+        db_session: AsyncSession,
+    ):
+        """Test customers can only download avatars of their own projects."""
+        own = await _create_project(client, admin_auth_headers, "avatar-own")
+        other = await _create_project(client, admin_auth_headers, "avatar-other")
+        own_avatar = await _upload_avatar(
+            client, admin_auth_headers, own["uuid"], b"own"
+        )
+        other_avatar = await _upload_avatar(
+            client, admin_auth_headers, other["uuid"], b"other"
+        )
+
+        test_user.customer_id = own["customer_id"]
+        await db_session.commit()
+
+        response = await client.get(
+            f"/api/customer/avatars/{own_avatar['uuid']}/download",
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        assert response.content == b"own"
+
+        response = await client.get(
+            f"/api/customer/avatars/{other_avatar['uuid']}/download",
+            headers=auth_headers,
+        )
+        assert response.status_code == 403
@@ -2,7 +2,17 @@
 Tests for document endpoints.
 """
 
+import hashlib
+from unittest.mock import ANY, AsyncMock, patch
+
 from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.routes.documents import content_lock_key
+from app.models.chunk import Chunk
+from app.models.document import Document
+from app.services.storage import document_key, get_storage
 
 
 class TestDocumentList:
@@ -111,6 +121,167 @@ class TestDocumentUpload:
         detail = response.json().get("detail", "").lower()
         assert "not supported" in detail or "invalid" in detail or "allowed" in detail
 
+    async def test_upload_duplicate_content_shares_file(
+        self, client: AsyncClient, admin_auth_headers
+    ):
+        """Test identical uploads are stored once and survive one delete."""
+        customer_response = await client.post(
+            "/api/admin/customers",
+            headers=admin_auth_headers,
+            json={"name": "Test Customer"},
+        )
+        customer_id = customer_response.json()["id"]
+
+        project_response = await client.post(
+            "/api/admin/projects",
+            headers=admin_auth_headers,
+            json={
+                "customer_id": customer_id,
+                "name": "Test Project",
+                "slug": "test-project",
+                "subdomain": "test-dedup",
+                "title": "Test Title",
+                "color_primary": "#1976d2",
+                "color_secondary": "#dc004e",
+                "color_background": "#ffffff",
+                "avatar": "/assets/avatars/test.glb",
+                "voice": "en-US-Neural2-F",
+            },
+        )
+        project_id = project_response.json()["id"]
+
+        content = b"Duplicate content uploaded twice."
+        first = await client.post(
+            f"/api/documents/upload?project_id={project_id}",
+            files={"file": ("first.txt", content, "text/plain")},
+        )
+        lock = AsyncMock()
+        with patch("app.api.routes.documents.advisory_xact_lock", lock):
+            second = await client.post(
+                f"/api/documents/upload?project_id={project_id}",
+                files={"file": ("second.txt", content, "text/plain")},
+            )
+        # Reuse of the stored file is serialized with deletes of it
+        lock_key = content_lock_key(hashlib.sha256(content).hexdigest())
+        lock.assert_awaited_once_with(ANY, lock_key)
+        first_doc = (await client.get(f"/api/documents/{first.json()['id']}")).json()
+        second_doc = (await client.get(f"/api/documents/{second.json()['id']}")).json()
+        assert first_doc["content_hash"] == second_doc["content_hash"]
+        assert first_doc["content_hash"] == hashlib.sha256(content).hexdigest()
+
+        # Deleting one document keeps the file the other still references
+        await client.delete(f"/api/documents/{first_doc['id']}")
+        response = await client.get(
+            f"/api/documents/by-uuid/{second_doc['uuid']}/content"
+        )
+        assert response.status_code == 200
+        assert response.content == content
+
+        # Deleting the last reference removes the file
+        lock.reset_mock()
+        with patch("app.api.routes.documents.advisory_xact_lock", lock):
+            await client.delete(f"/api/documents/{second_doc['id']}")
+        lock.assert_awaited_once_with(ANY, lock_key)
+        key = document_key(f"{second_doc['content_hash']}.txt")
+        assert not await get_storage().exists(key)
+
+    async def test_upload_too_large(
+        self, client: AsyncClient, admin_auth_headers, monkeypatch
+    ):
+        """Test uploads over the size limit are rejected."""
+        customer_response = await client.post(
+            "/api/admin/customers",
+            headers=admin_auth_headers,
+            json={"name": "Test Customer"},
+        )
+        customer_id = customer_response.json()["id"]
+
+        project_response = await client.post(
+            "/api/admin/projects",
+            headers=admin_auth_headers,
+            json={
+                "customer_id": customer_id,
+                "name": "Test Project",
+                "slug": "test-project",
+                "subdomain": "test-too-large",
+                "title": "Test Title",
+                "color_primary": "#1976d2",
+                "color_secondary": "#dc004e",
+                "color_background": "#ffffff",
+                "avatar": "/assets/avatars/test.glb",
+                "voice": "en-US-Neural2-F",
+            },
+        )
+        project_id = project_response.json()["id"]
+
+        monkeypatch.setattr("app.api.routes.documents.MAX_FILE_SIZE", 16)
+        files = {"file": ("big.txt", b"x" * 64, "text/plain")}
+        response = await client.post(
+            f"/api/documents/upload?project_id={project_id}", files=files
+        )
+        assert response.status_code == 400
+        assert "exceeds" in response.json()["detail"]
+
+        list_response = await client.get(f"/api/documents/?project_id={project_id}")
+        assert list_response.json()["documents"] == []
+
+
+class TestDocumentContent:
+    """Tests for GET /api/documents/by-uuid/{uuid}/content"""
+
+    async def test_content_range_and_etag(
+        self, client: AsyncClient, admin_auth_headers
+    ):
+        """Test Range requests, content-hash ETags and 304 revalidation."""
+        customer_response = await client.post(
+            "/api/admin/customers",
+            headers=admin_auth_headers,
+            json={"name": "Test Customer"},
+        )
+        customer_id = customer_response.json()["id"]
+
+        project_response = await client.post(
+            "/api/admin/projects",
+            headers=admin_auth_headers,
+            json={
+                "customer_id": customer_id,
+                "name": "Test Project",
+                "slug": "test-project",
+                "subdomain": "test-content",
+                "title": "Test Title",
+                "color_primary": "#1976d2",
+                "color_secondary": "#dc004e",
+                "color_background": "#ffffff",
+                "avatar": "/assets/avatars/test.glb",
+                "voice": "en-US-Neural2-F",
+            },
+        )
+        project_id = project_response.json()["id"]
+
+        content = b"0123456789abcdefghij"
+        upload = await client.post(
+            f"/api/documents/upload?project_id={project_id}",
+            files={"file": ("range.txt", content, "text/plain")},
+        )
+        document = (await client.get(f"/api/documents/{upload.json()['id']}")).json()
+        url = f"/api/documents/by-uuid/{document['uuid']}/content"
+        etag = f'"{hashlib.sha256(content).hexdigest()}"'
+
+        response = await client.get(url)
+        assert response.status_code == 200
+        assert response.headers["etag"] == etag
+        assert response.headers["accept-ranges"] == "bytes"
+        assert "max-age" in response.headers["cache-control"]
+
+        response = await client.get(url, headers={"Range": "bytes=5-9"})
+        assert response.status_code == 206
+        assert response.content == b"56789"
+        assert response.headers["content-range"] == f"bytes 5-9/{len(content)}"
+
+        response = await client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
 
 class TestDocumentDelete:
     """Tests for DELETE /api/documents/{id}"""
@@ -119,3 +290,36 @@ class TestDocumentDelete:
         """Test deleting non-existent document returns 404."""
         response = await client.delete("/api/documents/99999")
         assert response.status_code == 404
+
+    async def test_delete_leaves_chunks_to_the_database(
+        self, client: AsyncClient, db_session: AsyncSession, test_engine
+    ):
+        """Test chunks and embeddings are not loaded to be deleted one by one."""
+        document = Document(
+            filename="chunked.txt",
+            original_filename="chunked.txt",
+            content_type="text/plain",
+            file_size=1,
+            status="completed",
+        )
+        document.chunks = [
+            Chunk(content=f"chunk {index}", chunk_index=index) for index in range(5)
+        ]
+        db_session.add(document)
+        await db_session.commit()
+        db_session.expunge_all()
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            response = await client.delete(f"/api/documents/{document.id}")
+        finally:
+            event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+
+        assert response.status_code == 200
+        # ON DELETE CASCADE removes them, without a query per chunk
+        assert not [s for s in statements if "FROM chunk" in s]
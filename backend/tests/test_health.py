@@ -2,7 +2,18 @@
 Tests for health endpoint.
 """
 
+import time
+
 from httpx import AsyncClient
+from sqlalchemy import exc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core import database
+from app.core.config import settings
+from app.core.database import engine_options, get_db, pool_stats
+from app.main import app
+from app.models.document import Document
 
 
 class TestHealth:
@@ -14,3 +25,131 @@ class TestHealth:
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "healthy"
+
+    async def test_password_hashing_stats(self, client: AsyncClient):
+        """Test the bcrypt pool reports its queue depth."""
+        response = await client.get("/health/password-hashing")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["queued"] == 0
+        assert {"workers", "in_flight", "completed", "rejected"} <= data.keys()
+
+    async def test_db_pool_stats(self, client: AsyncClient):
+        """Test the connection pool reports its utilization."""
+        response = await client.get("/health/db-pool")
+        assert response.status_code == 200
+        data = response.json()
+        assert {"pool", "checkouts", "peak_checked_out", "timeouts"} <= data.keys()
+
+    async def test_pool_timeout_is_503(self, client: AsyncClient):
+        """Test an exhausted connection pool asks clients to retry."""
+
+        async def exhausted_db():
+            raise exc.TimeoutError("QueuePool limit of size 10 overflow 20 reached")
+            yield
+
+        previous = app.dependency_overrides[get_db]
+        app.dependency_overrides[get_db] = exhausted_db
+        try:
+            response = await client.get("/health/db")
+        finally:
+            app.dependency_overrides[get_db] = previous
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert pool_stats()["timeouts"] >= 1
+
+
+class TestEngineOptions:
+    """Tests for database engine configuration"""
+
+    def test_pool_settings(self, monkeypatch):
+        """Test pool and statement settings reach asyncpg engines."""
+        monkeypatch.setattr(settings, "db_pool_size", 4)
+        monkeypatch.setattr(settings, "db_statement_timeout_ms", 5000)
+        url, options = engine_options(make_url("postgresql+asyncpg://u:p@db/app"))
+        assert options["pool_size"] == 4
+        assert url.query["prepared_statement_cache_size"] == "500"
+        assert options["connect_args"]["server_settings"] == {
+            "statement_timeout": "5000"
+        }
+
+    def test_pgbouncer_mode(self, monkeypatch):
+        """Test PgBouncer mode disables prepared statement caching."""
+        monkeypatch.setattr(settings, "db_pgbouncer_mode", True)
+        url, options = engine_options(make_url("postgresql+asyncpg://u:p@db/app"))
+        connect_args = options["connect_args"]
+        assert url.query["prepared_statement_cache_size"] == "0"
+        assert connect_args["statement_cache_size"] == 0
+        assert "server_settings" not in connect_args
+        name_func = connect_args["prepared_statement_name_func"]
+        assert name_func() != name_func()
+
+    def test_sqlite_has_no_pool_settings(self):
+        """Test SQLite engines keep SQLAlchemy's default pool."""
+        url, options = engine_options(make_url("sqlite+aiosqlite:///:memory:"))
+        assert "pool_size" not in options
+        assert "connect_args" not in options
+
+
+class TestReadReplica:
+    """Tests for read replica routing"""
+
+    async def test_no_replica_reads_primary(self):
+        """Test reads use the primary when no replica is configured."""
+        assert await database.read_session_factory() is database.AsyncSessionLocal
+
+    async def test_read_your_writes(self, monkeypatch, db_session: AsyncSession):
+        """Test committed writes route their reads to the primary for a while."""
+        monkeypatch.setattr(database, "_recent_writes", {})
+        assert not database.recently_written("documents", ("project", 7))
+
+        db_session.add(
+            Document(
+                filename="fresh.txt",
+                original_filename="fresh.txt",
+                content_type="text/plain",
+                file_size=1,
+                project_id=7,
+            )
+        )
+        await db_session.flush()
+        # Not before the commit: other sessions cannot see the row yet
+        assert not database.recently_written("documents")
+        await db_session.commit()
+
+        assert database.recently_written(("project", 7))
+        assert not database.recently_written(("project", 8))
+        primary, replica = object(), object()
+        assert database.read_your_writes(replica, primary, "documents") is primary
+        assert database.read_your_writes(replica, primary, "users") is replica
+
+        monkeypatch.setattr(settings, "replica_max_lag_seconds", 0)
+        time.sleep(0.01)
+        assert not database.recently_written("documents")
+
+    async def test_replica_lag(self, monkeypatch):
+        """Test a lagging or unreachable replica falls back to the primary."""
+        replica = create_async_engine("sqlite+aiosqlite:///:memory:")
+        monkeypatch.setattr(database, "read_engine", replica)
+        monkeypatch.setattr(database, "_recent_writes", {})
+        monkeypatch.setattr(database, "_replica_checked_at", float("-inf"))
+        monkeypatch.setattr(settings, "replica_lag_check_seconds", 0)
+
+        monkeypatch.setattr(database, "REPLICA_LAG_SQL", text("SELECT 1"))
+        assert await database.read_session_factory() is database.ReadSessionLocal
+        assert database.pool_stats()["replica"]["lag_seconds"] == 1
+        database.mark_written("projects")
+        assert (
+            await database.read_session_factory("projects")
+            is database.AsyncSessionLocal
+        )
+
+        monkeypatch.setattr(database, "REPLICA_LAG_SQL", text("SELECT 60"))
+        assert await database.read_session_factory() is database.AsyncSessionLocal
+
+        # pg_last_wal_receive_lsn() does not exist here: the check fails
+        monkeypatch.setattr(
+            database, "REPLICA_LAG_SQL", text("SELECT pg_last_wal_receive_lsn()")
+        )
+        assert await database.read_session_factory() is database.AsyncSessionLocal
+        await replica.dispose()
@@ -2,7 +2,33 @@
 Tests for project management endpoints.
 """
 
+import hashlib
+import io
+from unittest.mock import AsyncMock, patch
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
 from httpx import AsyncClient
+from PIL import Image, PngImagePlugin
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.security import sign_asset_path, verify_asset_signature
+from app.middleware.subdomain import SubdomainMiddleware, subdomain_from_host
+from app.models.chunk import Chunk
+from app.models.document import Document
+from app.models.project import Project
+from app.models.user import User
+from app.services.images import delete_logo_version, find_logo_original
+from app.services.processor import switch_project_embedding_model
+from app.services.storage import (
+    get_storage,
+    logo_key,
+    logo_original_key,
+    logo_version,
+    put_bytes,
+)
 
 
 # Test data
@@ -73,6 +99,74 @@ class TestProjectList:
         data = response.json()
         assert "projects" in data
 
+    async def test_list_projects_constant_queries(
+        self,
+        client: AsyncClient,
+        admin_auth_headers,
+        db_session: AsyncSession,
+        test_engine,
+    ):
+        """Test counts and customer names come without per-project queries."""
+        customer = (
+            await client.post(
+                "/api/admin/customers",
+                headers=admin_auth_headers,
+                json={"name": "Listing Customer"},
+            )
+        ).json()
+        projects = []
+        for i in range(3):
+            response = await client.post(
+                "/api/admin/projects",
+                headers=admin_auth_headers,
+                json={
+                    **VALID_PROJECT_DATA,
+                    "customer_id": customer["id"],
+                    "slug": f"listing-{i}",
+                    "subdomain": f"listing-{i}",
+                },
+            )
+            projects.append(response.json())
+
+        for i in range(2):
+            db_session.add(
+                Document(
+                    filename=f"doc{i}.txt",
+                    original_filename=f"doc{i}.txt",
+                    content_type="text/plain",
+                    file_size=1,
+                    project_id=projects[0]["id"],
+                )
+            )
+        await db_session.commit()
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            response = await client.get(
+                "/api/admin/projects", headers=admin_auth_headers
+            )
+        finally:
+            event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+
+        assert response.status_code == 200
+        # Page count + page rows (the admin user comes from the user cache)
+        assert len(statements) == 2
+        by_uuid = {p["uuid"]: p for p in response.json()["projects"]}
+        assert by_uuid[projects[0]["uuid"]]["documents_count"] == 2
+        assert by_uuid[projects[1]["uuid"]]["documents_count"] == 0
+        assert by_uuid[projects[1]["uuid"]]["customer_name"] == "Listing Customer"
+        assert by_uuid[projects[1]["uuid"]]["customer_uuid"] == customer["uuid"]
+
+        response = await client.get("/api/public/projects/by-subdomain/listing-0")
+        assert response.status_code == 200
+        assert response.json()["uuid"] == projects[0]["uuid"]
+        assert response.json()["documents_count"] == 2
+
     async def test_list_projects_as_user_forbidden(
         self, client: AsyncClient, auth_headers
     ):
@@ -198,6 +292,53 @@ class TestProjectCreate:
         )
         assert response.status_code == 422
 
+    async def test_create_project_embedding_model(
+        self, client: AsyncClient, admin_auth_headers
+    ):
+        """Test creating project with a configured embedding model."""
+        customer_response = await client.post(
+            "/api/admin/customers",
+            headers=admin_auth_headers,
+            json={"name": "Test Customer"},
+        )
+        customer_id = customer_response.json()["id"]
+
+        project_data = {
+            **VALID_PROJECT_DATA,
+            "customer_id": customer_id,
+            "embedding_model": "all-minilm",
+        }
+        response = await client.post(
+            "/api/admin/projects",
+            headers=admin_auth_headers,
+            json=project_data,
+        )
+        assert response.status_code == 201
+        assert response.json()["embedding_model"] == "all-minilm"
+
+    async def test_create_project_unknown_embedding_model(
+        self, client: AsyncClient, admin_auth_headers
+    ):
+        """Test creating project with an unknown embedding model fails."""
+        customer_response = await client.post(
+            "/api/admin/customers",
+            headers=admin_auth_headers,
+            json={"name": "Test Customer"},
+        )
+        customer_id = customer_response.json()["id"]
+
+        invalid_data = {
+            **VALID_PROJECT_DATA,
+            "customer_id": customer_id,
+            "embedding_model": "not-a-model",
+        }
+        response = await client.post(
+            "/api/admin/projects",
+            headers=admin_auth_headers,
+            json=invalid_data,
+        )
+        assert response.status_code == 422
+
 
 class TestProjectGet:
     """Tests for GET /api/admin/projects/{id}"""
@@ -288,6 +429,74 @@ class TestProjectUpdate:
         assert data["color_primary"] == "#ff5722"
         assert data["name"] == "Test Project"  # Unchanged
 
+    async def test_update_embedding_model_waits_for_backfill(
+        self, client: AsyncClient, admin_auth_headers, db_session: AsyncSession
+    ):
+        """Test a new embedding model is used only once chunks have it."""
+        customer_response = await client.post(
+            "/api/admin/customers",
+            headers=admin_auth_headers,
+            json={"name": "Test Customer"},
+        )
+        project_data = {
+            **VALID_PROJECT_DATA,
+            "customer_id": customer_response.json()["id"],
+        }
+        create_response = await client.post(
+            "/api/admin/projects", headers=admin_auth_headers, json=project_data
+        )
+        project_uuid = create_response.json()["uuid"]
+        project_id = create_response.json()["id"]
+
+        with patch("app.api.routes.projects.embed_project_background") as backfill:
+            response = await client.patch(
+                f"/api/admin/projects/{project_uuid}",
+                headers=admin_auth_headers,
+                json={"embedding_model": "all-minilm"},
+            )
+        assert response.status_code == 200
+        assert response.json()["embedding_model"] is None
+        assert response.json()["pending_embedding_model"] == "all-minilm"
+        backfill.assert_called_once_with(project_id, "all-minilm")
+
+        document = Document(
+            filename="doc.txt",
+            original_filename="doc.txt",
+            content_type="text/plain",
+            file_size=1,
+            status="ready",
+            project_id=project_id,
+            chunks=[Chunk(content="chunk", chunk_index=0)],
+        )
+        db_session.add(document)
+        await db_session.commit()
+
+        # A failed backfill leaves the old model active
+        with patch(
+            "app.services.processor.generate_embeddings",
+            AsyncMock(side_effect=RuntimeError("model not pulled")),
+        ):
+            with pytest.raises(RuntimeError):
+                await switch_project_embedding_model(
+                    project_id, "all-minilm", db_session
+                )
+        await db_session.rollback()
+        project = await db_session.get(Project, project_id)
+        assert project.embedding_model is None
+        assert project.pending_embedding_model == "all-minilm"
+
+        with patch(
+            "app.services.processor.generate_embeddings",
+            AsyncMock(return_value=[[0.1] * 384]),
+        ):
+            embedded = await switch_project_embedding_model(
+                project_id, "all-minilm", db_session
+            )
+        assert embedded == 1
+        await db_session.refresh(project)
+        assert project.embedding_model == "all-minilm"
+        assert project.pending_embedding_model is None
+
     async def test_update_project_subdomain(
         self, client: AsyncClient, admin_auth_headers
     ):
@@ -415,3 +624,430 @@ class TestProjectDelete:
             headers=admin_auth_headers,
         )
         assert response.status_code == 404
+
+
+class TestPublicProjectConfig:
+    """Tests for GET /api/public/projects/by-subdomain/{subdomain}"""
+
+    async def _create_project(self, client: AsyncClient, admin_auth_headers) -> dict:
+        customer = (
+            await client.post(
+                "/api/admin/customers",
+                headers=admin_auth_headers,
+                json={"name": "Tenant Customer"},
+            )
+        ).json()
+        response = await client.post(
+            "/api/admin/projects",
+            headers=admin_auth_headers,
+            json={
+                **VALID_PROJECT_DATA,
+                "customer_id": customer["id"],
+                "subdomain": "tenant",
+            },
+        )
+        return response.json()
+
+    async def test_cached_without_queries(
+        self, client: AsyncClient, admin_auth_headers, test_engine
+    ):
+        """Test repeated lookups are served from the tenant registry."""
+        project = await self._create_project(client, admin_auth_headers)
+        response = await client.get("/api/public/projects/by-subdomain/tenant")
+        assert response.status_code == 200
+        assert response.json()["uuid"] == project["uuid"]
+        assert response.headers["cache-control"].startswith("public")
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            cached = await client.get("/api/public/projects/by-subdomain/tenant")
+            missing = await client.get("/api/public/projects/by-subdomain/nope")
+            missing_again = await client.get("/api/public/projects/by-subdomain/nope")
+        finally:
+            event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+
+        assert cached.json() == response.json()
+        assert cached.headers["etag"] == response.headers["etag"]
+        assert missing.status_code == 404
+        assert missing_again.status_code == 404
+        # Only the first lookup of the unknown subdomain reaches the database
+        assert len(statements) == 1
+
+    async def test_not_modified(self, client: AsyncClient, admin_auth_headers):
+        """Test If-None-Match with the current ETag returns 304."""
+        await self._create_project(client, admin_auth_headers)
+        response = await client.get("/api/public/projects/by-subdomain/tenant")
+        etag = response.headers["etag"]
+
+        response = await client.get(
+            "/api/public/projects/by-subdomain/tenant",
+            headers={"If-None-Match": etag},
+        )
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+
+    async def test_invalidated_on_update(
+        self, client: AsyncClient, admin_auth_headers
+    ):
+        """Test project edits, new subdomains and deactivation show at once."""
+        project = await self._create_project(client, admin_auth_headers)
+        before = await client.get("/api/public/projects/by-subdomain/tenant")
+        await client.get("/api/public/projects/by-subdomain/renamed")
+
+        await client.patch(
+            f"/api/admin/projects/{project['uuid']}",
+            headers=admin_auth_headers,
+            json={"title": "New Title"},
+        )
+        response = await client.get("/api/public/projects/by-subdomain/tenant")
+        assert response.json()["title"] == "New Title"
+        assert response.headers["etag"] != before.headers["etag"]
+
+        await client.patch(
+            f"/api/admin/projects/{project['uuid']}",
+            headers=admin_auth_headers,
+            json={"subdomain": "renamed"},
+        )
+        response = await client.get("/api/public/projects/by-subdomain/tenant")
+        assert response.status_code == 404
+        response = await client.get("/api/public/projects/by-subdomain/renamed")
+        assert response.status_code == 200
+
+        await client.patch(
+            f"/api/admin/projects/{project['uuid']}",
+            headers=admin_auth_headers,
+            json={"is_active": False},
+        )
+        response = await client.get("/api/public/projects/by-subdomain/renamed")
+        assert response.status_code == 404
+
+    async def test_invalidated_on_new_document(
+        self, client: AsyncClient, admin_auth_headers, db_session: AsyncSession
+    ):
+        """Test documents_count follows documents added to the project."""
+        project = await self._create_project(client, admin_auth_headers)
+        response = await client.get("/api/public/projects/by-subdomain/tenant")
+        assert response.json()["documents_count"] == 0
+
+        db_session.add(
+            Document(
+                filename="doc.txt",
+                original_filename="doc.txt",
+                content_type="text/plain",
+                file_size=1,
+                project_id=project["id"],
+            )
+        )
+        await db_session.commit()
+
+        response = await client.get("/api/public/projects/by-subdomain/tenant")
+        assert response.json()["documents_count"] == 1
+
+
+class TestSubdomainTenant:
+    """Tests for tenant resolution by SubdomainMiddleware"""
+
+    def test_subdomain_from_host(self):
+        """Test subdomains are parsed from Host headers."""
+        assert subdomain_from_host("acme.docutok.com") == "acme"
+        assert subdomain_from_host("Acme.DocuTok.com:8443") == "acme"
+        assert subdomain_from_host("acme.localhost:5173") == "acme"
+        assert subdomain_from_host("docutok.com") is None
+        assert subdomain_from_host("localhost:8000") is None
+        assert subdomain_from_host("127.0.0.1:8000") is None
+        assert subdomain_from_host("[::1]:8000") is None
+        assert subdomain_from_host("") is None
+
+    async def test_tenant_in_scope_state(
+        self, client: AsyncClient, admin_auth_headers, test_engine
+    ):
+        """Test the middleware stores the resolved tenant in scope state."""
+        project = await TestPublicProjectConfig()._create_project(
+            client, admin_auth_headers
+        )
+        seen = {}
+
+        async def app(scope, receive, send):
+            seen.update(scope["state"])
+
+        middleware = SubdomainMiddleware(
+            app, session_factory=async_sessionmaker(test_engine)
+        )
+        scope = {
+            "type": "http",
+            "headers": [(b"host", b"tenant.docutok.com")],
+        }
+        await middleware(scope, None, None)
+        assert seen["subdomain"] == "tenant"
+        assert seen["tenant"].project_id == project["id"]
+        assert seen["tenant"].voice == project["voice"]
+
+        scope = {
+            "type": "http",
+            "headers": [(b"x-subdomain", b"tenant.docutok.com"), (b"host", b"api")],
+        }
+        await middleware(scope, None, None)
+        assert seen["tenant"].project_id == project["id"]
+
+        scope = {"type": "http", "headers": [(b"host", b"localhost")]}
+        await middleware(scope, None, None)
+        assert seen["subdomain"] is None
+        assert seen["tenant"] is None
+
+    async def test_routes_default_to_tenant(
+        self, client: AsyncClient, admin_auth_headers, db_session: AsyncSession
+    ):
+        """Test document lists default to the tenant's project."""
+        project = await TestPublicProjectConfig()._create_project(
+            client, admin_auth_headers
+        )
+        db_session.add(
+            Document(
+                filename="tenant.txt",
+                original_filename="tenant.txt",
+                content_type="text/plain",
+                file_size=1,
+                project_id=project["id"],
+            )
+        )
+        db_session.add(
+            Document(
+                filename="other.txt",
+                original_filename="other.txt",
+                content_type="text/plain",
+                file_size=1,
+                project_id=None,
+            )
+        )
+        await db_session.commit()
+
+        response = await client.get("/api/documents/")
+        assert len(response.json()["documents"]) == 2
+
+        response = await client.get(
+            "/api/documents/", headers={"X-Subdomain": "tenant"}
+        )
+        documents = response.json()["documents"]
+        assert [d["filename"] for d in documents] == ["tenant.txt"]
+
+
+class TestProjectLogo:
+    """Tests for logo upload and signed public logo URLs"""
+
+    async def test_logo_signed_url(
+        self,
+        client: AsyncClient,
+        admin_auth_headers,
+        auth_headers,
+        test_user: User,
+        db_session: AsyncSession,
+    ):
+        """Test uploaded logos are served from signed, cacheable URLs."""
+        customer_response = await client.post(
+            "/api/admin/customers",
+            headers=admin_auth_headers,
+            json={"name": "Test Customer"},
+        )
+        customer_id = customer_response.json()["id"]
+        project_data = {**VALID_PROJECT_DATA, "customer_id": customer_id}
+        create_response = await client.post(
+            "/api/admin/projects",
+            headers=admin_auth_headers,
+            json=project_data,
+        )
+        project_uuid = create_response.json()["uuid"]
+
+        test_user.customer_id = customer_id
+        await db_session.commit()
+
+        logo = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+        response = await client.post(
+            f"/api/customer/projects/{project_uuid}/logo",
+            headers=auth_headers,
+            files={"file": ("logo.png", logo, "image/png")},
+        )
+        assert response.status_code == 200
+
+        project = (
+            await client.get(
+                f"/api/admin/projects/{project_uuid}", headers=admin_auth_headers
+            )
+        ).json()
+        assert "signature=" in project["logo"]
+
+        # Served without authentication; not a decodable image, so no
+        # variants exist and the original is sent for revalidation only
+        response = await client.get(project["logo"])
+        assert response.status_code == 200
+        assert response.content == logo
+        assert response.headers["cache-control"] == "no-cache"
+        assert response.headers["etag"].endswith('-original"')
+
+        tampered = project["logo"].replace("signature=", "signature=x")
+        response = await client.get(tampered)
+        assert response.status_code == 403
+
+    async def test_replaced_logo_url_not_served(
+        self,
+        client: AsyncClient,
+        admin_auth_headers,
+        auth_headers,
+        test_user: User,
+        db_session: AsyncSession,
+    ):
+        """Test a signed URL of a replaced logo never serves the new logo."""
+        customer_response = await client.post(
+            "/api/admin/customers",
+            headers=admin_auth_headers,
+            json={"name": "Test Customer"},
+        )
+        customer_id = customer_response.json()["id"]
+        project_data = {**VALID_PROJECT_DATA, "customer_id": customer_id}
+        create_response = await client.post(
+            "/api/admin/projects",
+            headers=admin_auth_headers,
+            json=project_data,
+        )
+        project_uuid = create_response.json()["uuid"]
+
+        test_user.customer_id = customer_id
+        await db_session.commit()
+
+        urls = []
+        for logo in (b"\x89PNG first", b"\x89PNG second"):
+            response = await client.post(
+                f"/api/customer/projects/{project_uuid}/logo",
+                headers=auth_headers,
+                files={"file": ("logo.png", logo, "image/png")},
+            )
+            assert response.status_code == 200
+            project = (
+                await client.get(
+                    f"/api/admin/projects/{project_uuid}", headers=admin_auth_headers
+                )
+            ).json()
+            urls.append(project["logo"])
+
+        response = await client.get(urls[1])
+        assert response.status_code == 200
+        assert response.content == b"\x89PNG second"
+
+        # The first version is gone rather than served with the new bytes
+        response = await client.get(urls[0])
+        assert response.status_code == 404
+
+    async def test_legacy_logo_adopted(self):
+        """Test logos stored before per-version keys are served by version."""
+        project_uuid = "00000000-0000-0000-0000-0000000000aa"
+        data = b"\x89PNG legacy"
+        version = logo_version(hashlib.sha256(data).hexdigest())
+        await put_bytes(logo_key(f"{project_uuid}.png"), data)
+
+        assert await find_logo_original(project_uuid, "0" * 16) is None
+        key = await find_logo_original(project_uuid, version)
+        assert key == logo_original_key(project_uuid, version)
+        assert await get_storage().exists(key)
+        await delete_logo_version(project_uuid, version)
+        assert not await get_storage().exists(key)
+
+    def test_asset_signature_expiry(self):
+        """Test signed asset URLs are rejected once expired."""
+        path = "/api/public/assets/avatars/x.gab"
+        signed = sign_asset_path(path, now=1_000_000)
+        params = parse_qs(urlparse(signed).query)
+        expires = int(params["expires"][0])
+        signature = params["signature"][0]
+
+        assert verify_asset_signature(path, expires, signature, now=1_000_000)
+        assert not verify_asset_signature(path, expires, signature, now=expires + 1)
+        assert not verify_asset_signature(
+            "/api/public/assets/avatars/y.gab", expires, signature, now=1_000_000
+        )
+        assert not verify_asset_signature(path, expires, "é" + signature[1:])
+
+    async def test_asset_non_ascii_signature_forbidden(self, client: AsyncClient):
+        """Test a non-ASCII signature is rejected rather than failing."""
+        signed = sign_asset_path(
+            "/api/public/assets/avatars/00000000-0000-0000-0000-000000000001.gab"
+        )
+        response = await client.get(signed.split("signature=")[0] + "signature=%C3%A9")
+        assert response.status_code == 403
+
+    async def test_logo_variants_negotiated(
+        self,
+        client: AsyncClient,
+        admin_auth_headers,
+        auth_headers,
+        test_user: User,
+        db_session: AsyncSession,
+    ):
+        """Test resized WebP/PNG variants are generated and negotiated."""
+        customer_response = await client.post(
+            "/api/admin/customers",
+            headers=admin_auth_headers,
+            json={"name": "Test Customer"},
+        )
+        customer_id = customer_response.json()["id"]
+        project_data = {**VALID_PROJECT_DATA, "customer_id": customer_id}
+        create_response = await client.post(
+            "/api/admin/projects",
+            headers=admin_auth_headers,
+            json=project_data,
+        )
+        project_uuid = create_response.json()["uuid"]
+
+        test_user.customer_id = customer_id
+        await db_session.commit()
+
+        source = io.BytesIO()
+        image = Image.new("RGBA", (300, 150), (25, 118, 210, 255))
+        image.save(source, format="PNG", pnginfo=_png_with_metadata())
+        response = await client.post(
+            f"/api/customer/projects/{project_uuid}/logo",
+            headers=auth_headers,
+            files={"file": ("logo.png", source.getvalue(), "image/png")},
+        )
+        assert response.status_code == 200
+
+        project = (
+            await client.get(
+                f"/api/admin/projects/{project_uuid}", headers=admin_auth_headers
+            )
+        ).json()
+
+        response = await client.get(
+            project["logo"] + "&w=100", headers={"Accept": "image/webp,image/*"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/webp"
+        assert "Accept" in response.headers["vary"]
+        assert "immutable" in response.headers["cache-control"]
+        assert response.headers["cache-control"].startswith("public")
+        with Image.open(io.BytesIO(response.content)) as variant:
+            assert variant.size == (128, 64)
+
+        response = await client.get(
+            project["logo"], headers={"Accept": "image/webp;q=0, image/png"}
+        )
+        assert response.headers["content-type"] == "image/png"
+
+        response = await client.get(
+            f"/api/customer/projects/{project_uuid}/logo?w=64",
+            headers={**auth_headers, "Accept": "image/png"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/png"
+        with Image.open(io.BytesIO(response.content)) as variant:
+            assert variant.size == (64, 32)
+            assert "Author" not in variant.info
+
+
+def _png_with_metadata() -> PngImagePlugin.PngInfo:
+    info = PngImagePlugin.PngInfo()
+    info.add_text("Author", "Someone")
+    return info
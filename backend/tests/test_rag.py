@@ -1,9 +1,20 @@
 import pytest
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 from pathlib import Path
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.models.chunk import Chunk
+from app.models.document import Document
 from app.services.extraction import extract_text
 from app.services.embedding import generate_embedding
-from app.services.retrieval import search_similar_chunks
+from app.services.processor import process_document
+from app.services.retrieval import _index_distance, search_similar_chunks
+from app.services.vector_indexes import (
+    INDEX_EXPRESSIONS,
+    build_vector_indexes,
+    create_index_sql,
+)
 
 # --- Extraction Tests ---
 
@@ -66,3 +77,164 @@ async def test_retrieval_service_search():
         assert results[0]["content"] == "Found content"
         assert results[0]["filename"] == "source.txt"
         assert results[0]["similarity"] == 0.9
+
+
+@pytest.mark.asyncio
+async def test_retrieval_routes_to_model_index():
+    mock_session = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.fetchall.return_value = []
+    mock_session.execute.return_value = mock_result
+
+    with patch(
+        "app.services.retrieval.generate_embedding", new_callable=AsyncMock
+    ) as mock_embed:
+        mock_embed.return_value = [0.1, 0.1, 0.1]
+
+        await search_similar_chunks("query", mock_session, model="all-minilm")
+
+        mock_embed.assert_awaited_once_with("query", "all-minilm")
+        sql = str(mock_session.execute.call_args.args[0])
+        assert "e.model = 'all-minilm'" in sql
+        assert "::vector(384)" in sql
+
+
+@pytest.mark.asyncio
+async def test_retrieval_rejects_unknown_model():
+    with pytest.raises(ValueError, match="Unknown embedding model"):
+        await search_similar_chunks("query", AsyncMock(), model="not-a-model")
+
+
+@pytest.mark.asyncio
+async def test_retrieval_quantized_mode_rescores():
+    mock_session = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.fetchall.return_value = []
+    mock_session.execute.return_value = mock_result
+
+    with patch(
+        "app.services.retrieval.generate_embedding", new_callable=AsyncMock
+    ) as mock_embed, patch(
+        "app.services.retrieval.settings.vector_index_mode", "binary"
+    ):
+        mock_embed.return_value = [0.1, 0.1, 0.1]
+
+        await search_similar_chunks("query", mock_session, limit=5)
+
+        sql = str(mock_session.execute.call_args.args[0])
+        params = mock_session.execute.call_args.args[1]
+        assert "binary_quantize" in sql
+        assert "ORDER BY similarity DESC" in sql
+        assert params["candidates"] > params["limit"]
+
+
+@pytest.mark.parametrize("mode", sorted(INDEX_EXPRESSIONS))
+def test_index_expressions_match_retrieval(mode):
+    sql = create_index_sql(mode, "all-minilm", 384)
+    indexed = sql.split("USING hnsw (")[1].rsplit(")", 1)[0]
+    expression = indexed.rsplit(" ", 1)[0]
+    assert expression.strip("()") in _index_distance(mode, 384, "[0.1]").replace(
+        "e.", ""
+    )
+
+
+@pytest.mark.asyncio
+async def test_build_vector_indexes_drops_unused_modes():
+    connection = AsyncMock()
+
+    await build_vector_indexes(connection, "halfvec", drop_unused=True)
+
+    statements = [str(call.args[0]) for call in connection.execute.call_args_list]
+    created = [s for s in statements if s.startswith("CREATE INDEX")]
+    dropped = [s for s in statements if s.startswith("DROP INDEX")]
+    assert created and all("halfvec_cosine_ops" in s for s in created)
+    assert any("ix_chunk_embeddings_hnsw_" in s for s in dropped)
+    assert not any("_halfvec_" in s for s in dropped)
+
+
+@pytest.mark.asyncio
+async def test_build_vector_indexes_rejects_unknown_mode():
+    with pytest.raises(ValueError, match="Unknown vector index mode"):
+        await build_vector_indexes(AsyncMock(), "pq")
+
+
+# --- Chat Tests ---
+
+
+@pytest.mark.asyncio
+async def test_chat_releases_connection_before_streaming(client, test_engine):
+    sessions = []
+    chunks = [
+        {
+            "content": "context",
+            "page": 1,
+            "filename": "guide.pdf",
+            "document_uuid": "00000000-0000-0000-0000-000000000001",
+        }
+    ]
+
+    async def search(query, db, **kwargs):
+        await db.execute(text("SELECT 1"))
+        sessions.append(db)
+        return chunks
+
+    async def astream(messages):
+        # Retrieval's session is closed before the first token
+        assert sessions and not sessions[0].in_transaction()
+        yield SimpleNamespace(content="Answer.")
+
+    llm = MagicMock()
+    llm.astream = astream
+
+    async def session_factory(*keys):
+        return async_sessionmaker(test_engine)
+
+    with patch("app.services.chat.read_session_factory", session_factory), patch(
+        "app.services.chat.search_similar_chunks", search
+    ), patch("app.services.chat.get_llm", return_value=llm):
+        response = await client.post("/api/chat/", json={"query": "What?"})
+
+    assert response.status_code == 200
+    assert response.text.startswith("Answer.")
+    assert "guide.pdf" in response.text
+
+
+# --- Processing Tests ---
+
+
+@pytest.mark.asyncio
+async def test_duplicate_processing_failure_leaves_no_chunks(db_session):
+    content_hash = "a" * 64
+    source = Document(
+        filename=f"{content_hash}.txt",
+        original_filename="first.txt",
+        content_type="text/plain",
+        file_size=1,
+        content_hash=content_hash,
+        status="ready",
+        chunks=[Chunk(content=f"chunk {i}", chunk_index=i) for i in range(3)],
+    )
+    duplicate = Document(
+        filename=f"{content_hash}.txt",
+        original_filename="second.txt",
+        content_type="text/plain",
+        file_size=1,
+        content_hash=content_hash,
+        status="pending",
+    )
+    db_session.add_all([source, duplicate])
+    await db_session.commit()
+
+    # The source has no embeddings for the active model, so they are made
+    with patch(
+        "app.services.processor.generate_embeddings",
+        AsyncMock(side_effect=RuntimeError("model not pulled")),
+    ), pytest.raises(RuntimeError):
+        await process_document(duplicate.id, db_session)
+
+    await db_session.refresh(duplicate)
+    assert duplicate.status == "error"
+    result = await db_session.execute(
+        select(func.count(Chunk.id)).where(Chunk.document_id == duplicate.id)
+    )
+    assert result.scalar() == 0
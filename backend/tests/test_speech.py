@@ -0,0 +1,318 @@
+"""
+Tests for speech endpoints (using the local fake speech provider).
+"""
+
+import base64
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from httpx import AsyncClient
+
+from app.services.speech_providers import SILENT_MP3_FRAME
+from app.services.speech_stream import SentenceSplitter, speakable_text
+from app.services.timepoints import align_words, parse_mp3_granules, timepoints_for_audio
+from app.services.tts_cache import TTSCache, speech_cache_key
+
+
+def _mp3_frame(coded_bits: int) -> bytes:
+    """A joint-stereo MPEG-1 frame whose granules spent `coded_bits` each."""
+    side_info = 0
+    for _ in range(4):  # 2 granules x 2 channels
+        side_info = (side_info << 59) | (coded_bits << 47)
+    side_info <<= 256 - 20 - 4 * 59
+    frame = SILENT_MP3_FRAME[:4] + side_info.to_bytes(32, "big")
+    return frame.ljust(len(SILENT_MP3_FRAME), b"\0")
+
+
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestSpeechTranscribe:
+    """Tests for POST /api/speech/transcribe"""
+
+    async def test_transcribe(self, client: AsyncClient, speech_provider):
+        """Test audio is transcribed through the provider."""
+        response = await client.post(
+            "/api/speech/transcribe",
+            files={"audio": ("speech.webm", b"hello world", "audio/webm")},
+        )
+        assert response.status_code == 200
+        assert response.json()["text"] == "hello world"
+
+    async def test_transcribe_invalid_type(self, client: AsyncClient, speech_provider):
+        """Test non-audio uploads are rejected."""
+        response = await client.post(
+            "/api/speech/transcribe",
+            files={"audio": ("notes.txt", b"hello", "text/plain")},
+        )
+        assert response.status_code == 400
+
+
+class TestSpeechSynthesize:
+    """Tests for POST /api/speech/synthesize and /synthesize-avatar"""
+
+    async def test_synthesize(self, client: AsyncClient, speech_provider):
+        """Test synthesis returns MP3 audio with the requested voice."""
+        response = await client.post(
+            "/api/speech/synthesize",
+            json={"text": "Hello there", "voice": "en-US-Neural2-D"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "audio/mpeg"
+        assert response.content.startswith(SILENT_MP3_FRAME[:4])
+        assert speech_provider.calls == [("Hello there", "en-US-Neural2-D", 1.0)]
+
+    async def test_synthesize_avatar(self, client: AsyncClient, speech_provider):
+        """Test avatar synthesis returns base64 audio and word timepoints."""
+        response = await client.post(
+            "/api/speech/synthesize-avatar",
+            json={"input": {"ssml": "<speak>Hello <b>big</b> world</speak>"}},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert base64.b64decode(data["audioContent"]).startswith(SILENT_MP3_FRAME[:4])
+        assert [t["markName"] for t in data["timepoints"]] == ["0", "1", "2"]
+        assert speech_provider.calls[0][0] == "Hello big world"
+
+    async def test_synthesize_cached(self, client: AsyncClient, speech_provider):
+        """Test repeated phrases are served from the cache."""
+        for text in ["Welcome back!", "  Welcome   back! "]:
+            response = await client.post(
+                "/api/speech/synthesize-avatar",
+                json={"input": {"text": text}},
+            )
+            assert response.status_code == 200
+
+        response = await client.post(
+            "/api/speech/synthesize", json={"text": "Welcome back!"}
+        )
+        assert response.status_code == 200
+        assert len(speech_provider.calls) == 1
+
+
+    async def test_plain_synthesis_skips_timepoints(
+        self, client: AsyncClient, speech_provider
+    ):
+        """Test timepoints are computed only for callers that use them."""
+        align = AsyncMock(return_value=[{"markName": "0", "timeSeconds": 0.0}])
+        with patch("app.services.speech.timepoints_for_audio", align):
+            response = await client.post(
+                "/api/speech/synthesize", json={"text": "Hello"}
+            )
+            assert response.status_code == 200
+            align.assert_not_awaited()
+
+            # The cached audio is aligned once, then its timepoints are cached
+            for _ in range(2):
+                response = await client.post(
+                    "/api/speech/synthesize-avatar", json={"input": {"text": "Hello"}}
+                )
+                assert response.json()["timepoints"] == align.return_value
+            align.assert_awaited_once()
+        assert len(speech_provider.calls) == 1
+
+
+class TestTimepoints:
+    """Tests for word timepoint alignment"""
+
+    def test_parse_granules(self):
+        """Test granule durations and coded sizes are read from side info."""
+        granules = parse_mp3_granules(b"junk" + _mp3_frame(300) + _mp3_frame(0))
+        assert len(granules) == 4
+        assert [bits for _, bits in granules] == [600, 600, 0, 0]
+        assert abs(granules[0][0] - 576 / 44100) < 1e-9
+
+    def test_align_skips_silence(self):
+        """Test words after a pause start after it, not inside it."""
+        # 10 voiced frames, 20 silent frames, 10 voiced frames
+        audio = _mp3_frame(300) * 10 + _mp3_frame(0) * 20 + _mp3_frame(300) * 10
+        frame_seconds = 1152 / 44100
+
+        timepoints = align_words(audio, ["Hello", "there.", "Bye", "now."])
+
+        times = [t["timeSeconds"] for t in timepoints]
+        assert [t["markName"] for t in timepoints] == ["0", "1", "2", "3"]
+        assert times == sorted(times)
+        assert times[0] == 0
+        assert times[1] < 10 * frame_seconds
+        assert times[2] >= 30 * frame_seconds - 0.001
+
+    async def test_provider_marks_are_used(self):
+        """Test provider timepoints are returned without local alignment."""
+        marks = [{"markName": "0", "timeSeconds": 0.1}]
+        assert await timepoints_for_audio(b"", ["Hi"], marks) == marks
+
+
+class TestTTSCache:
+    """Tests for the two-tier synthesized audio cache"""
+
+    async def test_disk_lru_eviction(self, tmp_path):
+        """Test the disk tier is size-bounded and evicts least recently used."""
+        cache = TTSCache(tmp_path, max_bytes=2500, memory_max_bytes=0)
+        keys = [speech_cache_key("voice", 1.0, f"phrase {i}") for i in range(3)]
+
+        await cache.put(keys[0], (b"a" * 1000, []))
+        await cache.put(keys[1], (b"b" * 1000, []))
+        assert await cache.get(keys[0]) is not None  # keys[1] is now oldest
+        await cache.put(keys[2], (b"c" * 1000, []))
+
+        assert await cache.get(keys[1]) is None
+        assert await cache.get(keys[0]) == (b"a" * 1000, [])
+
+        # The disk tier survives a restart
+        reopened = TTSCache(tmp_path, max_bytes=2500, memory_max_bytes=0)
+        assert await reopened.get(keys[2]) == (b"c" * 1000, [])
+
+    async def test_timepoints_added_later(self, tmp_path):
+        """Test timepoints can be added to audio cached without them."""
+        cache = TTSCache(tmp_path, max_bytes=2500, memory_max_bytes=0)
+        key = speech_cache_key("voice", 1.0, "Hello")
+        timepoints = [{"markName": "0", "timeSeconds": 0.0}]
+
+        await cache.put(key, (b"a" * 100, None))
+        assert await cache.get(key) == (b"a" * 100, None)
+        await cache.put_timepoints(key, timepoints)
+
+        reopened = TTSCache(tmp_path, max_bytes=2500, memory_max_bytes=0)
+        assert await reopened.get(key) == (b"a" * 100, timepoints)
+
+    async def test_key_normalization(self):
+        """Test keys ignore whitespace differences but not voice or rate."""
+        key = speech_cache_key("voice", 1.0, "Hello  world")
+        assert key == speech_cache_key("voice", 1.0, " Hello world ")
+        assert key != speech_cache_key("other", 1.0, "Hello world")
+        assert key != speech_cache_key("voice", 1.25, "Hello world")
+
+
+class TestSpeechStreaming:
+    """Tests for sentence-level streaming speech (POST /api/chat/speak)"""
+
+    def test_sentence_splitter(self):
+        """Test sentences are emitted as soon as they are complete."""
+        splitter = SentenceSplitter()
+        assert splitter.feed("The answer is") == []
+        assert splitter.feed(" simple. It has") == ["The answer is simple."]
+        assert splitter.feed(" two parts!\nOk. Done") == ["It has two parts!"]
+        assert splitter.flush() == "Ok. Done"
+
+    def test_speakable_text(self):
+        """Test citations and markdown are not read aloud."""
+        text = "**Yes**, see [Source: guide.pdf, Page 2] the `docs`."
+        assert speakable_text(text) == "Yes, see the docs."
+
+    async def test_speak_streams_ordered_audio(
+        self, client: AsyncClient, speech_provider
+    ):
+        """Test text tokens and in-order audio segments are streamed."""
+        tokens = ["First sentence ", "is here. Second ", "one follows! ", "Last bit"]
+
+        async def astream(messages):
+            for token in tokens:
+                yield SimpleNamespace(content=token)
+
+        chunks = [
+            {
+                "content": "context",
+                "page": 1,
+                "filename": "guide.pdf",
+                "document_uuid": "00000000-0000-0000-0000-000000000001",
+            }
+        ]
+        llm = MagicMock()
+        llm.astream = astream
+
+        with patch(
+            "app.services.chat.search_similar_chunks", AsyncMock(return_value=chunks)
+        ), patch("app.services.chat.get_llm", return_value=llm):
+            response = await client.post(
+                "/api/chat/speak", json={"query": "What?", "voice": "en-US-Neural2-D"}
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _parse_sse(response.text)
+
+        text = "".join(data["text"] for event, data in events if event == "text")
+        assert text == "".join(tokens)
+
+        audio = [data for event, data in events if event == "audio"]
+        assert [a["index"] for a in audio] == [0, 1, 2]
+        assert [a["text"] for a in audio] == [
+            "First sentence is here.",
+            "Second one follows!",
+            "Last bit",
+        ]
+        assert all(a["timepoints"] for a in audio)
+        assert {call[1] for call in speech_provider.calls} == {"en-US-Neural2-D"}
+
+        assert events[-2][0] == "sources"
+        assert "guide.pdf" in events[-2][1]["text"]
+        assert events[-1] == ("done", {})
+
+
+class TestSpeechStreamingRecognition:
+    """Tests for the WebSocket /api/speech/stream endpoint"""
+
+    def test_interim_and_final_transcripts(self, sync_client, speech_provider):
+        """Test audio frames produce interim and final transcripts."""
+        with sync_client.websocket_connect("/api/speech/stream") as ws:
+            ws.send_json({"language": "en-US"})
+            ws.send_bytes(b"hello ")
+            assert ws.receive_json() == {
+                "type": "interim",
+                "transcript": "hello",
+                "stable": True,
+            }
+            ws.send_bytes(b"world")
+            assert ws.receive_json()["transcript"] == "hello world"
+            ws.send_json({"type": "end"})
+            assert ws.receive_json() == {"type": "final", "transcript": "hello world"}
+
+    def test_answer_reuses_prefetched_retrieval(self, sync_client, speech_provider):
+        """Test retrieval starts on a stable partial and is reused for the answer."""
+        chunks = [
+            {
+                "content": "Refunds within 30 days.",
+                "page": 3,
+                "filename": "policy.pdf",
+                "document_uuid": "00000000-0000-0000-0000-000000000002",
+            }
+        ]
+
+        async def astream(messages):
+            yield SimpleNamespace(content="Within 30 days.")
+
+        llm = MagicMock()
+        llm.astream = astream
+        search = AsyncMock(return_value=chunks)
+
+        with patch("app.services.chat.search_similar_chunks", search), patch(
+            "app.services.chat.get_llm", return_value=llm
+        ):
+            with sync_client.websocket_connect("/api/speech/stream") as ws:
+                ws.send_json({"answer": True, "project_id": 1})
+                ws.send_bytes(b"What is the refund policy")
+                assert ws.receive_json()["type"] == "interim"
+                ws.send_json({"type": "end"})
+
+                messages = []
+                while True:
+                    message = ws.receive_json()
+                    messages.append(message)
+                    if message["type"] == "done":
+                        break
+
+        assert messages[0] == {
+            "type": "final",
+            "transcript": "What is the refund policy",
+        }
+        assert {"type": "token", "text": "Within 30 days."} in messages
+        assert "policy.pdf" in messages[-2]["text"]
+        assert search.await_count == 1
+        assert search.await_args.kwargs["project_id"] == 1
@@ -0,0 +1,130 @@
+import os
+import uuid
+
+import pytest
+
+from app.services.storage_backends import (
+    LocalStorageBackend,
+    S3StorageBackend,
+    content_disposition,
+)
+
+
+async def _read(backend, key, start=0, end=None) -> bytes:
+    return b"".join([chunk async for chunk in backend.iter_range(key, start, end)])
+
+
+def _source(tmp_path, content: bytes):
+    path = tmp_path / f"{uuid.uuid4()}.part"
+    path.write_bytes(content)
+    return path
+
+
+class TestContentDisposition:
+    """Tests for Content-Disposition header values."""
+
+    def test_plain_name_quoted(self):
+        """Test plain ASCII names are sent as a quoted filename."""
+        assert content_disposition("inline", "report.pdf") == (
+            'inline; filename="report.pdf"'
+        )
+
+    def test_unsafe_name_encoded(self):
+        """Test quotes and non-latin-1 characters cannot break the header."""
+        value = content_disposition("attachment", 'Отчёт "final".pdf')
+        value.encode("latin-1")
+        assert value == (
+            'attachment; filename="final.pdf"; '
+            "filename*=utf-8''%D0%9E%D1%82%D1%87%D1%91%D1%82%20%22final%22.pdf"
+        )
+        assert content_disposition("inline", "日本") == (
+            "inline; filename*=utf-8''%E6%97%A5%E6%9C%AC"
+        )
+
+
+class TestLocalStorageBackend:
+    """Tests for the local filesystem storage backend."""
+
+    async def test_put_and_read(self, tmp_path):
+        """Test storing a file and reading it back."""
+        backend = LocalStorageBackend(tmp_path / "store")
+        source = _source(tmp_path, b"hello world")
+
+        await backend.put_file("avatars/a.gab", source)
+
+        assert not source.exists()
+        assert await backend.exists("avatars/a.gab")
+        assert await backend.size("avatars/a.gab") == 11
+        assert await _read(backend, "avatars/a.gab") == b"hello world"
+
+    async def test_ranged_read(self, tmp_path):
+        """Test reading an inclusive byte range."""
+        backend = LocalStorageBackend(tmp_path)
+        await backend.put_file("doc.txt", _source(tmp_path, b"0123456789"))
+
+        assert await _read(backend, "doc.txt", 2, 5) == b"2345"
+        assert await _read(backend, "doc.txt", 7) == b"789"
+
+    async def test_missing_and_delete(self, tmp_path):
+        """Test missing keys and deletion."""
+        backend = LocalStorageBackend(tmp_path)
+        assert await backend.size("missing.txt") is None
+        await backend.delete("missing.txt")
+
+        await backend.put_file("doc.txt", _source(tmp_path, b"x"))
+        await backend.delete("doc.txt")
+        assert not await backend.exists("doc.txt")
+
+    async def test_local_path_and_no_presign(self, tmp_path):
+        """Test that local files are used in place and not presigned."""
+        backend = LocalStorageBackend(tmp_path)
+        await backend.put_file("doc.txt", _source(tmp_path, b"x"))
+
+        async with backend.local_path("doc.txt") as path:
+            assert path == (tmp_path / "doc.txt").resolve()
+        assert await backend.presigned_url("doc.txt", 60) is None
+
+    async def test_rejects_path_traversal(self, tmp_path):
+        """Test that keys cannot escape the storage root."""
+        backend = LocalStorageBackend(tmp_path / "store")
+        with pytest.raises(ValueError, match="Invalid storage key"):
+            await backend.exists("../secret.txt")
+
+
+@pytest.mark.skipif(
+    not os.environ.get("S3_TEST_ENDPOINT_URL"),
+    reason="Set S3_TEST_ENDPOINT_URL (e.g. MinIO) to run S3 backend tests",
+)
+class TestS3StorageBackend:
+    """Tests for the S3 backend against an S3-compatible server."""
+
+    async def test_round_trip(self, tmp_path):
+        """Test multipart upload, ranged reads, presigning and deletion."""
+        backend = S3StorageBackend(
+            bucket=os.environ.get("S3_TEST_BUCKET", "docutok"),
+            prefix=f"test-{uuid.uuid4()}",
+            endpoint_url=os.environ["S3_TEST_ENDPOINT_URL"],
+            access_key_id=os.environ.get("S3_TEST_ACCESS_KEY_ID", "docutok"),
+            secret_access_key=os.environ.get(
+                "S3_TEST_SECRET_ACCESS_KEY", "docutok_secret"
+            ),
+            multipart_chunk_size=5 * 1024 * 1024,
+        )
+        content = os.urandom(11 * 1024 * 1024)
+
+        await backend.put_file("doc.bin", _source(tmp_path, content))
+        try:
+            assert await backend.size("doc.bin") == len(content)
+            assert await _read(backend, "doc.bin", 100, 199) == content[100:200]
+            async with backend.local_path("doc.bin") as path:
+                assert path.read_bytes() == content
+            url = await backend.presigned_url("doc.bin", 60, filename="doc.bin")
+            assert url and "Signature" in url
+            url = await backend.presigned_url(
+                "doc.bin", 60, filename="Überblick.bin", disposition="attachment"
+            )
+            assert "attachment" in url
+        finally:
+            await backend.delete("doc.bin")
+
+        assert not await backend.exists("doc.bin")